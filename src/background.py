@@ -0,0 +1,22 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(
+    fn: Callable[[], Awaitable[Any]],
+    interval: float,
+    name: str,
+    run_first: bool = False,
+) -> None:
+    # A failed run is logged and retried on the next tick; only cancellation ends the loop
+    if not run_first:
+        await asyncio.sleep(interval)
+    while True:
+        try:
+            await fn()
+        except Exception:
+            logger.exception("%s failed", name)
+        await asyncio.sleep(interval)
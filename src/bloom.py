@@ -0,0 +1,60 @@
+import hashlib
+import math
+from typing import Dict, Iterator
+
+
+# Set membership with no false negatives and a tunable false positive rate,
+# in about 10 bits per key at 1%.
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: str) -> None:
+        for position in self.__positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(key))
+
+    def fill_ratio(self) -> float:
+        return int.from_bytes(self._bits, "little").bit_count() / self.size
+
+    def __positions(self, key: str) -> Iterator[int]:
+        # Double hashing: k positions out of one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+
+# Bloom filters cannot delete, so keys are grouped by expiry: one filter per
+# ``window`` seconds of expiry times, dropped whole once all of its keys expired.
+class ExpiringBloomFilter:
+    def __init__(self, window: float, capacity: int, error_rate: float):
+        self.window = window
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filters: Dict[int, BloomFilter] = {}
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def add(self, key: str, expires_at: float) -> None:
+        generation = int(expires_at // self.window)
+        if generation not in self._filters:
+            self._filters[generation] = BloomFilter(self.capacity, self.error_rate)
+        self._filters[generation].add(key)
+
+    def might_contain(self, key: str, expires_at: float) -> bool:
+        # Only the filter for the key's own expiry is probed
+        bloom = self._filters.get(int(expires_at // self.window))
+        return bloom is not None and key in bloom
+
+    def expire(self, now: float) -> None:
+        for generation in [g for g in self._filters if (g + 1) * self.window <= now]:
+            del self._filters[generation]
+
+    def fill_ratios(self) -> Dict[int, float]:
+        return {generation: bloom.fill_ratio() for generation, bloom in self._filters.items()}
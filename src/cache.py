@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+# Bounded LRU map whose entries expire after ``ttl`` seconds (or an explicit deadline).
+class TTLCache(Generic[V]):
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Bumped by every write, so a reader can tell whether a key changed under it
+        self.version = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, V, int]]" = OrderedDict()
+        # key -> (deadline, version) of recent deletes, oldest first
+        self._deleted: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: V, expires_at: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self.version += 1
+        self._entries[key] = (deadline, value, self.version)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def fill(self, key: Hashable, value: V, since: int) -> bool:
+        # Caches a value read from the source after ``version`` was ``since``, unless
+        # the key was set or deleted meanwhile: that write is newer than the read
+        entry = self._entries.get(key)
+        deleted = self._deleted.get(key)
+        if (entry is not None and entry[2] > since) or (deleted is not None and deleted[1] > since):
+            return False
+        self.set(key, value)
+        return True
+
+    def delete(self, key: Hashable) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries.pop(key, None)
+        self.version += 1
+        now = time.time()
+        self._deleted.pop(key, None)
+        self._deleted[key] = (now + self.ttl, self.version)
+        # Reads in flight for longer than ``ttl`` are not guarded
+        while self._deleted and (len(self._deleted) > self.maxsize or next(iter(self._deleted.values()))[0] < now):
+            self._deleted.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._deleted.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
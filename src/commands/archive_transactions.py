@@ -0,0 +1,52 @@
+"""Move ledger rows past the archive horizon into ``transactions_archive``.
+
+    python -m src.commands.archive_transactions --chunk-size 500
+
+Rows older than ``TRANSACTION_ARCHIVE_AFTER_DAYS`` move in id order,
+``--chunk-size`` at a time, each chunk in its own transaction. Reads cover both
+tables, so the command is safe to run against a live database and can be
+interrupted and re-run at any point.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import List, Optional
+
+from src.config import settings
+from src.database import connect, disconnect
+from src.service.archive import ArchiveService, archive_cutoff
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=settings.transaction_archive_chunk_size,
+        help="Transactions moved per database transaction.",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(chunk_size: int) -> None:
+    await connect()
+    try:
+        started = time.perf_counter()
+        moved = await ArchiveService().archive(chunk_size=chunk_size)
+        print(
+            f"Archived {moved} transactions older than {archive_cutoff().isoformat()} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+    finally:
+        await disconnect()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    asyncio.run(run(args.chunk_size))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Rebuild ``account_rollups`` from the ledger.
+
+    python -m src.commands.backfill_rollups --chunk-size 500
+
+Accounts are processed in id order, ``--chunk-size`` at a time, each chunk in
+its own transaction. Live writes to the accounts of the chunk being rebuilt
+wait for it to commit, so the command is safe to run against a live database.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import List, Optional
+
+from src.database import connect, disconnect
+from src.service.rollup import RollupService
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Accounts rebuilt per transaction.")
+    return parser.parse_args(argv)
+
+
+async def run(chunk_size: int) -> None:
+    await connect()
+    try:
+        started = time.perf_counter()
+        totals = await RollupService().backfill(chunk_size=chunk_size)
+        print(
+            f"Rebuilt {totals['rollups']} rollups for {totals['accounts']} accounts "
+            f"from {totals['transactions']} transactions in {time.perf_counter() - started:.2f}s"
+        )
+    finally:
+        await disconnect()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    asyncio.run(run(args.chunk_size))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
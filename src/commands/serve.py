@@ -0,0 +1,136 @@
+"""Serve the API from several worker processes sharing one listening socket.
+
+    python -m src.commands.serve --workers 4 --port 8000
+
+Each worker is a fresh interpreter that builds its own app, connection pool and
+in-memory caches; nothing is shared between workers but the socket. SIGTERM or
+SIGINT stops accepting connections, gives in-flight requests up to
+``--graceful-timeout`` seconds to finish and then stops the workers. A worker
+that exits on its own is replaced. Every worker logs its cold start, from spawn
+to ready, and reports it as ``app_cold_start_seconds``.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from multiprocessing.connection import wait
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pause before replacing a worker that died, so a crash at startup does not spin
+RESTART_DELAY = 1.0
+# Time allowed on top of the graceful timeout for the lifespan shutdown to run
+SHUTDOWN_MARGIN = 5.0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: one per CPU).",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds in-flight requests get to finish on shutdown.",
+    )
+    parser.add_argument("--log-level", default="info", help="Log level of the workers.")
+    return parser.parse_args(argv)
+
+
+def bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, graceful_timeout: float, log_level: str, spawned_at: float) -> None:
+    # Runs in the child: the app and everything behind it is imported only here
+    import uvicorn
+
+    from src.main import create_app
+
+    config = uvicorn.Config(
+        create_app(started_at=spawned_at),
+        lifespan="on",
+        log_level=log_level,
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, target: Callable[..., None], args: Tuple[Any, ...], workers: int, graceful_timeout: float):
+        self.target = target
+        self.args = args
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        # Spawned rather than forked: workers start from a clean interpreter
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self.stopping = False
+
+    def run(self) -> None:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.stop)
+        self.processes = [self.spawn() for _ in range(self.workers)]
+        logger.info("Started %d workers", self.workers)
+        while not self.stopping:
+            wait([process.sentinel for process in self.processes], timeout=1.0)
+            for index, process in enumerate(self.processes):
+                if self.stopping or process.is_alive():
+                    continue
+                logger.warning("Worker %d exited with code %s, replacing it", process.pid, process.exitcode)
+                time.sleep(RESTART_DELAY)
+                self.processes[index] = self.spawn()
+        self.shutdown()
+
+    def spawn(self) -> multiprocessing.process.BaseProcess:
+        process = self.context.Process(target=self.target, args=self.args + (time.time(),))
+        process.start()
+        return process
+
+    def stop(self, signum: int, frame: Any) -> None:
+        self.stopping = True
+
+    def shutdown(self) -> None:
+        # SIGTERM makes uvicorn stop accepting, drain in-flight requests and run the lifespan shutdown
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.graceful_timeout + SHUTDOWN_MARGIN
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Worker %d did not stop in time, killing it", process.pid)
+                process.kill()
+                process.join()
+        logger.info("All workers stopped")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    sock = bind(args.host, args.port)
+    try:
+        Supervisor(run_worker, (sock, args.graceful_timeout, args.log_level), args.workers, args.graceful_timeout).run()
+    finally:
+        sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,6 @@
+import sys
+from typing import List, Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -7,6 +10,87 @@ class Settings(BaseSettings):
 
     database_url: str = Field(default="sqlite+aiosqlite:///:memory:")
     environment: str = Field(default="production")
+    database_replica_urls: List[str] = Field(default=[])
+    database_replica_eject_seconds: float = Field(default=30.0)
+
+    db_pool_min_size: int = Field(default=5)
+    db_pool_max_size: int = Field(default=20)
+    db_pool_acquire_timeout: float = Field(default=10.0)
+    db_statement_cache_size: int = Field(default=100)
+    db_pool_max_queries: int = Field(default=50000)
+    db_pool_max_inactive_lifetime: float = Field(default=300.0)
+
+    transaction_batch_max_size: int = Field(default=10000)
+    account_bulk_max_size: int = Field(default=10000)
+    account_write_serialization: bool = Field(default=False)
+
+    group_commit_enabled: bool = Field(default=False)
+    group_commit_window_ms: float = Field(default=2.0)
+    group_commit_max_batch: int = Field(default=64)
+
+    balance_checkpoint_interval: float = Field(default=0.0)
+    balance_cache_size: int = Field(default=100000)
+    balance_cache_ttl: float = Field(default=5.0)
+
+    transaction_archive_after_days: float = Field(default=365.0)
+    transaction_archive_interval: float = Field(default=0.0)
+    transaction_archive_chunk_size: int = Field(default=1000)
+
+    outbox_sink: Literal["", "webhook", "file", "queue"] = Field(default="")
+    outbox_webhook_url: str = Field(default="")
+    outbox_webhook_timeout: float = Field(default=10.0)
+    outbox_file_path: str = Field(default="outbox.ndjson")
+    outbox_queue_size: int = Field(default=10000)
+    outbox_batch_size: int = Field(default=100)
+    outbox_poll_interval: float = Field(default=1.0)
+    outbox_lease_seconds: float = Field(default=60.0)
+    outbox_retry_base: float = Field(default=1.0)
+    outbox_retry_max: float = Field(default=300.0)
+
+    feed_buffer_size: int = Field(default=100)
+    feed_heartbeat_interval: float = Field(default=15.0)
+    feed_broadcast: Literal["", "postgres"] = Field(default="")
+    feed_broadcast_channel: str = Field(default="transaction_feed")
+
+    idempotency_key_ttl: float = Field(default=86400.0)
+    idempotency_cache_size: int = Field(default=10000)
+    idempotency_persist: bool = Field(default=False)
+
+    rate_limit_read_rate: float = Field(default=0.0)
+    rate_limit_read_burst: int = Field(default=100)
+    rate_limit_write_rate: float = Field(default=0.0)
+    rate_limit_write_burst: int = Field(default=20)
+    rate_limit_max_users: int = Field(default=100000)
+    transaction_create_concurrency: int = Field(default=0)
+    transaction_create_queue_timeout: float = Field(default=0.5)
+
+    admin_user_ids: List[int] = Field(default=[])
+
+    token_cache_size: int = Field(default=4096)
+    token_cache_ttl: float = Field(default=300.0)
+    token_revocation_window: float = Field(default=300.0)
+    token_revocation_capacity: int = Field(default=100000)
+    token_revocation_error_rate: float = Field(default=0.01)
+    token_revocation_persist: bool = Field(default=False)
+    token_revocation_sync_interval: float = Field(default=5.0)
+
+
+settings = Settings()
 
 
-settings = Settings()
\ No newline at end of file
+def configure(overrides: Settings) -> None:
+    # Components are built from ``settings`` when their module is imported, so
+    # changing it afterwards would leave them on the old values: refuse instead
+    changed = [name for name in Settings.model_fields if getattr(overrides, name) != getattr(settings, name)]
+    if not changed:
+        return
+    readers = sorted(
+        name for name, module in list(sys.modules.items())
+        if name.startswith("src.") and name != __name__ and getattr(module, "settings", None) is settings
+    )
+    if readers:
+        raise RuntimeError(
+            f"Cannot change {', '.join(changed)}: settings were already read by {', '.join(readers)}"
+        )
+    for name in changed:
+        setattr(settings, name, getattr(overrides, name))
@@ -1,21 +1,70 @@
-from typing import List
+from datetime import date, datetime
+from functools import partial
+from typing import Annotated, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
-from src.schemas.account import AccountIn
-from src.security import login_required
+from src.config import settings
+from src.pagination import decode_cursor, next_cursor, next_id_cursor
+from src.ratelimit import rate_limit
+from src.responses import DuplexStreamingResponse, ModelJSONResponse, record_dicts
+from src.schemas.account import AccountBulkIn, AccountIn, SummaryGranularity
+from src.schemas.transaction import ExportFormat
+from src.security import admin_required, login_required
 from src.service.account import AccountService
+from src.service.balance import BalanceService
+from src.service.export import EXPORT_MEDIA_TYPES, ExportService
+from src.service.feed import FeedService, transaction_feed
+from src.service.rollup import RollupService
 from src.service.transaction import TransactionService
-from src.views.account import AccountOut, TransactionOut
+from src.views.account import AccountOut, AccountSummaryOut, BalanceOut, TransactionOut
 
-router = APIRouter(prefix="/accounts", dependencies=[Depends(login_required)])
+router = APIRouter(prefix="/accounts", dependencies=[Depends(login_required), Depends(rate_limit)])
 
 account_service = AccountService()
 tx_service = TransactionService()
+export_service = ExportService()
+balance_service = BalanceService()
+rollup_service = RollupService()
+# Backfill reads the primary: a lagging replica could miss rows committed just before subscribing
+feed_service = FeedService(
+    transaction_feed,
+    partial(tx_service.read_all, consistent=True),
+    heartbeat=settings.feed_heartbeat_interval,
+)
 
-@router.get("/", response_model=List[AccountOut])
-async def read_accounts(limit: int, skip: int = 0):
-    return await account_service.read_all(limit=limit, skip=skip)
+account_list_adapter = TypeAdapter(List[AccountOut])
+transaction_list_adapter = TypeAdapter(List[TransactionOut])
+
+account_page_responses = {200: {"headers": {"X-Next-Cursor": {"description": "Cursor for the next page, sent as `after`.", "schema": {"type": "string"}}}}}
+
+
+@router.get("/", response_model=List[AccountOut], response_class=ModelJSONResponse, responses=account_page_responses)
+async def read_accounts(
+    limit: int,
+    after: Optional[str] = None,
+    current_user: Dict[str, int] = Depends(login_required),
+):
+    records = await account_service.read_by_user(current_user["user_id"], limit=limit, after=after)
+    cursor = next_id_cursor(records, limit)
+    headers = {"X-Next-Cursor": cursor} if cursor else None
+    return ModelJSONResponse(record_dicts(records), account_list_adapter, headers=headers)
+
+
+@router.get(
+    "/all",
+    response_model=List[AccountOut],
+    response_class=ModelJSONResponse,
+    responses=account_page_responses,
+    dependencies=[Depends(admin_required)],
+)
+async def read_all_accounts(limit: int, skip: int = 0, after: Optional[str] = None):
+    records = await account_service.read_all(limit=limit, skip=skip, after=after)
+    cursor = next_id_cursor(records, limit)
+    headers = {"X-Next-Cursor": cursor} if cursor else None
+    return ModelJSONResponse(record_dicts(records), account_list_adapter, headers=headers)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=AccountOut)
@@ -23,6 +72,101 @@ async def create_account(account: AccountIn):
     return await account_service.create(account)
 
 
-@router.get("/{id}/transactions", response_model=List[TransactionOut])
-async def read_account_transactions(id: int, limit: int, skip: int = 0):
-    return await tx_service.read_all(account_id=id, limit=limit, skip=skip)
\ No newline at end of file
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=List[AccountOut])
+async def create_accounts_bulk(batch: AccountBulkIn):
+    return await account_service.create_many(batch.accounts)
+
+
+@router.post(
+    "/bulk/stream",
+    status_code=status.HTTP_201_CREATED,
+    response_class=DuplexStreamingResponse,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string", "description": "One `AccountIn` JSON object per line."}}},
+    }},
+)
+async def import_accounts(request: Request):
+    return DuplexStreamingResponse(
+        account_service.import_ndjson(request.stream()),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/{id}/balance", response_model=BalanceOut)
+async def read_account_balance(id: int, at: Optional[datetime] = None):
+    if at is None:
+        return {"account_id": id, "balance": await balance_service.read(id)}
+    return {"account_id": id, "balance": await balance_service.read_at(id, at), "at": at}
+
+
+@router.get("/{id}/summary", response_model=AccountSummaryOut)
+async def read_account_summary(
+    id: int,
+    granularity: SummaryGranularity = SummaryGranularity.DAY,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    await account_service.read(id)
+    periods = await rollup_service.read_summary(id, granularity, start=start, end=end)
+    return {"account_id": id, "granularity": granularity.value, "periods": periods}
+
+
+@router.get(
+    "/{id}/transactions",
+    response_model=List[TransactionOut],
+    response_class=ModelJSONResponse,
+    responses={200: {"headers": {"X-Next-Cursor": {"description": "Cursor for the next page, sent as `after`.", "schema": {"type": "string"}}}}},
+)
+async def read_account_transactions(
+    id: int, limit: int, skip: int = 0, after: Optional[str] = None, start: Optional[datetime] = None
+):
+    records = await tx_service.read_all(account_id=id, limit=limit, skip=skip, after=after, start=start)
+    cursor = next_cursor(records, limit)
+    headers = {"X-Next-Cursor": cursor} if cursor else None
+    return ModelJSONResponse(record_dicts(records), transaction_list_adapter, headers=headers)
+
+
+@router.get("/{id}/transactions/export", response_class=StreamingResponse)
+async def export_account_transactions(
+    id: int,
+    format: ExportFormat = ExportFormat.NDJSON,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    await account_service.read(id)
+    return StreamingResponse(
+        export_service.stream(account_id=id, format=format, start=start, end=end),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="account-{id}-transactions.{format.value}"'},
+    )
+
+
+def last_event_id_header(last_event_id: Optional[str] = Header(default=None)) -> Optional[str]:
+    return last_event_id
+
+
+@router.get(
+    "/{id}/transactions/stream",
+    response_class=StreamingResponse,
+    responses={200: {
+        "description": "Server-sent events, one `transaction` event per committed transaction; the event id is a cursor.",
+        "content": {"text/event-stream": {"schema": {"type": "string"}}},
+    }},
+)
+async def stream_account_transactions(
+    id: int,
+    since: Optional[str] = None,
+    last_event_id: Annotated[Optional[str], Depends(last_event_id_header)] = None,
+):
+    await account_service.read(id)
+    # A reconnecting EventSource sends the last id it saw, which is newer than ``since``
+    cursor = last_event_id or since
+    if cursor:
+        decode_cursor(cursor)
+    return StreamingResponse(
+        feed_service.stream(id, since=cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,10 @@
-from fastapi import APIRouter
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response, status
 
 from src.schemas.auth import LoginIn
-from src.security import sign_jwt
+from src.security import JWTBearer, JWTToken, sign_jwt
+from src.service.revocation import revocation_store
 from src.views.auth import LoginOut
 
 router = APIRouter(prefix="/auth")
@@ -9,4 +12,11 @@ router = APIRouter(prefix="/auth")
 
 @router.post("/login", response_model=LoginOut)
 async def login(data: LoginIn):
-    return sign_jwt(user_id=data.user_id)
\ No newline at end of file
+    return sign_jwt(user_id=data.user_id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: Annotated[JWTToken, Depends(JWTBearer())]):
+    # The verified-token cache is consulted before the revocation check, so it needs no eviction
+    await revocation_store.revoke(token.access_token.jti, token.access_token.exp)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,74 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.database import pool_stats, replicas
+from src.metrics import registry
+from src.ratelimit import read_limiter, write_limiter
+from src.security import token_cache
+from src.service.admission import create_admission
+from src.service.balance import balance_cache
+from src.service.export import ExportService
+from src.service.feed import transaction_feed
+from src.service.group_commit import group_committer
+from src.service.outbox import outbox_dispatcher
+from src.service.revocation import revocation_store
+from src.service.sequencer import account_sequencer
+
+router = APIRouter()
+
+
+def collect_components():
+    for name, cache in (("token_cache", token_cache), ("balance_cache", balance_cache)):
+        yield f"{name}_hits_total", "counter", {}, cache.hits
+        yield f"{name}_misses_total", "counter", {}, cache.misses
+        yield f"{name}_entries", "gauge", {}, len(cache)
+
+    yield "token_revocation_checks_total", "counter", {}, revocation_store.checks
+    yield "token_revocation_filter_hits_total", "counter", {}, revocation_store.filter_hits
+    yield "token_revocation_false_positives_total", "counter", {}, revocation_store.false_positives
+    yield "token_revocation_filters", "gauge", {}, len(revocation_store.filter)
+    yield "token_revocation_filter_fill_ratio", "gauge", {}, max(revocation_store.filter.fill_ratios().values(), default=0.0)
+
+    yield "export_rows_streamed_total", "counter", {}, ExportService.rows_streamed
+    yield "feed_subscribers", "gauge", {}, transaction_feed.subscriber_count()
+
+    for budget, limiter in (("read", read_limiter), ("write", write_limiter)):
+        if limiter.enabled:
+            yield "rate_limit_allowed_total", "counter", {"budget": budget}, limiter.allowed
+            yield "rate_limit_rejected_total", "counter", {"budget": budget}, limiter.rejected
+            yield "rate_limit_tracked_users", "gauge", {"budget": budget}, len(limiter)
+
+    if create_admission.limit > 0:
+        yield "transaction_create_in_flight", "gauge", {}, create_admission.in_flight
+        yield "transaction_create_waiting", "gauge", {}, create_admission.waiting
+        yield "transaction_create_shed_total", "counter", {}, create_admission.shed
+        yield "transaction_create_queue_wait_seconds", "histogram", {}, create_admission.wait_times
+
+    yield "account_sequencer_peak_depth", "gauge", {}, account_sequencer.peak_depth
+    for account_id, depth in account_sequencer.queue_depths(min_depth=2).items():
+        yield "account_sequencer_queue_depth", "gauge", {"account_id": account_id}, depth
+
+    yield "group_commit_batch_size", "histogram", {}, group_committer.batch_sizes
+    yield "group_commit_wait_seconds", "histogram", {}, group_committer.wait_times
+
+    if replicas.replicas:
+        yield "db_replicas_healthy", "gauge", {}, len(replicas.healthy())
+
+    if outbox_dispatcher.sink is not None:
+        yield "outbox_pending_age_seconds", "gauge", {}, outbox_dispatcher.pending_age
+        yield "outbox_delivery_lag_seconds", "histogram", {}, outbox_dispatcher.delivery_lag
+
+    stats = pool_stats()
+    if stats:
+        for key in ("size", "idle", "in_use", "waiters"):
+            yield f"db_pool_{key}", "gauge", {}, stats[key]
+        yield "db_pool_acquire_timeouts_total", "counter", {}, stats["timeouts"]
+        yield "db_pool_acquire_wait_seconds", "histogram", {}, stats["acquire_wait"]
+
+
+registry.register_collector(collect_components)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
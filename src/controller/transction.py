@@ -1,15 +1,63 @@
-from fastapi import APIRouter, Depends, status
+from typing import Annotated, Dict, Optional
 
-from src.schemas.transaction import TransactionIn
+from fastapi import APIRouter, Depends, Header, Request, status
+from fastapi.responses import JSONResponse
+
+from src.ratelimit import charge, rate_limit
+from src.schemas.transaction import TransactionBatchIn, TransactionIn
 from src.security import login_required
+from src.service.idempotency import fingerprint, idempotency_store
 from src.service.transaction import TransactionService
-from src.views.transaction import TransactionOut
+from src.views.transaction import TransactionBatchOut, TransactionOut
 
 router = APIRouter(prefix="/transactions", dependencies=[Depends(login_required)])
 
 service = TransactionService()
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED, response_model=TransactionOut)
-async def create_transaction(transaction: TransactionIn):
-    return await service.create(transaction)
\ No newline at end of file
+def idempotency_key_header(idempotency_key: Optional[str] = Header(default=None, max_length=255)) -> Optional[str]:
+    return idempotency_key
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=TransactionOut,
+    dependencies=[Depends(rate_limit)],
+    responses={201: {"headers": {"Idempotent-Replayed": {"description": "Present when the response is a replay of an earlier request with the same `Idempotency-Key`.", "schema": {"type": "string"}}}}},
+)
+async def create_transaction(
+    transaction: TransactionIn,
+    idempotency_key: Annotated[Optional[str], Depends(idempotency_key_header)] = None,
+    current_user: Dict[str, int] = Depends(login_required),
+):
+    if idempotency_key is None:
+        return await service.create(transaction)
+
+    def response_body(record) -> Dict:
+        return TransactionOut.model_validate(record, from_attributes=True).model_dump(mode="json")
+
+    async def execute(save):
+        # The key is stored in the write's own transaction
+        record = await service.create(transaction, in_transaction=lambda record: save(response_body(record)))
+        return response_body(record)
+
+    response, replayed = await idempotency_store.run(
+        (current_user["user_id"], idempotency_key),
+        fingerprint(transaction.model_dump_json()),
+        execute,
+    )
+    if replayed:
+        return JSONResponse(response, status_code=status.HTTP_201_CREATED, headers={"Idempotent-Replayed": "true"})
+    return response
+
+
+@router.post("/batch", response_model=TransactionBatchOut)
+async def create_transactions_batch(
+    batch: TransactionBatchIn,
+    request: Request,
+    current_user: Dict[str, int] = Depends(login_required),
+):
+    # Charged once the body is parsed: a batch spends one write token per transaction
+    charge(request.method, current_user["user_id"], cost=len(batch.transactions))
+    return await service.create_batch(batch)
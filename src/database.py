@@ -1,12 +1,227 @@
+import asyncio
+import itertools
+import logging
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
 import databases
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql.base import PGCompiler
+from sqlalchemy.dialects.sqlite.base import SQLiteCompiler
 
 from src.config import settings
+from src.exceptions import DatabaseUnavailableError
+from src.metrics import Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def pool_options(url: str) -> Dict[str, Any]:
+    # Only asyncpg has a pool; the other backends reject these keywords
+    if databases.DatabaseURL(url).dialect != "postgresql":
+        return {}
+    return {
+        "min_size": settings.db_pool_min_size,
+        "max_size": settings.db_pool_max_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+        "max_queries": settings.db_pool_max_queries,
+        "max_inactive_connection_lifetime": settings.db_pool_max_inactive_lifetime,
+    }
+
 
-database = databases.Database(settings.database_url)
 metadata = sa.MetaData()
 
-if settings.environment == "production":
-    engine = sa.create_engine(settings.database_url)
-else:
-    engine = sa.create_engine(settings.database_url, connect_args={"check_same_thread": False})
\ No newline at end of file
+dialect = databases.DatabaseURL(settings.database_url).dialect
+# INSERT/UPDATE ... RETURNING saves the read-back after a write
+supports_returning = dialect == "postgresql" or (dialect == "sqlite" and sqlite3.sqlite_version_info >= (3, 35))
+# Several writes can be chained in one ``WITH ... RETURNING`` statement on Postgres only
+supports_writable_cte = dialect == "postgresql"
+
+
+# SQLite has RETURNING since 3.35, but SQLAlchemy 1.4 only renders it for other dialects
+class SQLiteReturningCompiler(SQLiteCompiler):
+    returning_clause = PGCompiler.returning_clause
+
+
+def build_database(url: str) -> databases.Database:
+    database = databases.Database(url, **pool_options(url))
+    if database.url.dialect == "sqlite" and sqlite3.sqlite_version_info >= (3, 35):
+        database._backend._dialect.statement_compiler = SQLiteReturningCompiler
+    return database
+
+
+# Stands in for a ``databases.Database`` that is built on first use, so importing
+# this module neither loads a driver nor sets up a backend
+class LazyDatabase:
+    def __init__(self, url: Optional[str] = None):
+        # ``None`` follows ``settings.database_url`` as it is when first used
+        self._url = url
+        self._database: Optional[databases.Database] = None
+
+    @property
+    def url(self) -> databases.DatabaseURL:
+        return databases.DatabaseURL(self._url or settings.database_url)
+
+    def resolve(self) -> databases.Database:
+        if self._database is None:
+            self._database = build_database(str(self.url))
+        return self._database
+
+    def transaction(self, *, force_rollback: bool = False, **kwargs: Any) -> databases.core.Transaction:
+        # Applied as a decorator at import time; the connection is looked up per call
+        return databases.core.Transaction(
+            lambda: self.resolve().connection(), force_rollback=force_rollback, **kwargs
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+
+database = LazyDatabase()
+
+
+class InstrumentedPool:
+    def __init__(self, pool, acquire_timeout: float):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.in_use = 0
+        self.waiters = 0
+        self.timeouts = 0
+        self.acquire_wait = Histogram()
+
+    async def acquire(self):
+        self.waiters += 1
+        started = time.perf_counter()
+        try:
+            connection = await self._pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise DatabaseUnavailableError(retry_after=self.acquire_timeout)
+        finally:
+            self.waiters -= 1
+            self.acquire_wait.observe(time.perf_counter() - started)
+        self.in_use += 1
+        return connection
+
+    async def release(self, connection, *args, **kwargs):
+        self.in_use -= 1
+        return await self._pool.release(connection, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "in_use": self.in_use,
+            "waiters": self.waiters,
+            "timeouts": self.timeouts,
+            "acquire_wait": self.acquire_wait,
+        }
+
+    def __getattr__(self, name: str):
+        return getattr(self._pool, name)
+
+
+class ReplicaRouter:
+    def __init__(self, primary: databases.Database, replicas: List[databases.Database], eject_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.eject_seconds = eject_seconds
+        self.ejected_until: Dict[int, float] = {}
+        self._next = itertools.cycle(range(len(replicas)))
+
+    def healthy(self) -> List[databases.Database]:
+        now = time.monotonic()
+        return [replica for index, replica in enumerate(self.replicas) if self.ejected_until.get(index, 0) <= now]
+
+    async def run(self, read: Callable[[databases.Database], Awaitable[T]]) -> T:
+        # Replicas lag the primary: only route reads that tolerate slightly stale data.
+        # Every query of ``read`` goes to the same node, so it sees one consistent state.
+        index = self.__pick()
+        if index is None:
+            return await read(self.primary)
+        replica = self.replicas[index]
+        try:
+            if not replica.is_connected:
+                await replica.connect()
+            return await read(replica)
+        except Exception as exc:
+            # Raises too if the read itself is at fault, keeping the replica in rotation
+            result = await read(self.primary)
+            self.__eject(index, exc)
+            return result
+
+    async def fetch_all(self, query: Any) -> List[Any]:
+        return await self.run(lambda db: db.fetch_all(query))
+
+    async def fetch_one(self, query: Any) -> Optional[Any]:
+        return await self.run(lambda db: db.fetch_one(query))
+
+    async def fetch_val(self, query: Any) -> Any:
+        return await self.run(lambda db: db.fetch_val(query))
+
+    async def connect(self) -> None:
+        for index, replica in enumerate(self.replicas):
+            try:
+                await replica.connect()
+            except Exception as exc:
+                # Startup does not depend on replicas; reads fall back to the primary
+                self.__eject(index, exc)
+
+    async def disconnect(self) -> None:
+        for replica in self.replicas:
+            if replica.is_connected:
+                await replica.disconnect()
+
+    def __pick(self) -> Optional[int]:
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            index = next(self._next)
+            if self.ejected_until.get(index, 0) <= now:
+                return index
+        return None
+
+    def __eject(self, index: int, exc: Exception) -> None:
+        # Passive health check: the replica is tried again once the window passes
+        self.ejected_until[index] = time.monotonic() + self.eject_seconds
+        registry.inc("db_replica_ejections_total", {"replica": index})
+        logger.warning("Ejecting read replica %d for %.0fs: %r", index, self.eject_seconds, exc)
+
+
+replicas = ReplicaRouter(
+    database,
+    [LazyDatabase(url) for url in settings.database_replica_urls],
+    settings.database_replica_eject_seconds,
+)
+
+
+async def connect() -> None:
+    await database.connect()
+    # ``databases`` does not expose pool hooks; wrap the asyncpg pool it created
+    if dialect == "postgresql":
+        backend = database._backend
+        backend._pool = InstrumentedPool(backend._pool, settings.db_pool_acquire_timeout)
+    await replicas.connect()
+
+
+async def disconnect() -> None:
+    await replicas.disconnect()
+    await database.disconnect()
+
+
+def pool_stats() -> Dict[str, Any]:
+    pool = getattr(database._backend, "_pool", None)
+    if isinstance(pool, InstrumentedPool):
+        return pool.stats()
+    return {}
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> sa.engine.Engine:
+    # Only needed for schema tooling; built on first use instead of at import
+    if settings.environment == "production":
+        return sa.create_engine(settings.database_url)
+    return sa.create_engine(settings.database_url, connect_args={"check_same_thread": False})
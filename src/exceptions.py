@@ -55,4 +55,39 @@ class InvalidAmountError(BusinessError):
 class InvalidTransactionError(BusinessError):
     def __init__(self, message: str = "Invalid transaction."):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+
+class InvalidCursorError(Exception):
+    def __init__(self, cursor: Optional[str] = None):
+        self.cursor = cursor
+        self.message = "Invalid pagination cursor."
+        super().__init__(self.message)
+
+
+class DatabaseUnavailableError(Exception):
+    def __init__(self, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        self.message = "Database is busy. Try again later."
+        super().__init__(self.message)
+
+
+class IdempotencyKeyReusedError(Exception):
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.message = "Idempotency-Key was already used with a different request body."
+        super().__init__(self.message)
+
+
+class RateLimitExceededError(Exception):
+    def __init__(self, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        self.message = "Rate limit exceeded. Try again later."
+        super().__init__(self.message)
+
+
+class ServiceOverloadedError(Exception):
+    def __init__(self, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        self.message = "Server is busy. Try again later."
+        super().__init__(self.message)
@@ -1,26 +1,87 @@
+import asyncio
+import logging
+import math
+import os
+import time
 from contextlib import asynccontextmanager
+from functools import partial
+from typing import Dict, Optional
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from src.controllers import account, auth, transaction
-from src.database import database
+from src.config import Settings, configure
 from src.exceptions import (
     AccountNotFoundError,
     BusinessError,
+    DatabaseUnavailableError,
+    IdempotencyKeyReusedError,
     InsufficientBalanceError,
     InvalidAmountError,
+    InvalidCursorError,
     InvalidTransactionError,
+    RateLimitExceededError,
+    ServiceOverloadedError,
     TransactionNotFoundError,
 )
+from src.metrics import MetricsMiddleware, registry
 
+logger = logging.getLogger(__name__)
+
+# Cold starts are measured from here unless the caller knows an earlier origin
+IMPORTED_AT = time.time()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await database.connect()
+    # Already loaded by the routers; imported here so that importing this module stays cheap
+    from src.background import run_periodically
+    from src.config import settings
+    from src.database import connect, disconnect
+    from src.service.archive import ArchiveService
+    from src.service.balance import BalanceService
+    from src.service.feed import transaction_feed
+    from src.service.group_commit import group_committer
+    from src.service.idempotency import idempotency_store
+    from src.service.outbox import outbox_dispatcher
+    from src.service.revocation import revocation_store
+
+    await connect()
+    background = []
+    if settings.balance_checkpoint_interval > 0:
+        background.append(asyncio.create_task(run_periodically(
+            BalanceService().create_checkpoints, settings.balance_checkpoint_interval, "Balance checkpoint run"
+        )))
+    if settings.transaction_archive_interval > 0:
+        background.append(asyncio.create_task(run_periodically(
+            partial(ArchiveService().archive, settings.transaction_archive_chunk_size),
+            settings.transaction_archive_interval,
+            "Transaction archival run",
+        )))
+    if transaction_feed.broadcast is not None:
+        background.append(asyncio.create_task(transaction_feed.broadcast.listen(transaction_feed.deliver)))
+    if outbox_dispatcher.sink is not None:
+        background.append(asyncio.create_task(outbox_dispatcher.run()))
+    # Runs at once so a new worker picks up the revocations made before it started
+    background.append(asyncio.create_task(run_periodically(
+        revocation_store.maintain,
+        settings.token_revocation_sync_interval,
+        "Token revocation maintenance",
+        run_first=True,
+    )))
+    if idempotency_store.persist:
+        background.append(asyncio.create_task(run_periodically(
+            idempotency_store.purge_expired, settings.idempotency_key_ttl, "Idempotency key purge"
+        )))
+
+    cold_start = time.time() - app.state.started_at
+    registry.observe("app_cold_start_seconds", {}, cold_start)
+    logger.info("Worker %d ready in %.3fs", os.getpid(), cold_start)
     yield
-    await database.disconnect()
+    for task in background:
+        task.cancel()
+    await group_committer.drain()
+    await disconnect()
 
 
 tags_metadata = [
@@ -39,11 +100,20 @@ tags_metadata = [
 ]
 
 
-app = FastAPI(
-    title="Transactions API",
-    version="1.0.0",
-    summary="Microservice to maintain withdrawal and deposit operations from current accounts.",
-    description="""
+def create_app(app_settings: Optional[Settings] = None, started_at: Optional[float] = None) -> FastAPI:
+    # Settings can only differ from the environment on the first app of a process,
+    # before the routers below have built their components from them
+    if app_settings is not None:
+        configure(app_settings)
+    # The routers pull in the services, models and database layer: load them per app, not per import
+    from src.controller import account, auth, metrics
+    from src.controller import transction as transaction
+
+    app = FastAPI(
+        title="Transactions API",
+        version="1.0.0",
+        summary="Microservice to maintain withdrawal and deposit operations from current accounts.",
+        description="""
 Transactions API is the microservice for recording current account transactions. 💸💰
 
 ## Account
@@ -56,67 +126,116 @@ Transactions API is the microservice for recording current account transactions.
 
 * **Create transactions**.
 """,
-    openapi_tags=tags_metadata,
-    redoc_url=None,
-    lifespan=lifespan,
-)
+        openapi_tags=tags_metadata,
+        redoc_url=None,
+        lifespan=lifespan,
+    )
+    app.state.started_at = started_at or IMPORTED_AT
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    app.include_router(auth.router, tags=["auth"])
+    app.include_router(account.router, tags=["account"])
+    app.include_router(transaction.router, tags=["transaction"])
+    app.include_router(metrics.router)
 
-app.include_router(auth.router, tags=["auth"])
-app.include_router(account.router, tags=["account"])
-app.include_router(transaction.router, tags=["transaction"])
+    app.add_middleware(MetricsMiddleware)
 
+    for exc_class, handler in exception_handlers.items():
+        app.add_exception_handler(exc_class, handler)
+    return app
 
-@app.exception_handler(AccountNotFoundError)
-async def account_not_found_error_handler(request: Request, exc: AccountNotFoundError):
+
+def __getattr__(name: str):
+    # ``uvicorn src.main:app`` keeps working: the app is built on first access
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def error_response(exc: Exception, status_code: int, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    registry.inc("domain_errors_total", {"error": type(exc).__name__})
     return JSONResponse(
-        status_code=status.HTTP_404_NOT_FOUND,
-        content={"detail": str(exc)}
+        status_code=status_code,
+        content={"detail": str(exc)},
+        headers=headers,
     )
 
 
-@app.exception_handler(TransactionNotFoundError)
+async def account_not_found_error_handler(request: Request, exc: AccountNotFoundError):
+    return error_response(exc, status.HTTP_404_NOT_FOUND)
+
+
 async def transaction_not_found_error_handler(request: Request, exc: TransactionNotFoundError):
-    return JSONResponse(
-        status_code=status.HTTP_404_NOT_FOUND,
-        content={"detail": str(exc)}
-    )
+    return error_response(exc, status.HTTP_404_NOT_FOUND)
 
 
-@app.exception_handler(InsufficientBalanceError)
 async def insufficient_balance_error_handler(request: Request, exc: InsufficientBalanceError):
-    return JSONResponse(
-        status_code=status.HTTP_409_CONFLICT,
-        content={"detail": str(exc)}
-    )
+    return error_response(exc, status.HTTP_409_CONFLICT)
 
 
-@app.exception_handler(InvalidAmountError)
 async def invalid_amount_error_handler(request: Request, exc: InvalidAmountError):
-    return JSONResponse(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        content={"detail": str(exc)}
-    )
+    return error_response(exc, status.HTTP_400_BAD_REQUEST)
 
 
-@app.exception_handler(InvalidTransactionError)
 async def invalid_transaction_error_handler(request: Request, exc: InvalidTransactionError):
-    return JSONResponse(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        content={"detail": str(exc)}
+    return error_response(exc, status.HTTP_400_BAD_REQUEST)
+
+
+async def invalid_cursor_error_handler(request: Request, exc: InvalidCursorError):
+    return error_response(exc, status.HTTP_400_BAD_REQUEST)
+
+
+async def idempotency_key_reused_error_handler(request: Request, exc: IdempotencyKeyReusedError):
+    return error_response(exc, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+async def database_unavailable_error_handler(request: Request, exc: DatabaseUnavailableError):
+    return error_response(
+        exc,
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(math.ceil(exc.retry_after or 1))},
+    )
+
+
+async def rate_limit_exceeded_error_handler(request: Request, exc: RateLimitExceededError):
+    return error_response(
+        exc,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(math.ceil(exc.retry_after or 1))},
+    )
+
+
+async def service_overloaded_error_handler(request: Request, exc: ServiceOverloadedError):
+    return error_response(
+        exc,
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(math.ceil(exc.retry_after or 1))},
     )
 
 
-@app.exception_handler(BusinessError)
 async def business_error_handler(request: Request, exc: BusinessError):
-    return JSONResponse(
-        status_code=status.HTTP_409_CONFLICT,
-        content={"detail": str(exc)}
-    )
\ No newline at end of file
+    return error_response(exc, status.HTTP_409_CONFLICT)
+
+
+exception_handlers = {
+    AccountNotFoundError: account_not_found_error_handler,
+    TransactionNotFoundError: transaction_not_found_error_handler,
+    InsufficientBalanceError: insufficient_balance_error_handler,
+    InvalidAmountError: invalid_amount_error_handler,
+    InvalidTransactionError: invalid_transaction_error_handler,
+    InvalidCursorError: invalid_cursor_error_handler,
+    IdempotencyKeyReusedError: idempotency_key_reused_error_handler,
+    DatabaseUnavailableError: database_unavailable_error_handler,
+    RateLimitExceededError: rate_limit_exceeded_error_handler,
+    ServiceOverloadedError: service_overloaded_error_handler,
+    BusinessError: business_error_handler,
+}
@@ -0,0 +1,187 @@
+import functools
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+# Upper bounds in seconds, shared by latency-style histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+T = TypeVar("T")
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # One slot per upper bound plus the implicit +Inf bucket
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"count": self.count, "sum": self.sum, "buckets": self.cumulative()}
+
+
+def _labels(labels: Optional[Dict[str, object]]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in (labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = defaultdict(dict)
+        # Callables sampled at scrape time for values owned by other components
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, object], object]]]] = []
+
+    def inc(self, name: str, labels: Optional[Dict[str, object]] = None, amount: float = 1) -> None:
+        self._counters[name][_labels(labels)] += amount
+
+    def observe(self, name: str, labels: Dict[str, object], value: float) -> None:
+        series = self._histograms[name]
+        key = _labels(labels)
+        if key not in series:
+            series[key] = Histogram()
+        series[key].observe(value)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, object]] = None) -> Histogram:
+        return self._histograms[name].get(_labels(labels)) or Histogram()
+
+    def register_collector(
+        self, collector: Callable[[], Iterable[Tuple[str, str, Dict[str, object], object]]]
+    ) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, series in sorted(self._counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(series.items()):
+                lines.extend(render_histogram(name, labels, histogram))
+
+        samples: Dict[Tuple[str, str], List[Tuple[Labels, object]]] = defaultdict(list)
+        for collector in self._collectors:
+            for name, kind, labels, value in collector():
+                samples[(name, kind)].append((_labels(labels), value))
+        for (name, kind), values in sorted(samples.items()):
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values:
+                if isinstance(value, Histogram):
+                    lines.extend(render_histogram(name, labels, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def render_histogram(name: str, labels: Labels, histogram: Histogram) -> List[str]:
+    lines = []
+    for bound, count in histogram.cumulative():
+        bucket_labels = labels + (("le", _format_value(float(bound))),)
+        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return lines
+
+
+registry = Registry()
+
+
+def timed(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    service, _, method = func.__qualname__.rpartition(".")
+    service = service or func.__module__.rpartition(".")[2]
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            registry.observe(
+                "service_call_duration_seconds",
+                {"service": service, "method": method, "outcome": outcome},
+                time.perf_counter() - started,
+            )
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the shared scope; using its
+            # path template keeps label cardinality bounded
+            route = scope.get("route")
+            registry.observe(
+                "http_request_duration_seconds",
+                {
+                    "method": scope["method"],
+                    "route": getattr(route, "path", "unmatched"),
+                    "status": status_code,
+                },
+                time.perf_counter() - started,
+            )
@@ -6,7 +6,9 @@ accounts = sa.Table(
     "accounts",
     metadata,
     sa.Column("id", sa.Integer, primary_key=True),
-    sa.Column("user_id", sa.Integer, nullable=False, index=True),
+    sa.Column("user_id", sa.Integer, nullable=False),
     sa.Column("balance", sa.Numeric(10, 2), nullable=False, default=0),
     sa.Column("created_at", sa.TIMESTAMP(timezone=True), default=sa.func.now()),
+    # Serves lookups by user and keyset pages of a user's accounts in id order
+    sa.Index("ix_accounts_user_id_id", "user_id", "id"),
 )
\ No newline at end of file
@@ -0,0 +1,17 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+from src.models.transaction import TransactionType
+
+# Per-period totals kept current by every ledger write; ``granularity`` is "day" or "month"
+account_rollups = sa.Table(
+    "account_rollups",
+    metadata,
+    sa.Column("account_id", sa.Integer, sa.ForeignKey("accounts.id"), nullable=False),
+    sa.Column("granularity", sa.String(5), nullable=False),
+    sa.Column("period_start", sa.Date, nullable=False),
+    sa.Column("type", sa.Enum(TransactionType, name="transaction_types"), nullable=False),
+    sa.Column("total", sa.Numeric(14, 2), nullable=False, default=0),
+    sa.Column("count", sa.Integer, nullable=False, default=0),
+    sa.PrimaryKeyConstraint("account_id", "granularity", "period_start", "type"),
+)
@@ -0,0 +1,14 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+from src.models.transaction import Timestamp
+
+balance_checkpoints = sa.Table(
+    "balance_checkpoints",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("account_id", sa.Integer, sa.ForeignKey("accounts.id"), nullable=False),
+    sa.Column("as_of", Timestamp, nullable=False, default=sa.func.now()),
+    sa.Column("balance", sa.Numeric(10, 2), nullable=False),
+    sa.Index("ix_balance_checkpoints_account_id_as_of", "account_id", "as_of"),
+)
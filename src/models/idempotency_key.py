@@ -0,0 +1,15 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+from src.models.transaction import Timestamp
+
+idempotency_keys = sa.Table(
+    "idempotency_keys",
+    metadata,
+    sa.Column("user_id", sa.Integer, primary_key=True),
+    sa.Column("key", sa.String(255), primary_key=True),
+    sa.Column("fingerprint", sa.String(64), nullable=False),
+    sa.Column("response", sa.JSON, nullable=False),
+    sa.Column("created_at", Timestamp, default=sa.func.now()),
+    sa.Column("expires_at", Timestamp, nullable=False, index=True),
+)
@@ -0,0 +1,17 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+from src.models.transaction import Timestamp
+
+# Events committed with the writes they describe; delivered rows are deleted.
+# ``available_at`` is when the dispatcher may (re)claim the row.
+outbox_events = sa.Table(
+    "outbox_events",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("topic", sa.String(64), nullable=False),
+    sa.Column("payload", sa.JSON, nullable=False),
+    sa.Column("created_at", Timestamp, default=sa.func.now()),
+    sa.Column("available_at", Timestamp, default=sa.func.now(), index=True),
+    sa.Column("attempts", sa.Integer, nullable=False, server_default=sa.text("0")),
+)
@@ -0,0 +1,13 @@
+import sqlalchemy as sa
+
+from src.database import metadata
+from src.models.transaction import Timestamp
+
+# Tokens revoked before their ``exp``; rows are purged once the token would have expired anyway
+revoked_tokens = sa.Table(
+    "revoked_tokens",
+    metadata,
+    sa.Column("jti", sa.String(64), primary_key=True),
+    sa.Column("expires_at", Timestamp, nullable=False, index=True),
+    sa.Column("revoked_at", Timestamp, default=sa.func.now(), index=True),
+)
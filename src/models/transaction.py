@@ -1,17 +1,40 @@
 from enum import Enum
 import sqlalchemy as sa
+from sqlalchemy.dialects import sqlite
 from src.database import metadata
 
 class TransactionType(str, Enum):
     DEPOSIT = "deposit"
     WITHDRAWAL = "withdrawal"
 
+# SQLite stores now() as "YYYY-MM-DD HH:MM:SS"; bind timestamps in the same format
+# so keyset comparisons against stored values stay exact.
+Timestamp = sa.TIMESTAMP(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+def ledger_columns():
+    return [
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("account_id", sa.Integer, sa.ForeignKey("accounts.id"), nullable=False),
+        sa.Column("type", sa.Enum(TransactionType, name="transaction_types"), nullable=False),
+        sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("timestamp", Timestamp, default=sa.func.now()),
+    ]
+
+
 transactions = sa.Table(
     "transactions",
     metadata,
-    sa.Column("id", sa.Integer, primary_key=True),
-    sa.Column("account_id", sa.Integer, sa.ForeignKey("accounts.id"), nullable=False),
-    sa.Column("type", sa.Enum(TransactionType, name="transaction_types"), nullable=False),
-    sa.Column("amount", sa.Numeric(10, 2), nullable=False),
-    sa.Column("timestamp", sa.TIMESTAMP(timezone=True), default=sa.func.now()),
-)
\ No newline at end of file
+    *ledger_columns(),
+    sa.Index("ix_transactions_account_id_timestamp_id", "account_id", "timestamp", "id"),
+)
+
+# Cold tier: rows past the archive horizon, moved here with their ids by ArchiveService
+transactions_archive = sa.Table(
+    "transactions_archive",
+    metadata,
+    *ledger_columns(),
+    sa.Index("ix_transactions_archive_account_id_timestamp_id", "account_id", "timestamp", "id"),
+)
@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from databases.interfaces import Record
+
+from src.exceptions import InvalidCursorError
+
+Cursor = Tuple[datetime, int]
+
+
+def _encode(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Any:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def encode_cursor(timestamp: datetime, id: int) -> str:
+    return _encode([timestamp.isoformat(), id])
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        timestamp, id = _decode(cursor)
+        return datetime.fromisoformat(timestamp), int(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidCursorError(cursor=cursor)
+
+
+def next_cursor(records: Sequence[Record], limit: int) -> Optional[str]:
+    if not records or len(records) < limit:
+        return None
+    last = records[-1]
+    return encode_cursor(last.timestamp, last.id)
+
+
+# Cursors for listings ordered by ``id`` alone
+def encode_id_cursor(id: int) -> str:
+    return _encode([id])
+
+
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        (id,) = _decode(cursor)
+        return int(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidCursorError(cursor=cursor)
+
+
+def next_id_cursor(records: Sequence[Record], limit: int) -> Optional[str]:
+    if not records or len(records) < limit:
+        return None
+    return encode_id_cursor(records[-1].id)
@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+
+try:
+    from typing import Annotated
+except ImportError:
+    from typing_extensions import Annotated
+
+from fastapi import Depends, Request
+
+from src.config import settings
+from src.exceptions import RateLimitExceededError
+from src.security import get_current_user
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+# Token bucket per key: ``burst`` tokens refilled at ``rate`` per second.
+class RateLimiter:
+    def __init__(self, rate: float, burst: float, maxsize: int):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self.allowed = 0
+        self.rejected = 0
+        # key -> (tokens, last refill); least recently seen keys are evicted first
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> float:
+        # Returns 0 when admitted, otherwise the seconds until ``cost`` tokens are available
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+            self.allowed += 1
+        else:
+            wait = (cost - tokens) / self.rate
+            self.rejected += 1
+        self._buckets[key] = (tokens, now)
+        # An evicted key comes back with a full bucket, so keep maxsize above the active users
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+read_limiter = RateLimiter(settings.rate_limit_read_rate, settings.rate_limit_read_burst, settings.rate_limit_max_users)
+write_limiter = RateLimiter(settings.rate_limit_write_rate, settings.rate_limit_write_burst, settings.rate_limit_max_users)
+
+
+def charge(method: str, user_id: int, cost: float = 1.0) -> None:
+    limiter = read_limiter if method in READ_METHODS else write_limiter
+    if not limiter.enabled:
+        return
+    # A cost above the burst could never be paid in full: it waits for a full bucket instead
+    retry_after = limiter.acquire(user_id, min(cost, limiter.burst))
+    if retry_after:
+        raise RateLimitExceededError(retry_after)
+
+
+async def rate_limit(
+    request: Request,
+    current_user: Annotated[Dict[str, int], Depends(get_current_user)],
+) -> None:
+    charge(request.method, current_user["user_id"])
@@ -0,0 +1,41 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from databases.interfaces import Record
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+# StreamingResponse listens on ``receive`` for a disconnect while it streams, which
+# swallows any request body still in flight. This variant leaves ``receive`` to the
+# body iterator, so a response can be produced while the request is still being read.
+class DuplexStreamingResponse(StreamingResponse):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+# Validates and encodes in a single pydantic-core pass straight to bytes, skipping
+# FastAPI's response_model round trip through jsonable_encoder and json.dumps. Routes
+# keep ``response_model`` so the OpenAPI schema is unchanged.
+class ModelJSONResponse(JSONResponse):
+    def __init__(
+        self,
+        content: Any,
+        adapter: TypeAdapter,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        self.adapter = adapter
+        super().__init__(content, status_code, headers, None, background)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(content))
+
+
+def record_dicts(records: Iterable[Record]) -> List[Dict[str, Any]]:
+    # Plain dicts validate faster than attribute lookups on each record
+    return [dict(record._mapping) for record in records]
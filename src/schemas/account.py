@@ -1,6 +1,20 @@
-from pydantic import BaseModel, PositiveFloat
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel, Field, PositiveFloat
+
+from src.config import settings
 
 
 class AccountIn(BaseModel):
     user_id: int
-    balance: PositiveFloat
\ No newline at end of file
+    balance: PositiveFloat
+
+
+class AccountBulkIn(BaseModel):
+    accounts: List[AccountIn] = Field(min_length=1, max_length=settings.account_bulk_max_size)
+
+
+class SummaryGranularity(Enum):
+    DAY = "day"
+    MONTH = "month"
@@ -1,6 +1,9 @@
 from enum import Enum
+from typing import List
 
-from pydantic import BaseModel, ConfigDict, PositiveFloat
+from pydantic import BaseModel, ConfigDict, Field, PositiveFloat
+
+from src.config import settings
 
 
 class TransactionType(Enum):
@@ -13,4 +16,21 @@ class TransactionIn(BaseModel):
     
     account_id: int
     type: TransactionType
-    amount: PositiveFloat
\ No newline at end of file
+    amount: PositiveFloat
+
+
+class BatchMode(Enum):
+    ATOMIC = "atomic"
+    BEST_EFFORT = "best_effort"
+
+
+class TransactionBatchIn(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
+    mode: BatchMode = BatchMode.ATOMIC
+    transactions: List[TransactionIn] = Field(min_length=1, max_length=settings.transaction_batch_max_size)
+
+
+class ExportFormat(Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
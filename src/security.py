@@ -12,6 +12,11 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
 from pydantic import BaseModel
 
+from src.cache import TTLCache
+from src.config import settings
+from src.metrics import timed
+from src.service.revocation import revocation_store
+
 SECRET = "my-secret"
 ALGORITHM = "HS256"
 
@@ -30,6 +35,15 @@ class JWTToken(BaseModel):
     access_token: AccessToken
 
 
+# Verified tokens; entries never outlive the token's ``exp``.
+class TokenCache(TTLCache[JWTToken]):
+    def set(self, token: str, payload: JWTToken) -> None:
+        super().set(token, payload, expires_at=payload.access_token.exp)
+
+
+token_cache = TokenCache(maxsize=settings.token_cache_size, ttl=settings.token_cache_ttl)
+
+
 def sign_jwt(user_id: int) -> JWTToken:
     now = time.time()
     payload = {
@@ -45,11 +59,18 @@ def sign_jwt(user_id: int) -> JWTToken:
     return {"access_token": token}
 
 
+@timed
 async def decode_jwt(token: str) -> Optional[JWTToken]:
+    cached = token_cache.get(token)
+    if cached:
+        return cached
     try:
         decoded_token = jwt.decode(token, SECRET, audience="desafio-bank", algorithms=[ALGORITHM])
         _token = JWTToken.model_validate({"access_token": decoded_token})
-        return _token if _token.access_token.exp >= time.time() else None
+        if _token.access_token.exp < time.time():
+            return None
+        token_cache.set(token, _token)
+        return _token
     except Exception:
         return None
 
@@ -75,6 +96,11 @@ class JWTBearer(HTTPBearer):
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid or expired token.",
                 )
+            if await revocation_store.is_revoked(payload.access_token.jti, payload.access_token.exp):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked.",
+                )
             return payload
         else:
             raise HTTPException(
@@ -92,4 +118,10 @@ async def get_current_user(
 def login_required(current_user: Annotated[Dict[str, int], Depends(get_current_user)]):
     if not current_user:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def admin_required(current_user: Annotated[Dict[str, int], Depends(get_current_user)]):
+    if current_user["user_id"] not in settings.admin_user_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required.")
+    return current_user
@@ -1,20 +1,98 @@
-from typing import List
+import json
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple
 
 from databases.interfaces import Record
+from pydantic import ValidationError
 
-from src.database import database
+from src.database import database, replicas
+from src.exceptions import AccountNotFoundError
+from src.metrics import timed
 from src.models.account import accounts
+from src.pagination import decode_id_cursor
 from src.schemas.account import AccountIn
+from src.service.writes import WRITE_CHUNK_SIZE, insert_row, insert_rows
+from src.views.account import AccountOut
 
 
 class AccountService:
-    async def read_all(self, limit: int, skip: int = 0) -> List[Record]:
-        query = accounts.select().limit(limit).offset(skip)
-        return await database.fetch_all(query)
+    @timed
+    async def read_all(self, limit: int, skip: int = 0, after: Optional[str] = None) -> List[Record]:
+        query = accounts.select().order_by(accounts.c.id).limit(limit)
+        if after:
+            query = query.where(accounts.c.id > decode_id_cursor(after))
+        else:
+            query = query.offset(skip)
+        return await replicas.fetch_all(query)
 
-    async def create(self, account: AccountIn) -> Record:
-        command = accounts.insert().values(user_id=account.user_id, balance=account.balance)
-        account_id = await database.execute(command)
+    @timed
+    async def read_by_user(self, user_id: int, limit: int, after: Optional[str] = None) -> List[Record]:
+        # Keyset seek on (user_id, id): a range scan of ix_accounts_user_id_id, no sort
+        query = accounts.select().where(accounts.c.user_id == user_id)
+        if after:
+            query = query.where(accounts.c.id > decode_id_cursor(after))
+        return await replicas.fetch_all(query.order_by(accounts.c.id).limit(limit))
 
+    @timed
+    async def read(self, account_id: int) -> Record:
         query = accounts.select().where(accounts.c.id == account_id)
-        return await database.fetch_one(query)
\ No newline at end of file
+        account = await database.fetch_one(query)
+        if not account:
+            raise AccountNotFoundError(account_id=account_id)
+        return account
+
+    @timed
+    async def create(self, account: AccountIn) -> Record:
+        return await insert_row(accounts, user_id=account.user_id, balance=account.balance)
+
+    @timed
+    @database.transaction()
+    async def create_many(self, batch: List[AccountIn]) -> List[Record]:
+        return await self.__insert(batch)
+
+    async def import_ndjson(self, body: AsyncIterable[bytes]) -> AsyncIterator[str]:
+        # One account per input line; each chunk commits on its own, so memory and
+        # transaction size stay bounded however long the stream is
+        chunk: List[AccountIn] = []
+        async for line_number, line in self.__lines(body):
+            try:
+                chunk.append(AccountIn.model_validate_json(line))
+            except ValidationError as exc:
+                yield self.__rejected(line_number, exc)
+                continue
+            if len(chunk) >= WRITE_CHUNK_SIZE:
+                yield self.__created(await self.__insert_chunk(chunk))
+                chunk = []
+        if chunk:
+            yield self.__created(await self.__insert_chunk(chunk))
+
+    @database.transaction()
+    async def __insert_chunk(self, chunk: List[AccountIn]) -> List[Record]:
+        return await self.__insert(chunk)
+
+    async def __insert(self, chunk: List[AccountIn]) -> List[Record]:
+        return await insert_rows(accounts, [{"user_id": account.user_id, "balance": account.balance} for account in chunk])
+
+    async def __lines(self, body: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+        buffer = b""
+        line_number = 0
+        async for data in body:
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line_number += 1
+                if line.strip():
+                    yield line_number, line
+        if buffer.strip():
+            yield line_number + 1, buffer
+
+    def __created(self, records: List[Record]) -> str:
+        return "".join(
+            AccountOut.model_validate(record, from_attributes=True).model_dump_json() + "\n"
+            for record in records
+        )
+
+    def __rejected(self, line_number: int, error: ValidationError) -> str:
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'body'}: {item['msg']}" for item in error.errors()
+        )
+        return json.dumps({"line": line_number, "status": "rejected", "detail": detail}, separators=(",", ":")) + "\n"
@@ -0,0 +1,53 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from src.config import settings
+from src.exceptions import ServiceOverloadedError
+from src.metrics import Histogram
+
+
+class ConcurrencyLimiter:
+    def __init__(self, limit: int, queue_timeout: float):
+        # ``limit`` <= 0 disables the cap
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = asyncio.Semaphore(limit) if limit > 0 else None
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+        self.wait_times = Histogram()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore is None:
+            yield
+            return
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            if not self._semaphore.locked():
+                await self._semaphore.acquire()
+            elif self.queue_timeout > 0:
+                # A bounded wait: past it the caller is turned away instead of piling up
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            else:
+                raise asyncio.TimeoutError
+        except asyncio.TimeoutError:
+            self.shed += 1
+            raise ServiceOverloadedError() from None
+        finally:
+            self.waiting -= 1
+        self.wait_times.observe(time.perf_counter() - started)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+
+create_admission = ConcurrencyLimiter(
+    settings.transaction_create_concurrency, settings.transaction_create_queue_timeout
+)
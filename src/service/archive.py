@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+import sqlalchemy as sa
+
+from src.config import settings
+from src.database import database
+from src.metrics import registry, timed
+from src.models.transaction import transactions, transactions_archive
+from src.timestamps import as_utc
+
+Conditions = Callable[[sa.Table], List[sa.sql.ColumnElement]]
+
+
+def archive_cutoff() -> datetime:
+    # The archiver only moves rows older than the cutoff it computed when it ran,
+    # which is never later than this one: rows at or past it are always hot
+    return datetime.now(timezone.utc) - timedelta(days=settings.transaction_archive_after_days)
+
+
+def ledger_tiers(since: Optional[datetime] = None) -> List[sa.Table]:
+    if since is not None:
+        if as_utc(since) >= archive_cutoff():
+            return [transactions]
+    return [transactions, transactions_archive]
+
+
+def ledger(conditions: Conditions, since: Optional[datetime] = None, limit: Optional[int] = None) -> sa.sql.Select:
+    # Ledger rows of both tiers in (timestamp, id) order; ``since`` is a lower bound
+    # on ``timestamp`` implied by ``conditions`` and lets recent reads skip the archive
+    branches = [
+        table.select().where(*conditions(table)).order_by(table.c.timestamp, table.c.id).limit(limit)
+        for table in ledger_tiers(since)
+    ]
+    if len(branches) == 1:
+        return branches[0]
+    # Each tier stops at ``limit`` on its own index before the merge
+    rows = sa.union_all(*(sa.select(branch.subquery()) for branch in branches)).subquery("ledger")
+    return sa.select(rows).order_by(rows.c.timestamp, rows.c.id).limit(limit)
+
+
+def ledger_rows(conditions: Conditions, since: Optional[datetime] = None) -> sa.sql.FromClause:
+    # Unordered variant for aggregates
+    selects = [table.select().where(*conditions(table)) for table in ledger_tiers(since)]
+    if len(selects) == 1:
+        return selects[0].subquery("ledger")
+    return sa.union_all(*selects).subquery("ledger")
+
+
+class ArchiveService:
+    @timed
+    async def archive(self, chunk_size: int = 1000) -> int:
+        # Each chunk commits on its own, so an interrupted run resumes where it stopped
+        cutoff = archive_cutoff()
+        moved = 0
+        while True:
+            count = await self.__archive_chunk(cutoff, chunk_size)
+            if not count:
+                return moved
+            moved += count
+            registry.inc("transactions_archived_total", amount=count)
+
+    @database.transaction()
+    async def __archive_chunk(self, cutoff: datetime, chunk_size: int) -> int:
+        query = (
+            sa.select(transactions.c.id)
+            .where(transactions.c.timestamp < cutoff)
+            .order_by(transactions.c.id)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        )
+        ids = [row.id for row in await database.fetch_all(query)]
+        if not ids:
+            return 0
+        await database.execute(transactions_archive.insert().from_select(
+            [column.name for column in transactions.c],
+            transactions.select().where(transactions.c.id.in_(ids)),
+        ))
+        await database.execute(transactions.delete().where(transactions.c.id.in_(ids)))
+        return len(ids)
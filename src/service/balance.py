@@ -0,0 +1,144 @@
+from datetime import datetime
+from typing import List, Optional
+
+import sqlalchemy as sa
+from databases import Database
+
+from src.cache import TTLCache
+from src.config import settings
+from src.database import database, dialect, replicas
+from src.exceptions import AccountNotFoundError
+from src.metrics import timed
+from src.models.account import accounts
+from src.models.balance_checkpoint import balance_checkpoints
+from src.models.transaction import Timestamp, TransactionType
+from src.service.account import AccountService
+from src.service.archive import Conditions, ledger_rows
+
+# Write-through from TransactionService; the TTL bounds staleness for writes
+# made by other workers.
+balance_cache: TTLCache[float] = TTLCache(maxsize=settings.balance_cache_size, ttl=settings.balance_cache_ttl)
+
+
+def signed_amount(rows: sa.sql.FromClause) -> sa.sql.ColumnElement:
+    return sa.case(
+        (rows.c.type == TransactionType.WITHDRAWAL, -rows.c.amount),
+        else_=rows.c.amount,
+    )
+
+
+def settled_before() -> sa.sql.Select:
+    # The newest instant before which every transaction has finished. Postgres stamps
+    # rows with their transaction's start time, so that is the oldest open transaction;
+    # SQLite runs one writer at a time and the checkpoint INSERT waits for it.
+    if dialect == "postgresql":
+        activity = sa.table("pg_stat_activity", sa.column("xact_start"))
+        return sa.select(sa.func.least(sa.func.now(), sa.func.min(activity.c.xact_start), type_=Timestamp))
+    return sa.select(sa.func.now(type_=Timestamp))
+
+
+class BalanceService:
+    def __init__(self):
+        self.account_service = AccountService()
+
+    @timed
+    async def read(self, account_id: int) -> float:
+        balance = balance_cache.get(account_id)
+        if balance is None:
+            # From the primary: a lagging replica would cache a balance older than the
+            # last write for a whole TTL. A write-through that lands while this read is
+            # in flight is newer still, so it is not overwritten.
+            since = balance_cache.version
+            account = await self.account_service.read(account_id)
+            balance = float(account.balance)
+            balance_cache.fill(account_id, balance, since)
+        return balance
+
+    @timed
+    async def read_at(self, account_id: int, at: datetime) -> float:
+        balance = await replicas.run(lambda db: self.__read_at(db, account_id, at))
+        if balance is None:
+            balance = await self.__read_at(database, account_id, at)
+        if balance is None:
+            raise AccountNotFoundError(account_id=account_id)
+        return balance
+
+    @timed
+    async def create_checkpoints(self) -> None:
+        # A checkpoint covers exactly the ledger rows stamped before ``as_of``. Ids and
+        # timestamps are assigned before commit, so ``as_of`` must predate every open
+        # transaction: all rows below it are then committed, and none can appear later.
+        as_of = await database.fetch_val(settled_before())
+        previous = await database.fetch_val(sa.select(sa.func.max(balance_checkpoints.c.as_of)))
+        if previous is not None and as_of <= previous:
+            return
+
+        def window(table: sa.Table) -> List[sa.sql.ColumnElement]:
+            where = [table.c.timestamp < as_of]
+            if previous is not None:
+                where.append(table.c.timestamp >= previous)
+            return where
+
+        # Accounts with rows since the last run; the others' latest checkpoint still holds
+        active = ledger_rows(window, since=previous)
+        later = ledger_rows(lambda table: [table.c.timestamp >= as_of], since=as_of)
+        # The live balance and the committed rows from ``as_of`` on are read in one
+        # statement snapshot, so their difference is the balance at ``as_of``
+        after_as_of = (
+            sa.select(sa.func.coalesce(sa.func.sum(signed_amount(later)), 0))
+            .where(later.c.account_id == accounts.c.id)
+            .scalar_subquery()
+        )
+        command = balance_checkpoints.insert().from_select(
+            ["account_id", "as_of", "balance"],
+            sa.select(accounts.c.id, sa.literal(as_of, Timestamp), accounts.c.balance - after_as_of)
+            .where(accounts.c.id.in_(sa.select(active.c.account_id))),
+        )
+        await database.execute(command)
+
+    async def __read_at(self, db: Database, account_id: int, at: datetime) -> Optional[float]:
+        # Account, checkpoints and ledger sums all come from ``db`` so they agree
+        account = await db.fetch_one(accounts.select().where(accounts.c.id == account_id))
+        if account is None:
+            return None
+
+        query = (
+            balance_checkpoints.select()
+            .where(balance_checkpoints.c.account_id == account_id)
+            .where(balance_checkpoints.c.as_of <= at)
+            .order_by(balance_checkpoints.c.as_of.desc())
+            .limit(1)
+        )
+        checkpoint = await db.fetch_one(query)
+        if checkpoint:
+            # Replay forward only what happened between the checkpoint and ``at``
+            delta = await self.__sum(db, lambda table: [
+                table.c.account_id == account_id,
+                table.c.timestamp >= checkpoint.as_of,
+                table.c.timestamp <= at,
+            ], since=checkpoint.as_of)
+            return float(checkpoint.balance) + delta
+
+        # ``at`` predates every checkpoint: unwind from the earliest later
+        # checkpoint, or from the live balance when there is none
+        query = (
+            balance_checkpoints.select()
+            .where(balance_checkpoints.c.account_id == account_id)
+            .order_by(balance_checkpoints.c.as_of)
+            .limit(1)
+        )
+        checkpoint = await db.fetch_one(query)
+        def conditions(table: sa.Table) -> List[sa.sql.ColumnElement]:
+            where = [table.c.account_id == account_id, table.c.timestamp > at]
+            if checkpoint:
+                where.append(table.c.timestamp < checkpoint.as_of)
+            return where
+
+        base = float(checkpoint.balance) if checkpoint else float(account.balance)
+        # Unwinding to a recent ``at`` only needs the hot tier
+        return base - await self.__sum(db, conditions, since=at)
+
+    async def __sum(self, db: Database, conditions: Conditions, since: Optional[datetime] = None) -> float:
+        rows = ledger_rows(conditions, since=since)
+        query = sa.select(sa.func.coalesce(sa.func.sum(signed_amount(rows)), 0))
+        return float(await db.fetch_val(query))
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+import sqlalchemy as sa
+
+from src.database import database
+from src.schemas.transaction import ExportFormat
+from src.service.archive import ledger
+from src.views.transaction import transaction_dict
+
+EXPORT_CHUNK_ROWS = 500
+EXPORT_COLUMNS = ["id", "account_id", "type", "amount", "timestamp"]
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+class ExportService:
+    # Process-wide count of ledger rows written to export streams
+    rows_streamed = 0
+
+    async def stream(
+        self,
+        account_id: int,
+        format: ExportFormat,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> AsyncIterator[str]:
+        def conditions(table: sa.Table) -> List[sa.sql.ColumnElement]:
+            where = [table.c.account_id == account_id]
+            if start:
+                where.append(table.c.timestamp >= start)
+            if end:
+                where.append(table.c.timestamp < end)
+            return where
+
+        query = ledger(conditions, since=start)
+
+        if format == ExportFormat.CSV:
+            yield self.__csv([EXPORT_COLUMNS])
+
+        rows: List[Dict] = []
+        # ``iterate`` reads through a server-side cursor, so only one chunk is held at a time
+        async for record in database.iterate(query):
+            rows.append(transaction_dict(record))
+            if len(rows) >= EXPORT_CHUNK_ROWS:
+                yield self.__flush(rows, format)
+                rows = []
+        if rows:
+            yield self.__flush(rows, format)
+
+    def __flush(self, rows: List[Dict], format: ExportFormat) -> str:
+        ExportService.rows_streamed += len(rows)
+        if format == ExportFormat.CSV:
+            return self.__csv([row.values() for row in rows])
+        return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+
+    def __csv(self, rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
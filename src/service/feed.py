@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
+
+import databases
+import sqlalchemy as sa
+from databases.interfaces import Record
+
+from src.config import settings
+from src.database import database
+from src.metrics import registry
+from src.pagination import Cursor, decode_cursor, encode_cursor
+from src.timestamps import as_utc
+from src.views.transaction import TransactionOut
+
+logger = logging.getLogger(__name__)
+
+FEED_BACKFILL_PAGE_SIZE = 500
+
+Event = Dict[str, Any]
+
+
+def transaction_event(record: Record) -> Event:
+    return {
+        "cursor": encode_cursor(record.timestamp, record.id),
+        "transaction": TransactionOut.model_validate(record, from_attributes=True).model_dump(mode="json"),
+    }
+
+
+class Subscription:
+    def __init__(self, account_id: int, maxsize: int):
+        self.account_id = account_id
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
+        # Set when the buffer overflowed: the events queued so far are still
+        # contiguous, so the consumer drains them and then ends the stream
+        self.closed = False
+
+
+class FeedBroadcast(ABC):
+    # Carries events between workers. ``publish`` sends an event to every worker,
+    # including this one; ``listen`` hands each received event to ``deliver``.
+    @abstractmethod
+    async def publish(self, event: Event) -> None:
+        ...
+
+    @abstractmethod
+    async def listen(self, deliver: Callable[[Event], None]) -> None:
+        ...
+
+
+class PostgresBroadcast(FeedBroadcast):
+    def __init__(self, url: str, channel: str, retry_interval: float = 1.0):
+        # asyncpg wants a plain postgresql:// URL
+        self.url = str(databases.DatabaseURL(url).replace(driver=""))
+        self.channel = channel
+        self.retry_interval = retry_interval
+
+    async def publish(self, event: Event) -> None:
+        await database.execute(sa.select(sa.func.pg_notify(self.channel, json.dumps(event))))
+
+    async def listen(self, deliver: Callable[[Event], None]) -> None:
+        import asyncpg
+
+        while True:
+            try:
+                # A dedicated connection: LISTEN would pin a pooled one for good
+                connection = await asyncpg.connect(self.url)
+                try:
+                    await connection.add_listener(
+                        self.channel, lambda _connection, _pid, _channel, payload: deliver(json.loads(payload))
+                    )
+                    closed = asyncio.get_running_loop().create_future()
+                    connection.add_termination_listener(lambda _connection: closed.done() or closed.set_result(None))
+                    await closed
+                finally:
+                    await connection.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Feed broadcast listener failed")
+            await asyncio.sleep(self.retry_interval)
+
+
+class TransactionFeed:
+    def __init__(self, buffer_size: int, broadcast: Optional[FeedBroadcast] = None):
+        self.buffer_size = buffer_size
+        self.broadcast = broadcast
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribe(self, account_id: int) -> Subscription:
+        subscription = Subscription(account_id, self.buffer_size)
+        self._subscribers.setdefault(account_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.account_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.account_id]
+
+    async def publish(self, records: Iterable[Record]) -> None:
+        # Called after commit. With a broadcast, local subscribers get the event
+        # back through ``listen`` like every other worker.
+        for record in records:
+            if self.broadcast is None:
+                if record.account_id in self._subscribers:
+                    self.deliver(transaction_event(record))
+                continue
+            try:
+                await self.broadcast.publish(transaction_event(record))
+            except Exception:
+                # The write is committed; subscribers catch up with ``since`` on reconnect
+                logger.exception("Feed broadcast publish failed")
+
+    def deliver(self, event: Event) -> None:
+        account_id = event["transaction"]["account_id"]
+        for subscription in list(self._subscribers.get(account_id, ())):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Never block the publisher on a slow consumer: cut it off instead
+                subscription.closed = True
+                self.unsubscribe(subscription)
+                registry.inc("feed_subscriber_overflows_total")
+
+
+class FeedService:
+    def __init__(self, feed: TransactionFeed, read_page: Callable[..., Awaitable[List[Record]]], heartbeat: float):
+        # ``read_page`` is a keyset page reader with the signature of TransactionService.read_all
+        self.feed = feed
+        self.read_page = read_page
+        self.heartbeat = heartbeat
+
+    async def stream(self, account_id: int, since: Optional[str] = None) -> AsyncIterator[str]:
+        # Subscribe before the backfill so nothing committed in between is lost;
+        # live events at or before the last backfilled row were already sent
+        subscription = self.feed.subscribe(account_id)
+        try:
+            backfilled: Optional[Cursor] = None
+            if since:
+                after = since
+                while True:
+                    records = await self.read_page(account_id=account_id, limit=FEED_BACKFILL_PAGE_SIZE, after=after)
+                    for record in records:
+                        yield self.__frame(transaction_event(record))
+                    if records:
+                        backfilled = (as_utc(records[-1].timestamp), records[-1].id)
+                    if len(records) < FEED_BACKFILL_PAGE_SIZE:
+                        break
+                    after = encode_cursor(records[-1].timestamp, records[-1].id)
+
+            while True:
+                if subscription.closed and subscription.queue.empty():
+                    return
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps idle connections open through proxies
+                    yield ": keepalive\n\n"
+                    continue
+                if backfilled is not None and self.__position(event) <= backfilled:
+                    continue
+                yield self.__frame(event)
+        finally:
+            self.feed.unsubscribe(subscription)
+
+    def __position(self, event: Event) -> Cursor:
+        timestamp, id = decode_cursor(event["cursor"])
+        return as_utc(timestamp), id
+
+    def __frame(self, event: Event) -> str:
+        # The cursor doubles as the SSE event id, so a reconnecting EventSource
+        # resumes from it through Last-Event-ID
+        data = json.dumps(event["transaction"], separators=(",", ":"))
+        return f"id: {event['cursor']}\nevent: transaction\ndata: {data}\n\n"
+
+
+def build_broadcast() -> Optional[FeedBroadcast]:
+    if settings.feed_broadcast == "postgres":
+        return PostgresBroadcast(settings.database_url, settings.feed_broadcast_channel)
+    return None
+
+
+transaction_feed = TransactionFeed(settings.feed_buffer_size, build_broadcast())
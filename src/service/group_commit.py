@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple, TypeVar
+
+from src.config import settings
+from src.database import database
+from src.metrics import Histogram
+
+T = TypeVar("T")
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_TIME_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+
+class GroupCommitter:
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_times = Histogram(WAIT_TIME_BUCKETS)
+        self._pending: List[Tuple[Callable[[], Awaitable], asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        # One group commits at a time: the next one fills up meanwhile and
+        # arrival order is kept across groups
+        self._commit_lock = asyncio.Lock()
+
+    async def submit(self, apply: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((apply, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def drain(self) -> None:
+        self._flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Start from an empty context so the flush gets its own connection
+        # instead of inheriting the one bound to the submitting request.
+        task = contextvars.Context().run(asyncio.create_task, self._commit(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _commit(self, batch: List[Tuple[Callable[[], Awaitable], asyncio.Future, float]]) -> None:
+        async with self._commit_lock:
+            await self._apply(batch)
+
+    async def _apply(self, batch: List[Tuple[Callable[[], Awaitable], asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        outcomes = []
+        try:
+            async with database.transaction():
+                for apply, future, enqueued_at in batch:
+                    self.wait_times.observe(started - enqueued_at)
+                    if future.cancelled():
+                        continue
+                    try:
+                        # ``apply`` opens a nested transaction (a savepoint), so a
+                        # failing item only rolls back its own writes
+                        outcomes.append((future, await apply(), None))
+                    except Exception as exc:
+                        outcomes.append((future, None, exc))
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        # Callers only see their result once the shared commit has succeeded
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+group_committer = GroupCommitter(
+    window=settings.group_commit_window_ms / 1000,
+    max_batch=settings.group_commit_max_batch,
+)
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from src.cache import TTLCache
+from src.config import settings
+from src.database import database
+from src.exceptions import IdempotencyKeyReusedError
+from src.metrics import registry
+from src.models.idempotency_key import idempotency_keys
+from src.timestamps import as_utc
+
+IdempotencyKey = Tuple[int, str]
+SaveResponse = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    response: Dict[str, Any]
+
+
+def fingerprint(body: str) -> str:
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, maxsize: int, ttl: float, persist: bool = False):
+        self.ttl = ttl
+        self.persist = persist
+        self.responses: TTLCache[StoredResponse] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: Dict[IdempotencyKey, Tuple[str, asyncio.Future]] = {}
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    async def run(
+        self,
+        key: IdempotencyKey,
+        request_fingerprint: str,
+        execute: Callable[[SaveResponse], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        # Duplicates in flight are coordinated within this process only; across workers
+        # the persisted key's primary key turns the later write away when it commits
+        while True:
+            stored = await self.__lookup(key)
+            if stored is not None:
+                if stored.fingerprint != request_fingerprint:
+                    raise IdempotencyKeyReusedError(key=key[1])
+                registry.inc("idempotent_replays_total")
+                return stored.response, True
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            if in_flight[0] != request_fingerprint:
+                raise IdempotencyKeyReusedError(key=key[1])
+            try:
+                # Shielded so a waiter going away does not cancel the original request
+                await asyncio.shield(in_flight[1])
+            except asyncio.CancelledError:
+                if not in_flight[1].cancelled():
+                    raise
+                # The original request was cancelled before it finished: run it here
+                continue
+            # The result is cached by now; the next lookup replays it
+
+        expires_at = time.time() + self.ttl
+
+        async def save(response: Dict[str, Any]) -> None:
+            # ``execute`` calls this inside its write transaction: the key commits or
+            # rolls back with the write it answers for
+            if self.persist:
+                await self.__persist(key, StoredResponse(request_fingerprint, response), expires_at)
+
+        pending = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (request_fingerprint, pending)
+        try:
+            response = await execute(save)
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as exc:
+            # Waiters get the same error; nothing is stored, so a later retry runs again
+            pending.set_exception(exc)
+            # Mark it retrieved so an unawaited future does not log a warning
+            pending.exception()
+            raise
+        else:
+            self.responses.set(key, StoredResponse(request_fingerprint, response), expires_at=expires_at)
+            pending.set_result(None)
+            return response, False
+        finally:
+            del self._in_flight[key]
+
+    async def purge_expired(self) -> None:
+        if self.persist:
+            await database.execute(
+                idempotency_keys.delete().where(idempotency_keys.c.expires_at <= datetime.now(timezone.utc))
+            )
+
+    async def __lookup(self, key: IdempotencyKey) -> Optional[StoredResponse]:
+        stored = self.responses.get(key)
+        if stored is not None or not self.persist:
+            return stored
+
+        # The row is authoritative: the cache may have evicted the key before its TTL
+        query = idempotency_keys.select().where(
+            idempotency_keys.c.user_id == key[0],
+            idempotency_keys.c.key == key[1],
+            idempotency_keys.c.expires_at > datetime.now(timezone.utc),
+        )
+        row = await database.fetch_one(query)
+        if row is None:
+            return None
+        stored = StoredResponse(row.fingerprint, row.response)
+        self.responses.set(key, stored, expires_at=as_utc(row.expires_at).timestamp())
+        return stored
+
+    async def __persist(self, key: IdempotencyKey, stored: StoredResponse, expires_at: float) -> None:
+        # An expired row for the key may still be waiting for the purge
+        await database.execute(idempotency_keys.delete().where(
+            idempotency_keys.c.user_id == key[0],
+            idempotency_keys.c.key == key[1],
+            idempotency_keys.c.expires_at <= datetime.now(timezone.utc),
+        ))
+        await database.execute(idempotency_keys.insert().values(
+            user_id=key[0],
+            key=key[1],
+            fingerprint=stored.fingerprint,
+            response=stored.response,
+            expires_at=datetime.fromtimestamp(expires_at, timezone.utc),
+        ))
+
+
+idempotency_store = IdempotencyStore(
+    maxsize=settings.idempotency_cache_size,
+    ttl=settings.idempotency_key_ttl,
+    persist=settings.idempotency_persist,
+)
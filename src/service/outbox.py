@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import sqlalchemy as sa
+from databases.interfaces import Record
+from sqlalchemy.dialects import postgresql
+
+from src.config import settings
+from src.database import database
+from src.metrics import Histogram, registry
+from src.models.outbox_event import outbox_events
+from src.service.writes import chunked
+from src.timestamps import as_utc
+from src.views.transaction import transaction_dict
+
+logger = logging.getLogger(__name__)
+
+TRANSACTION_CREATED = "transaction.created"
+
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class OutboxService:
+    async def publish(self, records: Iterable[Record]) -> None:
+        # Runs inside the caller's transaction: events commit or roll back with the ledger rows
+        rows = [{"topic": TRANSACTION_CREATED, "payload": transaction_dict(record)} for record in records]
+        for chunk in chunked(rows):
+            await database.execute(outbox_events.insert().values(chunk))
+
+    def publish_from(self, ledger_rows: sa.sql.FromClause) -> sa.sql.Insert:
+        # Postgres only: folds the event into the statement that wrote ``ledger_rows``
+        return postgresql.insert(outbox_events).from_select(
+            ["topic", "payload"],
+            sa.select(sa.literal(TRANSACTION_CREATED), event_payload(ledger_rows)),
+        )
+
+
+def event_payload(ledger_rows: sa.sql.FromClause) -> sa.sql.ColumnElement:
+    # Same shape as ``transaction_dict``: enum value rather than label, amount as a float
+    # and the timestamp as datetime.isoformat() renders a UTC datetime
+    timestamp = sa.func.timezone("UTC", ledger_rows.c.timestamp)
+    fraction = sa.func.to_char(timestamp, "US", type_=sa.Text)
+    isoformat = (
+        sa.func.to_char(timestamp, 'YYYY-MM-DD"T"HH24:MI:SS', type_=sa.Text)
+        + sa.case((fraction == "000000", ""), else_="." + fraction)
+        + "+00:00"
+    )
+    return sa.func.json_build_object(
+        "id", ledger_rows.c.id,
+        "account_id", ledger_rows.c.account_id,
+        "type", sa.func.lower(sa.cast(ledger_rows.c.type, sa.Text)),
+        "amount", sa.cast(ledger_rows.c.amount, postgresql.DOUBLE_PRECISION),
+        "timestamp", isoformat,
+    )
+
+
+class OutboxSink(ABC):
+    @abstractmethod
+    async def deliver(self, events: List[Dict[str, Any]]) -> None:
+        ...
+
+
+class WebhookSink(OutboxSink):
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+
+    async def deliver(self, events: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self.__post, json.dumps(events).encode())
+
+    def __post(self, body: bytes) -> None:
+        request = urllib.request.Request(
+            self.url, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        # Any non-2xx status raises HTTPError, which fails the batch
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class FileSink(OutboxSink):
+    def __init__(self, path: str):
+        self.path = path
+
+    async def deliver(self, events: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self.__append, "".join(json.dumps(event) + "\n" for event in events))
+
+    def __append(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+class QueueSink(OutboxSink):
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def deliver(self, events: List[Dict[str, Any]]) -> None:
+        # A full queue holds the dispatcher back instead of dropping events
+        for event in events:
+            await self.queue.put(event)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        sink: Optional[OutboxSink],
+        batch_size: int,
+        poll_interval: float,
+        lease: float,
+        retry_base: float,
+        retry_max: float,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.delivery_lag = Histogram(LAG_BUCKETS)
+        self.pending_age = 0.0
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delivered = await self.dispatch_once()
+                await self.measure_pending_age()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                delivered = 0
+            if delivered < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def dispatch_once(self) -> int:
+        # At least once: rows are deleted only after the sink accepted them. A worker
+        # that dies mid-delivery leaves them leased, and they are retried when it expires.
+        rows = await self.__claim()
+        if not rows:
+            return 0
+        ids = [row.id for row in rows]
+        try:
+            await self.sink.deliver([self.__event(row) for row in rows])
+        except Exception:
+            delay = self.backoff(max(row.attempts for row in rows) + 1)
+            await database.execute(
+                outbox_events.update().where(outbox_events.c.id.in_(ids)).values(available_at=self.__now() + timedelta(seconds=delay))
+            )
+            registry.inc("outbox_delivery_failures_total")
+            logger.warning("Outbox delivery of %d events failed, retrying in %.1fs", len(rows), delay, exc_info=True)
+            return 0
+
+        await database.execute(outbox_events.delete().where(outbox_events.c.id.in_(ids)))
+        delivered_at = time.time()
+        for row in rows:
+            self.delivery_lag.observe(delivered_at - as_utc(row.created_at).timestamp())
+        registry.inc("outbox_events_delivered_total", amount=len(rows))
+        return len(rows)
+
+    async def measure_pending_age(self) -> None:
+        oldest = await database.fetch_val(
+            sa.select(outbox_events.c.created_at).order_by(outbox_events.c.id).limit(1)
+        )
+        self.pending_age = time.time() - as_utc(oldest).timestamp() if oldest else 0.0
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+
+    @database.transaction()
+    async def __claim(self) -> List[Record]:
+        now = self.__now()
+        query = (
+            outbox_events.select()
+            .where(outbox_events.c.available_at <= now)
+            .order_by(outbox_events.c.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = await database.fetch_all(query)
+        if rows:
+            await database.execute(
+                outbox_events.update()
+                .where(outbox_events.c.id.in_([row.id for row in rows]))
+                .values(available_at=now + timedelta(seconds=self.lease), attempts=outbox_events.c.attempts + 1)
+            )
+        return rows
+
+    def __event(self, row: Record) -> Dict[str, Any]:
+        # Consumers deduplicate redeliveries by ``id``
+        return {
+            "id": row.id,
+            "topic": row.topic,
+            "created_at": as_utc(row.created_at).isoformat(),
+            "payload": row.payload,
+        }
+
+    def __now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+
+def build_sink() -> Optional[OutboxSink]:
+    if settings.outbox_sink == "webhook":
+        return WebhookSink(settings.outbox_webhook_url, settings.outbox_webhook_timeout)
+    if settings.outbox_sink == "file":
+        return FileSink(settings.outbox_file_path)
+    if settings.outbox_sink == "queue":
+        return QueueSink(settings.outbox_queue_size)
+    return None
+
+
+outbox_dispatcher = OutboxDispatcher(
+    build_sink(),
+    batch_size=settings.outbox_batch_size,
+    poll_interval=settings.outbox_poll_interval,
+    lease=settings.outbox_lease_seconds,
+    retry_base=settings.outbox_retry_base,
+    retry_max=settings.outbox_retry_max,
+)
@@ -0,0 +1,101 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.bloom import ExpiringBloomFilter
+from src.config import settings
+from src.database import database, dialect
+from src.metrics import registry
+from src.models.revoked_token import revoked_tokens
+from src.timestamps import as_utc
+
+# Re-read this far behind the last sync, so rows committed late or stamped by a
+# skewed clock are still picked up
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class RevocationStore:
+    def __init__(self, window: float, capacity: int, error_rate: float, persist: bool = False):
+        self.persist = persist
+        self.filter = ExpiringBloomFilter(window, capacity, error_rate)
+        # The exact store: this dict, or the ``revoked_tokens`` table when persisted
+        self._revoked: Dict[str, float] = {}
+        self._synced_until: Optional[datetime] = None
+        self.checks = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        self.filter.add(jti, expires_at)
+        if self.persist:
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            await database.execute(
+                insert(revoked_tokens)
+                .values(jti=jti, expires_at=datetime.fromtimestamp(expires_at, timezone.utc))
+                .on_conflict_do_nothing(index_elements=[revoked_tokens.c.jti])
+            )
+        else:
+            self._revoked[jti] = expires_at
+        registry.inc("tokens_revoked_total")
+
+    async def is_revoked(self, jti: str, expires_at: float) -> bool:
+        # Runs on every authenticated request: only a filter hit reaches the exact store
+        self.checks += 1
+        if not self.filter.might_contain(jti, expires_at):
+            return False
+        self.filter_hits += 1
+        if self.persist:
+            revoked = await database.fetch_val(
+                sa.select(revoked_tokens.c.jti).where(revoked_tokens.c.jti == jti)
+            ) is not None
+        else:
+            revoked = jti in self._revoked
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def expire(self, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self.filter.expire(now)
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+
+    async def sync(self) -> None:
+        # Other workers' revocations reach this worker's filter here, at most one
+        # sync interval after they happened
+        if not self.persist:
+            return
+        now = datetime.now(timezone.utc)
+        query = sa.select(revoked_tokens.c.jti, revoked_tokens.c.expires_at).where(revoked_tokens.c.expires_at > now)
+        if self._synced_until is not None:
+            query = query.where(revoked_tokens.c.revoked_at >= self._synced_until - SYNC_OVERLAP)
+        for row in await database.fetch_all(query):
+            self.filter.add(row.jti, as_utc(row.expires_at).timestamp())
+        self._synced_until = now
+
+    async def purge_expired(self) -> None:
+        if self.persist:
+            await database.execute(
+                revoked_tokens.delete().where(revoked_tokens.c.expires_at <= datetime.now(timezone.utc))
+            )
+
+    async def maintain(self) -> None:
+        self.expire()
+        await self.sync()
+        await self.purge_expired()
+
+
+revocation_store = RevocationStore(
+    window=settings.token_revocation_window,
+    capacity=settings.token_revocation_capacity,
+    error_rate=settings.token_revocation_error_rate,
+    persist=settings.token_revocation_persist,
+)
@@ -0,0 +1,185 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import sqlalchemy as sa
+from databases.interfaces import Record
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database import database, dialect, replicas
+from src.metrics import timed
+from src.models.account import accounts
+from src.models.account_rollup import account_rollups
+from src.models.transaction import TransactionType
+from src.schemas.account import SummaryGranularity
+from src.service.archive import ledger_rows
+from src.service.writes import chunked
+
+RollupKey = Tuple[int, str, date, TransactionType]
+
+
+def period_start(timestamp: datetime, granularity: SummaryGranularity) -> date:
+    # Periods are UTC calendar days/months, whatever the session time zone
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    if granularity == SummaryGranularity.MONTH:
+        return date(timestamp.year, timestamp.month, 1)
+    return timestamp.date()
+
+
+def period_start_column(timestamp: sa.sql.ColumnElement, granularity: SummaryGranularity) -> sa.sql.ColumnElement:
+    # Postgres counterpart of ``period_start``
+    utc = sa.func.timezone("UTC", timestamp)
+    if granularity == SummaryGranularity.MONTH:
+        utc = sa.func.date_trunc("month", utc)
+    return sa.cast(utc, sa.Date)
+
+
+def new_deltas() -> Dict[RollupKey, List[Any]]:
+    return defaultdict(lambda: [Decimal(0), 0])
+
+
+def add_delta(deltas: Dict[RollupKey, List[Any]], record: Record) -> None:
+    for granularity in SummaryGranularity:
+        key = (
+            record.account_id,
+            granularity.value,
+            period_start(record.timestamp, granularity),
+            TransactionType(record.type),
+        )
+        deltas[key][0] += Decimal(str(record.amount))
+        deltas[key][1] += 1
+
+
+class RollupService:
+    async def apply(self, records: Iterable[Record]) -> None:
+        # Runs inside the caller's transaction, so rollups commit with the ledger rows
+        deltas = new_deltas()
+        for record in records:
+            add_delta(deltas, record)
+        rows = self.__rows(deltas)
+        for chunk in chunked(rows):
+            await database.execute(self.__upsert(chunk))
+
+    def upsert_from(self, ledger_rows: sa.sql.FromClause) -> sa.sql.Insert:
+        # Postgres only: folds the rollup update into the statement that wrote ``ledger_rows``
+        periods = sa.union_all(*(
+            sa.select(
+                ledger_rows.c.account_id,
+                sa.cast(sa.literal(granularity.value), account_rollups.c.granularity.type).label("granularity"),
+                period_start_column(ledger_rows.c.timestamp, granularity).label("period_start"),
+                ledger_rows.c.type,
+                ledger_rows.c.amount,
+            )
+            for granularity in SummaryGranularity
+        )).subquery()
+        key = [periods.c.account_id, periods.c.granularity, periods.c.period_start, periods.c.type]
+        command = postgresql.insert(account_rollups).from_select(
+            ["account_id", "granularity", "period_start", "type", "total", "count"],
+            sa.select(*key, sa.func.sum(periods.c.amount), sa.func.count()).group_by(*key),
+        )
+        return self.__on_conflict(command)
+
+    @timed
+    async def read_summary(
+        self,
+        account_id: int,
+        granularity: SummaryGranularity,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        query = (
+            account_rollups.select()
+            .where(account_rollups.c.account_id == account_id)
+            .where(account_rollups.c.granularity == granularity.value)
+            .order_by(account_rollups.c.period_start)
+        )
+        if start:
+            query = query.where(account_rollups.c.period_start >= start)
+        if end:
+            query = query.where(account_rollups.c.period_start < end)
+
+        periods: Dict[date, Dict[str, Any]] = {}
+        for row in await replicas.fetch_all(query):
+            period = periods.setdefault(row.period_start, {
+                "period_start": row.period_start,
+                "deposits": 0.0,
+                "withdrawals": 0.0,
+                "deposit_count": 0,
+                "withdrawal_count": 0,
+            })
+            if TransactionType(row.type) == TransactionType.WITHDRAWAL:
+                period["withdrawals"], period["withdrawal_count"] = float(row.total), row.count
+            else:
+                period["deposits"], period["deposit_count"] = float(row.total), row.count
+        return list(periods.values())
+
+    async def backfill(self, chunk_size: int = 1000) -> Dict[str, int]:
+        totals = {"accounts": 0, "transactions": 0, "rollups": 0}
+        last_id = 0
+        while True:
+            chunk = await self.__backfill_chunk(last_id, chunk_size)
+            if chunk is None:
+                return totals
+            last_id, counts = chunk
+            for name, count in counts.items():
+                totals[name] += count
+
+    @database.transaction()
+    async def __backfill_chunk(self, after_id: int, chunk_size: int) -> Optional[Tuple[int, Dict[str, int]]]:
+        # Locking the account rows holds back live writes to them until the chunk commits
+        query = (
+            sa.select(accounts.c.id)
+            .where(accounts.c.id > after_id)
+            .order_by(accounts.c.id)
+            .limit(chunk_size)
+            .with_for_update()
+        )
+        account_ids = [row.id for row in await database.fetch_all(query)]
+        if not account_ids:
+            return None
+
+        await database.execute(account_rollups.delete().where(account_rollups.c.account_id.in_(account_ids)))
+        ledger = sa.select(ledger_rows(lambda table: [table.c.account_id.in_(account_ids)]))
+        deltas = new_deltas()
+        records = 0
+        # Streamed through a server-side cursor: memory grows with periods, not ledger rows
+        async for record in database.iterate(ledger):
+            add_delta(deltas, record)
+            records += 1
+        rows = self.__rows(deltas)
+        for chunk in chunked(rows):
+            await database.execute(account_rollups.insert().values(chunk))
+        return account_ids[-1], {"accounts": len(account_ids), "transactions": records, "rollups": len(rows)}
+
+    def __rows(self, deltas: Dict[RollupKey, List[Any]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "account_id": account_id,
+                "granularity": granularity,
+                "period_start": period,
+                "type": transaction_type,
+                "total": float(total),
+                "count": count,
+            }
+            for (account_id, granularity, period, transaction_type), (total, count) in deltas.items()
+        ]
+
+    def __upsert(self, rows: List[Dict[str, Any]]) -> sa.sql.Insert:
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return self.__on_conflict(insert(account_rollups).values(rows))
+
+    def __on_conflict(self, command: sa.sql.Insert) -> sa.sql.Insert:
+        return command.on_conflict_do_update(
+            index_elements=[
+                account_rollups.c.account_id,
+                account_rollups.c.granularity,
+                account_rollups.c.period_start,
+                account_rollups.c.type,
+            ],
+            set_={
+                "total": account_rollups.c.total + command.excluded.total,
+                "count": account_rollups.c.count + command.excluded.count,
+            },
+        )
@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable
+
+
+class AccountSequencer:
+    def __init__(self):
+        self._locks: Dict[int, asyncio.Lock] = {}
+        # Holders + waiters per account; a key is dropped as soon as it reaches zero
+        self._depths: Dict[int, int] = {}
+        self.peak_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def acquire(self, account_id: int) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(account_id, asyncio.Lock())
+        depth = self._depths.get(account_id, 0) + 1
+        self._depths[account_id] = depth
+        self.peak_depth = max(self.peak_depth, depth)
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, so writes run in arrival order
+            async with lock:
+                yield
+        finally:
+            self._depths[account_id] -= 1
+            if not self._depths[account_id]:
+                del self._depths[account_id]
+                del self._locks[account_id]
+
+    @asynccontextmanager
+    async def acquire_many(self, account_ids: Iterable[int]) -> AsyncIterator[None]:
+        async with AsyncExitStack() as stack:
+            # A global acquisition order keeps multi-account writers deadlock free
+            for account_id in sorted(set(account_ids)):
+                await stack.enter_async_context(self.acquire(account_id))
+            yield
+
+    def queue_depths(self, min_depth: int = 1) -> Dict[int, int]:
+        return {account_id: depth for account_id, depth in self._depths.items() if depth >= min_depth}
+
+
+account_sequencer = AccountSequencer()
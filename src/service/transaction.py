@@ -1,52 +1,277 @@
-from typing import List
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, NoReturn, Optional, Tuple
 
+import sqlalchemy as sa
 from databases.interfaces import Record
 
-from src.database import database
+from src.config import settings
+from src.database import database, replicas, supports_writable_cte
 from src.exceptions import AccountNotFoundError, InsufficientBalanceError
+from src.metrics import timed
 from src.models.account import accounts
 from src.models.transaction import TransactionType, transactions
-from src.schemas.transaction import TransactionIn
+from src.pagination import decode_cursor
+from src.schemas.transaction import BatchMode, TransactionBatchIn, TransactionIn
+from src.service.admission import ConcurrencyLimiter, create_admission
+from src.service.archive import ledger
+from src.service.balance import balance_cache
+from src.service.feed import TransactionFeed, transaction_feed
+from src.service.group_commit import GroupCommitter
+from src.service.group_commit import group_committer as shared_group_committer
+from src.service.outbox import OutboxService
+from src.service.rollup import RollupService
+from src.service.sequencer import AccountSequencer, account_sequencer
+from src.service.writes import insert_row, insert_rows, update_row
+from src.timestamps import as_utc
 
 
 class TransactionService:
-    async def read_all(self, account_id: int, limit: int, skip: int = 0) -> List[Record]:
-        query = transactions.select().where(transactions.c.account_id == account_id).limit(limit).offset(skip)
-        return await database.fetch_all(query)
+    def __init__(
+        self,
+        sequencer: Optional[AccountSequencer] = None,
+        group_committer: Optional[GroupCommitter] = None,
+        outbox: Optional[OutboxService] = None,
+        feed: Optional[TransactionFeed] = None,
+        admission: Optional[ConcurrencyLimiter] = None,
+    ):
+        if sequencer is None and settings.account_write_serialization:
+            sequencer = account_sequencer
+        if group_committer is None and settings.group_commit_enabled:
+            group_committer = shared_group_committer
+        if outbox is None and settings.outbox_sink:
+            outbox = OutboxService()
+        self.sequencer = sequencer
+        self.group_committer = group_committer
+        self.rollups = RollupService()
+        self.outbox = outbox
+        self.feed = feed or transaction_feed
+        self.admission = admission or create_admission
 
-    @database.transaction()
-    async def create(self, transaction: TransactionIn) -> Record:
-        query = accounts.select().where(accounts.c.id == transaction.account_id)
-        account = await database.fetch_one(query)
-        if not account:
-            raise AccountNotFoundError(account_id=transaction.account_id)
+    @timed
+    async def read_all(
+        self,
+        account_id: int,
+        limit: int,
+        skip: int = 0,
+        after: Optional[str] = None,
+        consistent: bool = False,
+        start: Optional[datetime] = None,
+    ) -> List[Record]:
+        seek = decode_cursor(after) if after else None
 
-        if transaction.type == TransactionType.WITHDRAWAL:
-            balance = float(account.balance) - transaction.amount
-            if balance < 0:
-                raise InsufficientBalanceError(
-                    account_id=transaction.account_id,
-                    balance=float(account.balance)
+        def conditions(table: sa.Table) -> List[sa.sql.ColumnElement]:
+            where = [table.c.account_id == account_id]
+            if start:
+                where.append(table.c.timestamp >= start)
+            if seek:
+                # Keyset seek on (account_id, timestamp, id): cost is independent of page depth
+                timestamp, transaction_id = seek
+                where.append(
+                    sa.tuple_(table.c.timestamp, table.c.id)
+                    > sa.tuple_(
+                        sa.literal(timestamp, table.c.timestamp.type),
+                        sa.literal(transaction_id, table.c.id.type),
+                    )
                 )
+            return where
+
+        # The later of ``start`` and the cursor bounds every row of the page: past the
+        # archive horizon, the archive is not read at all
+        bounds = [as_utc(bound) for bound in (start, seek[0] if seek else None) if bound]
+        since = max(bounds, default=None)
+        if seek:
+            query = ledger(conditions, since=since, limit=limit)
         else:
-            balance = float(account.balance) + transaction.amount
+            query = ledger(conditions, since=since, limit=skip + limit).limit(limit).offset(skip)
+        # ``consistent`` reads from the primary, for callers that must see every committed row
+        return await (database if consistent else replicas).fetch_all(query)
 
-        # Create transaction entry
-        transaction_id = await self.__register_transaction(transaction)
-        # Update account balance
-        await self.__update_account_balance(transaction.account_id, balance)
+    @timed
+    async def create(
+        self,
+        transaction: TransactionIn,
+        in_transaction: Optional[Callable[[Record], Awaitable[None]]] = None,
+    ) -> Record:
+        # ``in_transaction`` runs after the ledger row is written, before the commit
+        # Sheds load before any queueing on accounts, the group committer or the pool
+        async with self.admission.slot():
+            record, balance = await self.__submit(transaction, in_transaction)
+        # Committed at this point: cache the balance the write produced
+        balance_cache.set(transaction.account_id, balance)
+        await self.feed.publish([record])
+        return record
 
-        query = transactions.select().where(transactions.c.id == transaction_id)
-        return await database.fetch_one(query)
+    @timed
+    async def create_batch(self, batch: TransactionBatchIn) -> Dict[str, Any]:
+        # Shares the create cap: a batch holds one slot for its whole transaction
+        async with self.admission.slot():
+            if self.sequencer is None:
+                result = await self.__create_batch(batch)
+            else:
+                async with self.sequencer.acquire_many(t.account_id for t in batch.transactions):
+                    result = await self.__create_batch(batch)
+        if result["committed"]:
+            for account_id in {t.account_id for t in batch.transactions}:
+                balance_cache.delete(account_id)
+            await self.feed.publish(item["transaction"] for item in result["results"] if item["status"] == "created")
+        return result
 
-    async def __update_account_balance(self, account_id: int, balance: float) -> None:
-        command = accounts.update().where(accounts.c.id == account_id).values(balance=balance)
-        await database.execute(command)
+    async def __submit(
+        self,
+        transaction: TransactionIn,
+        in_transaction: Optional[Callable[[Record], Awaitable[None]]],
+    ) -> Tuple[Record, float]:
+        if self.group_committer is not None:
+            # A group is applied item by item in arrival order, which already
+            # orders writes to the same account, so the sequencer is not needed
+            return await self.group_committer.submit(lambda: self.__create(transaction, in_transaction))
+        if self.sequencer is None:
+            return await self.__create(transaction, in_transaction)
+        # Queue behind in-flight writes to the same account before taking a connection
+        async with self.sequencer.acquire(transaction.account_id):
+            return await self.__create(transaction, in_transaction)
+
+    @database.transaction()
+    async def __create(
+        self,
+        transaction: TransactionIn,
+        in_transaction: Optional[Callable[[Record], Awaitable[None]]],
+    ) -> Tuple[Record, float]:
+        if supports_writable_cte:
+            # Balance check, balance update, ledger insert, rollups and outbox event in one statement
+            record = await database.fetch_one(self.__apply_transaction(transaction))
+            if not record:
+                await self.__raise_rejection(transaction)
+            if in_transaction:
+                await in_transaction(record)
+            return record, float(record.balance)
 
-    async def __register_transaction(self, transaction: TransactionIn) -> int:
-        command = transactions.insert().values(
+        # One statement per row written: the guarded balance update, the ledger row, the rollups
+        # and the outbox event
+        account = await update_row(self.__balance_update(transaction), accounts.c.id, accounts.c.balance)
+        if not account:
+            await self.__raise_rejection(transaction)
+        record = await insert_row(
+            transactions,
             account_id=transaction.account_id,
             type=transaction.type,
             amount=transaction.amount,
         )
-        return await database.execute(command)
\ No newline at end of file
+        await self.rollups.apply([record])
+        if self.outbox:
+            await self.outbox.publish([record])
+        if in_transaction:
+            await in_transaction(record)
+        return record, float(account.balance)
+
+    @database.transaction()
+    async def __create_batch(self, batch: TransactionBatchIn) -> Dict[str, Any]:
+        entries_by_account = defaultdict(list)
+        for index, transaction in enumerate(batch.transactions):
+            entries_by_account[transaction.account_id].append((index, transaction))
+
+        query = accounts.select().where(accounts.c.id.in_(list(entries_by_account))).with_for_update()
+        balances = {account.id: Decimal(str(account.balance)) for account in await database.fetch_all(query)}
+
+        results: List[Dict[str, Any]] = [{} for _ in batch.transactions]
+        accepted = []
+        deltas = {}
+        for account_id, entries in entries_by_account.items():
+            if account_id not in balances:
+                for index, _ in entries:
+                    results[index] = self.__rejected(index, AccountNotFoundError(account_id=account_id))
+                continue
+
+            balance = balances[account_id]
+            for index, transaction in entries:
+                amount = Decimal(str(transaction.amount))
+                if transaction.type == TransactionType.WITHDRAWAL:
+                    if balance < amount:
+                        error = InsufficientBalanceError(account_id=account_id, balance=float(balance))
+                        results[index] = self.__rejected(index, error)
+                        continue
+                    amount = -amount
+                balance += amount
+                accepted.append((index, transaction))
+            deltas[account_id] = float(balance - balances[account_id])
+
+        rejected = len(accepted) < len(batch.transactions)
+        if batch.mode == BatchMode.ATOMIC.value and rejected:
+            for index, _ in accepted:
+                results[index] = {"index": index, "status": "skipped"}
+            return {"committed": False, "results": results}
+
+        if accepted:
+            accepted.sort(key=lambda entry: entry[0])
+            records = await self.__register_transactions([transaction for _, transaction in accepted])
+            for (index, _), record in zip(accepted, records):
+                results[index] = {"index": index, "status": "created", "transaction": record}
+            await self.__apply_balance_deltas(deltas)
+            await self.rollups.apply(records)
+            if self.outbox:
+                await self.outbox.publish(records)
+
+        return {"committed": bool(accepted), "results": results}
+
+    def __rejected(self, index: int, error: Exception) -> Dict[str, Any]:
+        return {"index": index, "status": "rejected", "detail": str(error)}
+
+    async def __register_transactions(self, batch: List[TransactionIn]) -> List[Record]:
+        return await insert_rows(transactions, [
+            {"account_id": t.account_id, "type": t.type, "amount": t.amount} for t in batch
+        ])
+
+    async def __apply_balance_deltas(self, deltas: Dict[int, float]) -> None:
+        deltas = {account_id: delta for account_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        command = accounts.update().where(accounts.c.id.in_(list(deltas))).values(
+            balance=accounts.c.balance + sa.case(deltas, value=accounts.c.id)
+        )
+        await database.execute(command)
+
+    def __apply_transaction(self, transaction: TransactionIn) -> sa.sql.Select:
+        updated_account = (
+            self.__balance_update(transaction)
+            .returning(accounts.c.id, accounts.c.balance)
+            .cte("updated_account")
+        )
+        inserted_transaction = transactions.insert().from_select(
+            ["account_id", "type", "amount"],
+            sa.select(
+                updated_account.c.id,
+                sa.literal(transaction.type, transactions.c.type.type),
+                sa.literal(transaction.amount, transactions.c.amount.type),
+            ),
+        ).returning(*transactions.c).cte("inserted_transaction")
+        rollups = self.rollups.upsert_from(inserted_transaction).cte("updated_rollups")
+        # The new row plus the balance it produced, for the write-through cache
+        query = sa.select(inserted_transaction, updated_account.c.balance).select_from(
+            inserted_transaction.join(
+                updated_account, inserted_transaction.c.account_id == updated_account.c.id
+            )
+        ).add_cte(rollups)
+        if self.outbox:
+            query = query.add_cte(self.outbox.publish_from(inserted_transaction).cte("published_event"))
+        return query
+
+    async def __raise_rejection(self, transaction: TransactionIn) -> NoReturn:
+        query = accounts.select().where(accounts.c.id == transaction.account_id)
+        account = await database.fetch_one(query)
+        if not account:
+            raise AccountNotFoundError(account_id=transaction.account_id)
+        raise InsufficientBalanceError(
+            account_id=transaction.account_id,
+            balance=float(account.balance)
+        )
+
+    def __balance_update(self, transaction: TransactionIn) -> sa.sql.Update:
+        command = accounts.update().where(accounts.c.id == transaction.account_id)
+        if transaction.type == TransactionType.WITHDRAWAL:
+            # Debit only while the balance covers it, evaluated against the locked row
+            return command.where(accounts.c.balance >= transaction.amount).values(
+                balance=accounts.c.balance - transaction.amount
+            )
+        return command.values(balance=accounts.c.balance + transaction.amount)
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+import sqlalchemy as sa
+from databases.interfaces import Record
+
+from src.database import database, supports_returning
+
+# Rows per multi-row statement, kept well below the Postgres bind parameter limit
+WRITE_CHUNK_SIZE = 1000
+
+T = TypeVar("T")
+
+
+def chunked(rows: Sequence[T]) -> Iterator[Sequence[T]]:
+    for start in range(0, len(rows), WRITE_CHUNK_SIZE):
+        yield rows[start:start + WRITE_CHUNK_SIZE]
+
+
+async def insert_row(table: sa.Table, **values: Any) -> Record:
+    if supports_returning:
+        return await database.fetch_one(table.insert().values(**values).returning(*table.c))
+    row_id = await database.execute(table.insert().values(**values))
+    return await database.fetch_one(table.select().where(table.c.id == row_id))
+
+
+async def insert_rows(table: sa.Table, rows: List[Dict[str, Any]]) -> List[Record]:
+    if supports_returning:
+        records = []
+        for chunk in chunked(rows):
+            inserted = await database.fetch_all(table.insert().values(chunk).returning(*table.c))
+            # RETURNING order is unspecified; ids of one statement grow in input order
+            records.extend(sorted(inserted, key=lambda record: record.id))
+        return records
+    ids = [await database.execute(table.insert().values(**row)) for row in rows]
+    by_id = {record.id: record for record in await database.fetch_all(table.select().where(table.c.id.in_(ids)))}
+    return [by_id[row_id] for row_id in ids]
+
+
+async def update_row(command: sa.sql.Update, *columns: sa.Column) -> Optional[Record]:
+    # Single-row UPDATE; returns the new values, or None when the WHERE clause
+    # matched nothing. Without RETURNING it must run inside a transaction.
+    table = command.table
+    columns = columns or tuple(table.c)
+    if supports_returning:
+        return await database.fetch_one(command.returning(*columns))
+    row = await database.fetch_one(sa.select(table.c.id).where(command.whereclause).with_for_update())
+    if row is None:
+        return None
+    await database.execute(command.where(table.c.id == row.id))
+    return await database.fetch_one(sa.select(*columns).where(table.c.id == row.id))
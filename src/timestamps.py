@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+
+
+def as_utc(timestamp: datetime) -> datetime:
+    # SQLite hands back naive UTC values
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
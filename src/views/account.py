@@ -1,4 +1,5 @@
-from typing import Union
+from datetime import date
+from typing import List, Optional, Union
 
 from pydantic import AwareDatetime, BaseModel, NaiveDatetime, PositiveFloat
 
@@ -15,4 +16,24 @@ class TransactionOut(BaseModel):
     account_id: int
     type: str
     amount: PositiveFloat
-    timestamp: Union[AwareDatetime, NaiveDatetime]
\ No newline at end of file
+    timestamp: Union[AwareDatetime, NaiveDatetime]
+
+
+class BalanceOut(BaseModel):
+    account_id: int
+    balance: float
+    at: Optional[Union[AwareDatetime, NaiveDatetime]] = None
+
+
+class SummaryPeriodOut(BaseModel):
+    period_start: date
+    deposits: float
+    withdrawals: float
+    deposit_count: int
+    withdrawal_count: int
+
+
+class AccountSummaryOut(BaseModel):
+    account_id: int
+    granularity: str
+    periods: List[SummaryPeriodOut]
@@ -1,5 +1,6 @@
-from typing import Union
+from typing import Any, Dict, List, Optional, Union
 
+from databases.interfaces import Record
 from pydantic import AwareDatetime, BaseModel, NaiveDatetime, PositiveFloat
 
 
@@ -8,4 +9,27 @@ class TransactionOut(BaseModel):
     account_id: int
     type: str
     amount: PositiveFloat
-    timestamp: Union[AwareDatetime, NaiveDatetime]
\ No newline at end of file
+    timestamp: Union[AwareDatetime, NaiveDatetime]
+
+
+class TransactionBatchItemOut(BaseModel):
+    index: int
+    status: str
+    transaction: Optional[TransactionOut] = None
+    detail: Optional[str] = None
+
+
+class TransactionBatchOut(BaseModel):
+    committed: bool
+    results: List[TransactionBatchItemOut]
+
+
+def transaction_dict(record: Record) -> Dict[str, Any]:
+    # JSON-ready ledger row without a model round trip, for exports and events
+    return {
+        "id": record.id,
+        "account_id": record.account_id,
+        "type": getattr(record.type, "value", record.type),
+        "amount": float(record.amount),
+        "timestamp": record.timestamp.isoformat() if record.timestamp else None,
+    }
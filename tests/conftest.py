@@ -25,12 +25,39 @@ mock_db_instance.disconnect = AsyncMock()
 # Cria um metadata REAL do SQLAlchemy para os modelos funcionarem
 test_metadata = sa.MetaData()
 
+class MockReplicaRouter:
+    """Mock do ReplicaRouter sem réplicas: toda leitura vai ao primário."""
+    replicas = []
+
+    def healthy(self):
+        return []
+
+    async def run(self, read):
+        return await read(mock_db_instance)
+
+    async def fetch_all(self, query):
+        return await mock_db_instance.fetch_all(query)
+
+    async def fetch_one(self, query):
+        return await mock_db_instance.fetch_one(query)
+
+    async def fetch_val(self, query):
+        return await mock_db_instance.fetch_val(query)
+
+
 # Cria um mock do módulo database antes de ser importado
 class MockDatabaseModule:
     """Mock do módulo database."""
     def __init__(self):
         self.database = mock_db_instance
         self.metadata = test_metadata
+        self.dialect = "sqlite"
+        self.supports_returning = False
+        self.supports_writable_cte = False
+        self.pool_stats = lambda: {}
+        self.replicas = MockReplicaRouter()
+        self.connect = mock_db_instance.connect
+        self.disconnect = mock_db_instance.disconnect
 
 # Insere o mock no sys.modules antes de qualquer importação que use database
 sys.modules['src.database'] = MockDatabaseModule()
@@ -0,0 +1,55 @@
+"""Testes unitários para as tarefas periódicas em segundo plano."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.background import run_periodically
+
+
+async def run_ticks(task_fn, ticks, **kwargs):
+    # Troca o sleep por um que conta os intervalos e encerra o laço depois de ``ticks``
+    sleeps = []
+
+    async def fake_sleep(interval):
+        sleeps.append(interval)
+        if len(sleeps) > ticks:
+            raise asyncio.CancelledError
+
+    with patch("src.background.asyncio.sleep", fake_sleep):
+        with pytest.raises(asyncio.CancelledError):
+            await run_periodically(task_fn, 5.0, "Test run", **kwargs)
+    return sleeps
+
+
+class TestRunPeriodically:
+    """Testes para run_periodically."""
+
+    @pytest.mark.asyncio
+    async def test_waits_before_first_run(self):
+        """Testa que, por padrão, a primeira execução acontece após um intervalo."""
+        fn = AsyncMock()
+
+        sleeps = await run_ticks(fn, ticks=2)
+
+        assert sleeps == [5.0, 5.0, 5.0]
+        assert fn.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_run_first(self):
+        """Testa a execução imediata com ``run_first``."""
+        fn = AsyncMock()
+
+        await run_ticks(fn, ticks=2, run_first=True)
+
+        assert fn.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_is_logged_and_loop_continues(self):
+        """Testa que uma falha é registrada e a próxima execução acontece."""
+        fn = AsyncMock(side_effect=[RuntimeError("boom"), None])
+
+        with patch("src.background.logger") as logger:
+            await run_ticks(fn, ticks=2)
+
+        assert fn.await_count == 2
+        logger.exception.assert_called_once_with("%s failed", "Test run")
@@ -0,0 +1,61 @@
+"""Testes unitários para os filtros de Bloom."""
+from src.bloom import BloomFilter, ExpiringBloomFilter
+
+
+class TestBloomFilter:
+    """Testes para BloomFilter."""
+
+    def test_no_false_negatives(self):
+        """Testa que toda chave adicionada é encontrada."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"key-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        assert all(key in bloom for key in keys)
+
+    def test_false_positive_rate(self):
+        """Testa que a taxa de falsos positivos fica perto da configurada."""
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"in-{i}")
+
+        false_positives = sum(f"out-{i}" in bloom for i in range(20000))
+
+        assert false_positives / 20000 < 0.02
+
+    def test_sizing(self):
+        """Testa o dimensionamento em bits e funções de hash."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+        assert 9000 < bloom.size < 10000
+        assert bloom.hashes == 7
+        assert bloom.fill_ratio() == 0.0
+
+
+class TestExpiringBloomFilter:
+    """Testes para ExpiringBloomFilter."""
+
+    def test_probes_generation_of_expiry(self):
+        """Testa que a chave é procurada no filtro da sua expiração."""
+        bloom = ExpiringBloomFilter(window=60, capacity=100, error_rate=0.01)
+        bloom.add("a", expires_at=130)
+
+        assert bloom.might_contain("a", expires_at=130)
+        assert bloom.might_contain("a", expires_at=170)
+        assert not bloom.might_contain("a", expires_at=190)
+        assert len(bloom) == 1
+
+    def test_expire_drops_whole_generations(self):
+        """Testa que um filtro sai quando todas as suas chaves expiraram."""
+        bloom = ExpiringBloomFilter(window=60, capacity=100, error_rate=0.01)
+        bloom.add("a", expires_at=130)
+        bloom.add("b", expires_at=200)
+
+        bloom.expire(now=150)
+        assert len(bloom) == 2
+
+        bloom.expire(now=180)
+        assert len(bloom) == 1
+        assert not bloom.might_contain("a", expires_at=130)
+        assert bloom.might_contain("b", expires_at=200)
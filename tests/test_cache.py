@@ -0,0 +1,71 @@
+"""Testes unitários para TTLCache."""
+import time
+from unittest.mock import patch
+
+from src.cache import TTLCache
+
+
+class TestTTLCache:
+    """Testes para TTLCache."""
+
+    def test_set_get_delete(self):
+        """Testa operações básicas e contadores."""
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        cache.delete("a")
+        assert cache.get("a") is None
+        assert cache.stats() == {"size": 0, "hits": 1, "misses": 2}
+
+    def test_ttl_expiration(self):
+        """Testa expiração pelo TTL padrão."""
+        cache = TTLCache(maxsize=10, ttl=5)
+        now = time.time()
+        cache.set("a", 1)
+
+        with patch("src.cache.time.time", return_value=now + 6):
+            assert cache.get("a") is None
+
+    def test_explicit_deadline_caps_ttl(self):
+        """Testa que um prazo explícito menor que o TTL prevalece."""
+        cache = TTLCache(maxsize=10, ttl=300)
+        now = time.time()
+        cache.set("a", 1, expires_at=now + 1)
+
+        with patch("src.cache.time.time", return_value=now + 2):
+            assert cache.get("a") is None
+
+    def test_disabled_when_maxsize_is_zero(self):
+        """Testa que maxsize=0 desabilita o cache."""
+        cache = TTLCache(maxsize=0, ttl=60)
+        cache.set("a", 1)
+
+        assert len(cache) == 0
+
+    def test_fill_skips_keys_written_since(self):
+        """Testa que fill não sobrescreve uma gravação feita depois da leitura."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        since = cache.version
+
+        cache.set("a", 2)
+        assert cache.fill("a", 1, since) is False
+        assert cache.get("a") == 2
+
+        assert cache.fill("b", 3, since) is True
+        assert cache.get("b") == 3
+
+    def test_fill_skips_keys_deleted_since(self):
+        """Testa que fill respeita uma remoção feita depois da leitura, até o fim do TTL."""
+        cache = TTLCache(maxsize=10, ttl=5)
+        since = cache.version
+        cache.delete("a")
+
+        assert cache.fill("a", 1, since) is False
+        assert len(cache) == 0
+        with patch("src.cache.time.time", return_value=time.time() + 6):
+            cache.delete("b")
+            assert cache.fill("a", 1, since) is True
@@ -1,10 +1,17 @@
 """Testes unitários para o controller de contas."""
+import json
 import pytest
+from datetime import date, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.schemas.account import AccountIn
 
 
+def make_record(**values):
+    """Cria um registro falso com atributos e ``_mapping``."""
+    return MagicMock(_mapping=values, **values)
+
+
 @pytest.fixture
 def mock_account_service():
     """Mock do AccountService."""
@@ -24,6 +31,30 @@ def mock_transaction_service():
         yield mock
 
 
+@pytest.fixture
+def mock_export_service():
+    """Mock do ExportService."""
+    with patch("src.controller.account.export_service") as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_balance_service():
+    """Mock do BalanceService."""
+    with patch("src.controller.account.balance_service") as mock:
+        mock.read = AsyncMock()
+        mock.read_at = AsyncMock()
+        yield mock
+
+
+@pytest.fixture
+def mock_rollup_service():
+    """Mock do RollupService."""
+    with patch("src.controller.account.rollup_service") as mock:
+        mock.read_summary = AsyncMock()
+        yield mock
+
+
 @pytest.fixture
 def mock_login_required():
     """Mock do login_required."""
@@ -36,32 +67,57 @@ class TestAccountController:
 
     @pytest.mark.asyncio
     async def test_read_accounts_success(self, mock_account_service):
-        """Testa leitura de contas com sucesso."""
+        """Testa que a listagem retorna só as contas do usuário autenticado."""
         mock_records = [
-            MagicMock(id=1, user_id=123, balance=1000.0, created_at=None),
-            MagicMock(id=2, user_id=456, balance=500.0, created_at=None),
+            make_record(id=1, user_id=123, balance=1000.0, created_at=datetime(2024, 1, 1)),
+            make_record(id=2, user_id=123, balance=500.0, created_at=datetime(2024, 1, 2)),
         ]
-        mock_account_service.read_all = AsyncMock(return_value=mock_records)
+        mock_account_service.read_by_user = AsyncMock(return_value=mock_records)
 
         from src.controller.account import read_accounts
-        result = await read_accounts(limit=10, skip=0)
+        response = await read_accounts(limit=10, current_user={"user_id": 123})
+        result = json.loads(response.body)
 
         assert len(result) == 2
-        assert result[0].id == 1
-        assert result[1].id == 2
-        mock_account_service.read_all.assert_called_once_with(limit=10, skip=0)
+        assert result[0] == {"id": 1, "user_id": 123, "balance": 1000.0, "created_at": "2024-01-01T00:00:00"}
+        assert result[1]["id"] == 2
+        assert "X-Next-Cursor" not in response.headers
+        mock_account_service.read_by_user.assert_called_once_with(123, limit=10, after=None)
 
     @pytest.mark.asyncio
     async def test_read_accounts_with_pagination(self, mock_account_service):
-        """Testa leitura de contas com paginação."""
-        mock_records = []
-        mock_account_service.read_all = AsyncMock(return_value=mock_records)
+        """Testa a paginação por cursor da listagem do usuário."""
+        from src.pagination import decode_id_cursor, encode_id_cursor
+
+        mock_records = [make_record(id=7, user_id=123, balance=10.0, created_at=datetime(2024, 1, 1))]
+        mock_account_service.read_by_user = AsyncMock(return_value=mock_records)
 
         from src.controller.account import read_accounts
-        result = await read_accounts(limit=5, skip=10)
+        cursor = encode_id_cursor(5)
+        response = await read_accounts(limit=1, after=cursor, current_user={"user_id": 123})
 
-        assert result == []
-        mock_account_service.read_all.assert_called_once_with(limit=5, skip=10)
+        assert decode_id_cursor(response.headers["X-Next-Cursor"]) == 7
+        mock_account_service.read_by_user.assert_called_once_with(123, limit=1, after=cursor)
+
+    @pytest.mark.asyncio
+    async def test_read_all_accounts(self, mock_account_service):
+        """Testa a listagem global de contas."""
+        mock_account_service.read_all = AsyncMock(return_value=[])
+
+        from src.controller.account import read_all_accounts
+        result = await read_all_accounts(limit=5, skip=10)
+
+        assert json.loads(result.body) == []
+        mock_account_service.read_all.assert_called_once_with(limit=5, skip=10, after=None)
+
+    def test_read_all_accounts_requires_admin(self):
+        """Testa que a listagem global exige um administrador."""
+        from src.controller.account import router
+        from src.security import admin_required
+
+        route = next(r for r in router.routes if r.path == "/accounts/all")
+
+        assert any(dependency.call is admin_required for dependency in route.dependant.dependencies)
 
     @pytest.mark.asyncio
     async def test_create_account_success(self, mock_account_service):
@@ -77,21 +133,39 @@ class TestAccountController:
         assert result.user_id == 123
         mock_account_service.create.assert_called_once_with(account_in)
 
+    @pytest.mark.asyncio
+    async def test_create_accounts_bulk(self, mock_account_service):
+        """Testa criação de contas em lote."""
+        from src.controller.account import create_accounts_bulk
+        from src.schemas.account import AccountBulkIn
+
+        batch = AccountBulkIn(accounts=[{"user_id": 1, "balance": 10.0}, {"user_id": 2, "balance": 20.0}])
+        records = [MagicMock(id=1), MagicMock(id=2)]
+        mock_account_service.create_many = AsyncMock(return_value=records)
+
+        result = await create_accounts_bulk(batch)
+
+        assert result == records
+        mock_account_service.create_many.assert_called_once_with(batch.accounts)
+
     @pytest.mark.asyncio
     async def test_read_account_transactions_success(self, mock_transaction_service):
         """Testa leitura de transações de uma conta com sucesso."""
         mock_records = [
-            MagicMock(id=1, account_id=1, type="deposit", amount=100.0, timestamp=None),
-            MagicMock(id=2, account_id=1, type="withdrawal", amount=50.0, timestamp=None),
+            make_record(id=1, account_id=1, type="deposit", amount=100.0, timestamp=datetime(2024, 1, 1)),
+            make_record(id=2, account_id=1, type="withdrawal", amount=50.0, timestamp=datetime(2024, 1, 2)),
         ]
         mock_transaction_service.read_all = AsyncMock(return_value=mock_records)
 
         from src.controller.account import read_account_transactions
-        result = await read_account_transactions(id=1, limit=10, skip=0)
+        result = json.loads((await read_account_transactions(id=1, limit=10, skip=0)).body)
 
         assert len(result) == 2
-        assert result[0].account_id == 1
-        mock_transaction_service.read_all.assert_called_once_with(account_id=1, limit=10, skip=0)
+        assert result[0]["account_id"] == 1
+        assert result[1]["type"] == "withdrawal"
+        mock_transaction_service.read_all.assert_called_once_with(
+            account_id=1, limit=10, skip=0, after=None, start=None
+        )
 
     @pytest.mark.asyncio
     async def test_read_account_transactions_empty(self, mock_transaction_service):
@@ -101,5 +175,94 @@ class TestAccountController:
         from src.controller.account import read_account_transactions
         result = await read_account_transactions(id=1, limit=10, skip=0)
 
-        assert result == []
+        assert json.loads(result.body) == []
+
+
+    @pytest.mark.asyncio
+    async def test_read_account_transactions_next_cursor(self, mock_transaction_service):
+        """Testa o cabeçalho X-Next-Cursor quando a página está cheia."""
+        mock_records = [
+            make_record(id=1, account_id=1, type="deposit", amount=100.0, timestamp=datetime(2024, 1, 1)),
+            make_record(id=2, account_id=1, type="deposit", amount=50.0, timestamp=datetime(2024, 1, 2)),
+        ]
+        mock_transaction_service.read_all = AsyncMock(return_value=mock_records)
+
+        from src.controller.account import read_account_transactions
+        from src.pagination import decode_cursor
+        response = await read_account_transactions(id=1, limit=2, after="abc")
+
+        assert decode_cursor(response.headers["X-Next-Cursor"]) == (datetime(2024, 1, 2), 2)
+        mock_transaction_service.read_all.assert_called_once_with(
+            account_id=1, limit=2, skip=0, after="abc", start=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_account_transactions_last_page(self, mock_transaction_service):
+        """Testa ausência de cursor na última página."""
+        mock_records = [
+            make_record(id=1, account_id=1, type="deposit", amount=100.0, timestamp=datetime(2024, 1, 1)),
+        ]
+        mock_transaction_service.read_all = AsyncMock(return_value=mock_records)
+
+        from src.controller.account import read_account_transactions
+        response = await read_account_transactions(id=1, limit=2)
+
+        assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_export_account_transactions(self, mock_account_service, mock_export_service):
+        """Testa exportação em streaming do histórico."""
+        mock_account_service.read = AsyncMock(return_value=MagicMock(id=1))
+
+        from src.controller.account import export_account_transactions
+        from src.schemas.transaction import ExportFormat
+        response = await export_account_transactions(id=1, format=ExportFormat.CSV)
+
+        assert response.media_type == "text/csv"
+        assert "account-1-transactions.csv" in response.headers["content-disposition"]
+        mock_account_service.read.assert_called_once_with(1)
+        mock_export_service.stream.assert_called_once_with(
+            account_id=1, format=ExportFormat.CSV, start=None, end=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_account_balance(self, mock_balance_service):
+        """Testa leitura do saldo atual."""
+        mock_balance_service.read = AsyncMock(return_value=85.0)
+
+        from src.controller.account import read_account_balance
+        result = await read_account_balance(id=1)
+
+        assert result == {"account_id": 1, "balance": 85.0}
+        mock_balance_service.read_at.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_read_account_balance_at(self, mock_balance_service):
+        """Testa leitura do saldo em uma data."""
+        at = datetime(2024, 1, 1)
+        mock_balance_service.read_at = AsyncMock(return_value=100.0)
+
+        from src.controller.account import read_account_balance
+        result = await read_account_balance(id=1, at=at)
+
+        assert result == {"account_id": 1, "balance": 100.0, "at": at}
+        mock_balance_service.read_at.assert_called_once_with(1, at)
+
+    @pytest.mark.asyncio
+    async def test_read_account_summary(self, mock_account_service, mock_rollup_service):
+        """Testa o resumo por período servido dos rollups."""
+        from src.controller.account import read_account_summary
+        from src.schemas.account import SummaryGranularity
+
+        mock_account_service.read = AsyncMock()
+        periods = [{"period_start": date(2024, 1, 1), "deposits": 150.0, "withdrawals": 30.0,
+                    "deposit_count": 2, "withdrawal_count": 1}]
+        mock_rollup_service.read_summary = AsyncMock(return_value=periods)
+
+        result = await read_account_summary(id=1, granularity=SummaryGranularity.MONTH)
 
+        assert result == {"account_id": 1, "granularity": "month", "periods": periods}
+        mock_account_service.read.assert_called_once_with(1)
+        mock_rollup_service.read_summary.assert_called_once_with(
+            1, SummaryGranularity.MONTH, start=None, end=None
+        )
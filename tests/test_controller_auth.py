@@ -36,3 +36,18 @@ class TestAuthController:
             assert result["access_token"] == "mock_token_456"
             mock_sign_jwt.assert_called_once_with(user_id=456)
 
+    @pytest.mark.asyncio
+    async def test_logout_revokes_token(self):
+        """Testa que o logout revoga o token até a sua expiração."""
+        from unittest.mock import AsyncMock
+
+        from src.controller.auth import logout
+        from src.security import decode_jwt, sign_jwt
+
+        token = await decode_jwt(sign_jwt(123)["access_token"])
+        with patch("src.controller.auth.revocation_store") as mock_store:
+            mock_store.revoke = AsyncMock()
+            response = await logout(token)
+
+        assert response.status_code == 204
+        mock_store.revoke.assert_awaited_once_with(token.access_token.jti, token.access_token.exp)
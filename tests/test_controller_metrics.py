@@ -0,0 +1,20 @@
+"""Testes unitários para o controller de métricas."""
+import pytest
+
+
+class TestMetricsController:
+    """Testes para o endpoint /metrics."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_exposes_components(self):
+        """Testa que o endpoint inclui caches, exportação e group commit."""
+        from src.controller.metrics import metrics
+        response = await metrics()
+
+        body = response.body.decode()
+        assert response.media_type == "text/plain; version=0.0.4"
+        assert "token_cache_hits_total" in body
+        assert "balance_cache_misses_total" in body
+        assert "export_rows_streamed_total" in body
+        assert "group_commit_batch_size_bucket" in body
+        assert "db_pool_in_use" not in body
@@ -2,7 +2,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.schemas.transaction import TransactionIn
+from src.schemas.transaction import TransactionBatchIn, TransactionIn
 from src.models.transaction import TransactionType
 
 
@@ -74,3 +74,58 @@ class TestTransactionController:
         assert result.type == "withdrawal"
         assert result.amount == 50.0
 
+
+    @pytest.mark.asyncio
+    async def test_create_transactions_batch(self, mock_transaction_service):
+        """Testa criação de transações em lote."""
+        batch = TransactionBatchIn(
+            mode="best_effort",
+            transactions=[{"account_id": 1, "type": "deposit", "amount": 100.0}],
+        )
+        expected = {"committed": True, "results": [{"index": 0, "status": "created"}]}
+        mock_transaction_service.create_batch = AsyncMock(return_value=expected)
+
+        from src.controller.transction import create_transactions_batch
+        result = await create_transactions_batch(batch, MagicMock(method="POST"), {"user_id": 1})
+
+        assert result == expected
+        mock_transaction_service.create_batch.assert_called_once_with(batch)
+
+    @pytest.mark.asyncio
+    async def test_create_transactions_batch_charges_per_transaction(self, mock_transaction_service):
+        """Testa que o lote consome um token de escrita por transação."""
+        from src.exceptions import RateLimitExceededError
+        from src.ratelimit import RateLimiter
+        batch = TransactionBatchIn(
+            mode="best_effort",
+            transactions=[{"account_id": 1, "type": "deposit", "amount": 10.0}] * 3,
+        )
+        mock_transaction_service.create_batch = AsyncMock(return_value={"committed": True, "results": []})
+        write_limiter = RateLimiter(rate=1.0, burst=4, maxsize=10)
+
+        from src.controller.transction import create_transactions_batch
+        with patch("src.ratelimit.write_limiter", write_limiter):
+            await create_transactions_batch(batch, MagicMock(method="POST"), {"user_id": 1})
+            with pytest.raises(RateLimitExceededError):
+                await create_transactions_batch(batch, MagicMock(method="POST"), {"user_id": 1})
+
+        mock_transaction_service.create_batch.assert_called_once_with(batch)
+
+    @pytest.mark.asyncio
+    async def test_create_transaction_with_idempotency_key(self, mock_transaction_service):
+        """Testa que a repetição com a mesma Idempotency-Key não reexecuta a criação."""
+        from src.controller.transction import create_transaction
+        from src.service.idempotency import IdempotencyStore
+
+        transaction_in = TransactionIn(account_id=1, type=TransactionType.DEPOSIT, amount=100.0)
+        mock_record = MagicMock(id=1, account_id=1, type="deposit", amount=100.0, timestamp="2024-01-01T12:00:00")
+        mock_transaction_service.create = AsyncMock(return_value=mock_record)
+
+        with patch("src.controller.transction.idempotency_store", IdempotencyStore(maxsize=10, ttl=60)):
+            first = await create_transaction(transaction_in, idempotency_key="abc", current_user={"user_id": 1})
+            retry = await create_transaction(transaction_in, idempotency_key="abc", current_user={"user_id": 1})
+
+        assert first["id"] == 1
+        assert retry.status_code == 201
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        mock_transaction_service.create.assert_called_once_with(transaction_in)
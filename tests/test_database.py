@@ -0,0 +1,255 @@
+"""Testes unitários para o pool instrumentado de src/database.py."""
+import asyncio
+import importlib.util
+import pathlib
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.exceptions import DatabaseUnavailableError
+
+
+@pytest.fixture(scope="module")
+def real_database():
+    """Carrega o módulo src/database.py real (o conftest o substitui por um mock)."""
+    path = pathlib.Path(__file__).parent.parent / "src" / "database.py"
+    spec = importlib.util.spec_from_file_location("real_database", path)
+    module = importlib.util.module_from_spec(spec)
+    with patch("databases.Database"):
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def asyncpg_pool():
+    """Mock de um pool asyncpg."""
+    pool = MagicMock()
+    pool.acquire = AsyncMock(return_value="connection")
+    pool.release = AsyncMock()
+    pool.get_size = MagicMock(return_value=5)
+    pool.get_idle_size = MagicMock(return_value=4)
+    return pool
+
+
+class TestPoolOptions:
+    """Testes para pool_options."""
+
+    def test_postgres_options(self, real_database):
+        """Testa opções de pool para Postgres."""
+        options = real_database.pool_options("postgresql://u:p@localhost/db")
+
+        assert set(options) == {
+            "min_size", "max_size", "statement_cache_size", "max_queries",
+            "max_inactive_connection_lifetime",
+        }
+
+    def test_sqlite_has_no_pool_options(self, real_database):
+        """Testa que SQLite não recebe opções de pool."""
+        assert real_database.pool_options("sqlite+aiosqlite:///./bank.db") == {}
+
+
+class TestInstrumentedPool:
+    """Testes para InstrumentedPool."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_and_release(self, real_database, asyncpg_pool):
+        """Testa contadores de conexões em uso e histograma de espera."""
+        pool = real_database.InstrumentedPool(asyncpg_pool, acquire_timeout=1.5)
+
+        connection = await pool.acquire()
+        stats = pool.stats()
+        await pool.release(connection)
+
+        asyncpg_pool.acquire.assert_called_once_with(timeout=1.5)
+        asyncpg_pool.release.assert_called_once_with("connection")
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 4
+        assert stats["acquire_wait"].count == 1
+        assert pool.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self, real_database, asyncpg_pool):
+        """Testa que a espera esgotada vira DatabaseUnavailableError."""
+        asyncpg_pool.acquire = AsyncMock(side_effect=asyncio.TimeoutError)
+        pool = real_database.InstrumentedPool(asyncpg_pool, acquire_timeout=2)
+
+        with pytest.raises(DatabaseUnavailableError) as exc_info:
+            await pool.acquire()
+
+        assert exc_info.value.retry_after == 2
+        assert pool.timeouts == 1
+        assert pool.waiters == 0
+        assert pool.in_use == 0
+
+
+class TestSQLiteReturning:
+    """Testes para o compilador SQLite com RETURNING."""
+
+    def test_renders_returning(self, real_database):
+        """Testa que INSERT/UPDATE ... RETURNING compilam para SQLite."""
+        import sqlalchemy as sa
+        from sqlalchemy.dialects import sqlite
+
+        dialect = sqlite.dialect()
+        dialect.statement_compiler = real_database.SQLiteReturningCompiler
+        table = sa.Table("t", sa.MetaData(), sa.Column("id", sa.Integer, primary_key=True), sa.Column("v", sa.Integer))
+
+        insert = str(table.insert().values(v=1).returning(table.c.id).compile(dialect=dialect))
+        update = str(table.update().where(table.c.v > 0).values(v=0).returning(table.c.v).compile(dialect=dialect))
+
+        assert insert == "INSERT INTO t (v) VALUES (?) RETURNING t.id"
+        assert update == "UPDATE t SET v=? WHERE t.v > ? RETURNING t.v"
+
+
+class TestLazyDatabase:
+    """Testes para o Database construído no primeiro uso."""
+
+    def test_import_builds_nothing(self):
+        """Testa que importar o módulo não cria o Database nem carrega o driver."""
+        path = pathlib.Path(__file__).parent.parent / "src" / "database.py"
+        spec = importlib.util.spec_from_file_location("lazy_database", path)
+        module = importlib.util.module_from_spec(spec)
+        with patch("databases.Database") as database_class:
+            spec.loader.exec_module(module)
+
+        database_class.assert_not_called()
+        assert module.database._database is None
+
+    @pytest.mark.asyncio
+    async def test_transaction_decorator_resolves_on_call(self, real_database, tmp_path):
+        """Testa que o decorator de transação aplicado antes do primeiro uso funciona."""
+        import sqlalchemy as sa
+
+        database = real_database.LazyDatabase(f"sqlite+aiosqlite:///{tmp_path / 'lazy.db'}")
+        table = sa.Table("items", sa.MetaData(), sa.Column("name", sa.String))
+        table.metadata.create_all(sa.create_engine(f"sqlite:///{tmp_path / 'lazy.db'}"))
+
+        @database.transaction()
+        async def insert(name):
+            await database.execute(table.insert().values(name=name))
+            if name == "bad":
+                raise ValueError(name)
+
+        assert database._database is None
+        await database.connect()
+        try:
+            await insert("good")
+            with pytest.raises(ValueError):
+                await insert("bad")
+            names = [row.name for row in await database.fetch_all(table.select())]
+        finally:
+            await database.disconnect()
+
+        assert names == ["good"]
+
+
+def fake_database(name: str):
+    """Mock de um databases.Database conectado."""
+    db = MagicMock()
+    db.is_connected = True
+    db.fetch_all = AsyncMock(return_value=[name])
+    return db
+
+
+class TestReplicaRouter:
+    """Testes para o roteamento de leituras entre réplicas."""
+
+    @pytest.mark.asyncio
+    async def test_without_replicas_reads_primary(self, real_database):
+        """Testa que sem réplicas tudo vai ao primário."""
+        router = real_database.ReplicaRouter(fake_database("primary"), [], eject_seconds=30)
+
+        assert await router.fetch_all("q") == ["primary"]
+
+    @pytest.mark.asyncio
+    async def test_round_robin(self, real_database):
+        """Testa a alternância entre réplicas."""
+        router = real_database.ReplicaRouter(
+            fake_database("primary"), [fake_database("a"), fake_database("b")], eject_seconds=30
+        )
+
+        results = [(await router.fetch_all("q"))[0] for _ in range(4)]
+
+        assert results == ["a", "b", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_failing_replica_is_ejected(self, real_database):
+        """Testa que a réplica com falha sai de rotação e a leitura vai ao primário."""
+        broken = fake_database("a")
+        broken.fetch_all = AsyncMock(side_effect=ConnectionError("down"))
+        router = real_database.ReplicaRouter(fake_database("primary"), [broken, fake_database("b")], eject_seconds=30)
+
+        results = [(await router.fetch_all("q"))[0] for _ in range(3)]
+
+        assert results == ["primary", "b", "b"]
+        assert broken.fetch_all.call_count == 1
+        assert router.healthy() == [router.replicas[1]]
+
+    @pytest.mark.asyncio
+    async def test_ejected_replica_returns_after_window(self, real_database):
+        """Testa a volta da réplica após a janela de ejeção."""
+        replica = fake_database("a")
+        replica.fetch_all = AsyncMock(side_effect=[ConnectionError("down"), ["a"]])
+        router = real_database.ReplicaRouter(fake_database("primary"), [replica], eject_seconds=0)
+
+        assert await router.fetch_all("q") == ["primary"]
+        assert await router.fetch_all("q") == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_query_error_keeps_replica(self, real_database):
+        """Testa que um erro da própria consulta não ejeta a réplica."""
+        primary = fake_database("primary")
+        primary.fetch_all = AsyncMock(side_effect=ValueError("bad query"))
+        replica = fake_database("a")
+        replica.fetch_all = AsyncMock(side_effect=ValueError("bad query"))
+        router = real_database.ReplicaRouter(primary, [replica], eject_seconds=30)
+
+        with pytest.raises(ValueError):
+            await router.fetch_all("q")
+
+        assert router.healthy() == [replica]
+
+    @pytest.mark.asyncio
+    async def test_connect_failure_ejects(self, real_database):
+        """Testa que uma réplica fora do ar não impede a inicialização."""
+        replica = fake_database("a")
+        replica.connect = AsyncMock(side_effect=OSError("refused"))
+        router = real_database.ReplicaRouter(fake_database("primary"), [replica], eject_seconds=30)
+
+        await router.connect()
+
+        assert router.healthy() == []
+
+    @pytest.mark.asyncio
+    async def test_two_sqlite_instances(self, real_database, tmp_path):
+        """Testa o roteamento com um primário e uma réplica SQLite locais."""
+        import databases
+        import sqlalchemy as sa
+
+        table = sa.Table("items", sa.MetaData(), sa.Column("name", sa.String))
+        urls = {}
+        for name in ("primary", "replica"):
+            path = tmp_path / f"{name}.db"
+            engine = sa.create_engine(f"sqlite:///{path}")
+            table.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(table.insert().values(name=name))
+            urls[name] = f"sqlite+aiosqlite:///{path}"
+
+        primary = databases.Database(urls["primary"])
+        replica = databases.Database(urls["replica"])
+        router = real_database.ReplicaRouter(primary, [replica], eject_seconds=30)
+        await primary.connect()
+        await router.connect()
+        try:
+            assert (await router.fetch_one(table.select())).name == "replica"
+            assert (await primary.fetch_one(table.select())).name == "primary"
+
+            (tmp_path / "replica.db").unlink()
+            await replica.disconnect()
+            await router.connect()
+            # The replica reconnects to an empty file and fails the read
+            assert (await router.fetch_one(table.select())).name == "primary"
+            assert router.healthy() == []
+        finally:
+            await router.disconnect()
+            await primary.disconnect()
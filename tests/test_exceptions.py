@@ -7,6 +7,8 @@ from src.exceptions import (
     InsufficientBalanceError,
     InvalidAmountError,
     InvalidTransactionError,
+    RateLimitExceededError,
+    ServiceOverloadedError,
     TransactionNotFoundError,
 )
 
@@ -130,3 +132,17 @@ class TestInvalidTransactionError:
         assert error.message == "Transaction is invalid for this account type"
 
 
+class TestLoadSheddingErrors:
+    """Testes para RateLimitExceededError e ServiceOverloadedError."""
+
+    def test_rate_limit_exceeded_error(self):
+        """Testa RateLimitExceededError com retry_after."""
+        error = RateLimitExceededError(retry_after=1.5)
+        assert str(error) == "Rate limit exceeded. Try again later."
+        assert error.retry_after == 1.5
+
+    def test_service_overloaded_error(self):
+        """Testa ServiceOverloadedError sem retry_after."""
+        error = ServiceOverloadedError()
+        assert str(error) == "Server is busy. Try again later."
+        assert error.retry_after is None
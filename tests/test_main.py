@@ -0,0 +1,89 @@
+"""Testes unitários para a fábrica da aplicação."""
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.config import Settings, settings
+from src.metrics import registry
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestCreateApp:
+    """Testes para create_app."""
+
+    def test_registers_routes_and_handlers(self):
+        """Testa que a aplicação criada tem as rotas e os tratadores de erro."""
+        from src.exceptions import AccountNotFoundError, RateLimitExceededError
+        from src.main import create_app
+
+        app = create_app()
+        paths = {route.path for route in app.routes}
+
+        assert {"/auth/login", "/accounts/", "/transactions/", "/metrics"} <= paths
+        assert AccountNotFoundError in app.exception_handlers
+        assert RateLimitExceededError in app.exception_handlers
+
+    def test_rejects_settings_after_components_are_built(self):
+        """Testa que configurações novas são recusadas depois que os componentes já foram criados."""
+        from src.main import create_app
+        from src.service.balance import balance_cache
+        from src.service.feed import transaction_feed
+
+        create_app()
+        with pytest.raises(RuntimeError, match="feed_buffer_size"):
+            create_app(Settings(feed_buffer_size=7, balance_cache_ttl=99))
+
+        assert transaction_feed.buffer_size == settings.feed_buffer_size == 100
+        assert balance_cache.ttl == settings.balance_cache_ttl == 5.0
+
+    def test_accepts_unchanged_settings(self):
+        """Testa que repassar as configurações em vigor não é um erro."""
+        from src.main import create_app
+
+        assert create_app(settings.model_copy()) is not None
+
+    def test_applies_settings_before_components_are_built(self):
+        """Testa que, num processo novo, as configurações passadas chegam aos componentes."""
+        script = (
+            "from src.config import Settings\n"
+            "from src.main import create_app\n"
+            "create_app(Settings(feed_buffer_size=7, balance_cache_ttl=99, group_commit_enabled=True))\n"
+            "from src.controller.transction import service\n"
+            "from src.service.balance import balance_cache\n"
+            "from src.service.feed import transaction_feed\n"
+            "assert transaction_feed.buffer_size == 7\n"
+            "assert balance_cache.ttl == 99\n"
+            "assert service.group_committer is not None\n"
+        )
+        env = {**os.environ, "DATABASE_URL": "sqlite+aiosqlite:///:memory:"}
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
+
+    def test_module_app_is_built_on_access(self):
+        """Testa que ``src.main:app`` continua disponível e é criado uma vez."""
+        import src.main
+
+        assert src.main.app is src.main.app
+
+    @pytest.mark.asyncio
+    async def test_lifespan_records_cold_start(self, mock_database):
+        """Testa que o tempo de cold start é medido a partir da origem informada."""
+        from src.main import create_app
+
+        app = create_app(started_at=1000.0)
+        before = registry.histogram("app_cold_start_seconds").snapshot()
+
+        with patch("src.main.time.time", return_value=1002.5):
+            async with app.router.lifespan_context(app):
+                pass
+
+        histogram = registry.histogram("app_cold_start_seconds")
+        assert histogram.count == before["count"] + 1
+        assert histogram.sum - before["sum"] == pytest.approx(2.5)
+        mock_database.connect.assert_awaited()
+        mock_database.disconnect.assert_awaited()
@@ -0,0 +1,107 @@
+"""Testes unitários para as métricas."""
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.metrics import Histogram, MetricsMiddleware, Registry, registry, timed
+
+
+class TestHistogram:
+    """Testes para Histogram."""
+
+    def test_observe(self):
+        """Testa a contagem por faixa e os totais."""
+        histogram = Histogram(buckets=(1, 5, 10))
+
+        for value in (0.5, 1, 3, 7, 50):
+            histogram.observe(value)
+
+        assert histogram.count == 5
+        assert histogram.sum == 61.5
+        assert histogram.cumulative() == [(1, 2), (5, 3), (10, 4), (float("inf"), 5)]
+
+
+class TestRegistry:
+    """Testes para Registry."""
+
+    def test_render_counters_and_histograms(self):
+        """Testa a renderização no formato texto do Prometheus."""
+        registry = Registry()
+        registry.inc("domain_errors_total", {"error": "InsufficientBalanceError"})
+        registry.inc("domain_errors_total", {"error": "InsufficientBalanceError"})
+        registry.observe("latency_seconds", {"route": "/a"}, 0.003)
+
+        text = registry.render()
+
+        assert "# TYPE domain_errors_total counter" in text
+        assert 'domain_errors_total{error="InsufficientBalanceError"} 2.0' in text
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/a",le="0.0025"} 0' in text
+        assert 'latency_seconds_bucket{route="/a",le="0.005"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 1' in text
+        assert 'latency_seconds_count{route="/a"} 1' in text
+
+    def test_render_collectors(self):
+        """Testa valores coletados no momento da leitura."""
+        registry = Registry()
+        registry.register_collector(lambda: [("cache_entries", "gauge", {}, 3)])
+
+        assert "# TYPE cache_entries gauge\ncache_entries 3\n" in registry.render()
+
+    def test_label_escaping(self):
+        """Testa o escape de aspas nos rótulos."""
+        registry = Registry()
+        registry.inc("c", {"path": 'a"b'})
+
+        assert 'c{path="a\\"b"} 1.0' in registry.render()
+
+
+class TestTimed:
+    """Testes para o decorator timed."""
+
+    @pytest.mark.asyncio
+    async def test_records_service_and_outcome(self):
+        """Testa o registro de duração por serviço, método e resultado."""
+        class FakeService:
+            @timed
+            async def work(self, fail=False):
+                if fail:
+                    raise ValueError()
+                return "done"
+
+        service = FakeService()
+        assert await service.work() == "done"
+        with pytest.raises(ValueError):
+            await service.work(fail=True)
+
+        labels = {"service": "TestTimed.test_records_service_and_outcome.<locals>.FakeService", "method": "work"}
+        assert registry.histogram("service_call_duration_seconds", {**labels, "outcome": "ok"}).count == 1
+        assert registry.histogram("service_call_duration_seconds", {**labels, "outcome": "error"}).count == 1
+
+
+class TestMetricsMiddleware:
+    """Testes para MetricsMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_records_route_template_and_status(self):
+        """Testa a latência por rota (template) e código de status."""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def read_item(item_id: int):
+            return {"id": item_id}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/items/1")
+            await client.get("/items/2")
+            await client.get("/missing")
+
+        ok = registry.histogram(
+            "http_request_duration_seconds", {"method": "GET", "route": "/items/{item_id}", "status": 200}
+        )
+        missing = registry.histogram(
+            "http_request_duration_seconds", {"method": "GET", "route": "unmatched", "status": 404}
+        )
+        assert ok.count == 2
+        assert missing.count >= 1
@@ -0,0 +1,68 @@
+"""Testes unitários para os cursores de paginação."""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from src.exceptions import InvalidCursorError
+from src.pagination import decode_cursor, decode_id_cursor, encode_cursor, encode_id_cursor, next_cursor, next_id_cursor
+
+
+class TestCursor:
+    """Testes para encode_cursor/decode_cursor."""
+
+    def test_round_trip(self):
+        """Testa que o cursor decodificado é igual ao original."""
+        timestamp = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+        cursor = encode_cursor(timestamp, 42)
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (timestamp, 42)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W1060", "e30"])
+    def test_decode_invalid_cursor(self, cursor):
+        """Testa cursores malformados."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
+
+
+class TestNextCursor:
+    """Testes para next_cursor."""
+
+    def test_full_page_returns_cursor(self):
+        """Testa cursor gerado a partir do último registro."""
+        records = [
+            MagicMock(id=1, timestamp=datetime(2024, 1, 1)),
+            MagicMock(id=2, timestamp=datetime(2024, 1, 2)),
+        ]
+
+        assert decode_cursor(next_cursor(records, limit=2)) == (datetime(2024, 1, 2), 2)
+
+    def test_partial_page_returns_none(self):
+        """Testa que a última página não gera cursor."""
+        records = [MagicMock(id=1, timestamp=datetime(2024, 1, 1))]
+
+        assert next_cursor(records, limit=2) is None
+        assert next_cursor([], limit=2) is None
+
+
+class TestIdCursor:
+    """Testes para os cursores por ``id``."""
+
+    def test_round_trip(self):
+        """Testa codificação e decodificação."""
+        assert decode_id_cursor(encode_id_cursor(42)) == 42
+
+    def test_rejects_other_cursors(self):
+        """Testa que cursores inválidos ou de outro formato são rejeitados."""
+        with pytest.raises(InvalidCursorError):
+            decode_id_cursor("not-a-cursor")
+        with pytest.raises(InvalidCursorError):
+            decode_id_cursor(encode_cursor(datetime(2024, 1, 1), 1))
+
+    def test_next_id_cursor(self):
+        """Testa o cursor da próxima página só quando a página vem cheia."""
+        records = [MagicMock(id=1), MagicMock(id=2)]
+
+        assert decode_id_cursor(next_id_cursor(records, limit=2)) == 2
+        assert next_id_cursor(records, limit=3) is None
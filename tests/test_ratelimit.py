@@ -0,0 +1,106 @@
+"""Testes unitários para o rate limiting por usuário."""
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.exceptions import RateLimitExceededError
+from src.ratelimit import RateLimiter, charge, rate_limit
+
+
+def request(method):
+    return MagicMock(method=method)
+
+
+class TestRateLimiter:
+    """Testes para o token bucket."""
+
+    def test_allows_burst_then_rejects(self):
+        """Testa que o burst é liberado e a requisição seguinte é recusada."""
+        limiter = RateLimiter(rate=1.0, burst=3, maxsize=10)
+
+        with patch("src.ratelimit.time.monotonic", return_value=100.0):
+            waits = [limiter.acquire(1) for _ in range(4)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(1.0)
+        assert limiter.allowed == 3
+        assert limiter.rejected == 1
+
+    def test_refills_over_time(self):
+        """Testa a reposição de tokens na taxa configurada."""
+        limiter = RateLimiter(rate=2.0, burst=1, maxsize=10)
+
+        with patch("src.ratelimit.time.monotonic", return_value=100.0):
+            assert limiter.acquire(1) == 0.0
+            assert limiter.acquire(1) == pytest.approx(0.5)
+        with patch("src.ratelimit.time.monotonic", return_value=100.5):
+            assert limiter.acquire(1) == 0.0
+
+    def test_keys_have_separate_buckets(self):
+        """Testa que cada usuário tem seu próprio orçamento."""
+        limiter = RateLimiter(rate=1.0, burst=1, maxsize=10)
+
+        with patch("src.ratelimit.time.monotonic", return_value=100.0):
+            assert limiter.acquire(1) == 0.0
+            assert limiter.acquire(2) == 0.0
+            assert limiter.acquire(1) > 0
+
+    def test_evicts_least_recently_seen(self):
+        """Testa o limite de usuários rastreados."""
+        limiter = RateLimiter(rate=1.0, burst=1, maxsize=2)
+
+        for key in (1, 2, 3):
+            limiter.acquire(key)
+
+        assert len(limiter) == 2
+
+    def test_disabled_with_zero_rate(self):
+        """Testa que taxa zero desativa o limitador."""
+        assert RateLimiter(rate=0.0, burst=1, maxsize=10).enabled is False
+
+
+class TestRateLimitDependency:
+    """Testes para a dependência que aplica os orçamentos de leitura e escrita."""
+
+    @pytest.mark.asyncio
+    async def test_uses_read_and_write_budgets(self):
+        """Testa que GET consome o orçamento de leitura e POST o de escrita."""
+        read_limiter = RateLimiter(rate=1.0, burst=1, maxsize=10)
+        write_limiter = RateLimiter(rate=1.0, burst=1, maxsize=10)
+        user = {"user_id": 1}
+
+        with patch("src.ratelimit.read_limiter", read_limiter), patch("src.ratelimit.write_limiter", write_limiter):
+            await rate_limit(request("GET"), user)
+            await rate_limit(request("POST"), user)
+            with pytest.raises(RateLimitExceededError) as exc_info:
+                await rate_limit(request("POST"), user)
+
+        assert exc_info.value.retry_after > 0
+        assert read_limiter.allowed == 1
+        assert write_limiter.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_limiter_admits(self):
+        """Testa que um orçamento desativado não limita."""
+        with patch("src.ratelimit.read_limiter", RateLimiter(rate=0.0, burst=0, maxsize=10)):
+            for _ in range(10):
+                await rate_limit(request("GET"), {"user_id": 1})
+
+    def test_charge_costs_tokens(self):
+        """Testa que o custo informado consome vários tokens de uma vez."""
+        write_limiter = RateLimiter(rate=1.0, burst=5, maxsize=10)
+
+        with patch("src.ratelimit.write_limiter", write_limiter):
+            charge("POST", 1, cost=3)
+            with pytest.raises(RateLimitExceededError) as exc_info:
+                charge("POST", 1, cost=3)
+
+        assert exc_info.value.retry_after == pytest.approx(1.0, abs=0.01)
+
+    def test_charge_above_burst_needs_full_bucket(self):
+        """Testa que um custo acima da rajada espera o balde cheio em vez de nunca passar."""
+        write_limiter = RateLimiter(rate=1.0, burst=5, maxsize=10)
+
+        with patch("src.ratelimit.write_limiter", write_limiter):
+            charge("POST", 1, cost=50)
+            with pytest.raises(RateLimitExceededError):
+                charge("POST", 1, cost=1)
@@ -0,0 +1,73 @@
+"""Testes unitários para as respostas de src/responses.py."""
+import json
+import pytest
+from datetime import datetime
+from typing import List
+from unittest.mock import MagicMock
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.responses import ModelJSONResponse, record_dicts
+from src.views.account import AccountOut, TransactionOut
+
+
+class TestModelJSONResponse:
+    """Testes para ModelJSONResponse."""
+
+    def test_renders_validated_models(self):
+        """Testa a serialização de dicts validados pelo adapter."""
+        adapter = TypeAdapter(List[TransactionOut])
+        rows = [{"id": 1, "account_id": 2, "type": "deposit", "amount": 10, "timestamp": datetime(2024, 1, 1)}]
+
+        response = ModelJSONResponse(rows, adapter, headers={"X-Next-Cursor": "abc"})
+
+        assert response.media_type == "application/json"
+        assert response.headers["X-Next-Cursor"] == "abc"
+        assert json.loads(response.body) == [
+            {"id": 1, "account_id": 2, "type": "deposit", "amount": 10.0, "timestamp": "2024-01-01T00:00:00"}
+        ]
+
+    def test_drops_unknown_columns(self):
+        """Testa que colunas fora do modelo não vazam na resposta."""
+        adapter = TypeAdapter(List[AccountOut])
+        rows = [{"id": 1, "user_id": 2, "balance": 5, "created_at": datetime(2024, 1, 1), "secret": "x"}]
+
+        body = json.loads(ModelJSONResponse(rows, adapter).body)
+
+        assert "secret" not in body[0]
+
+    def test_invalid_rows_raise(self):
+        """Testa que linhas inválidas falham como no response_model."""
+        adapter = TypeAdapter(List[TransactionOut])
+        rows = [{"id": 1, "account_id": 2, "type": "deposit", "amount": -1, "timestamp": datetime(2024, 1, 1)}]
+
+        with pytest.raises(ValidationError):
+            ModelJSONResponse(rows, adapter)
+
+
+class TestRecordDicts:
+    """Testes para record_dicts."""
+
+    def test_converts_mappings(self):
+        """Testa a conversão dos registros para dicts."""
+        records = [MagicMock(_mapping={"id": 1}), MagicMock(_mapping={"id": 2})]
+
+        assert record_dicts(records) == [{"id": 1}, {"id": 2}]
+
+
+class TestOpenAPISchema:
+    """Testes para o schema das rotas de listagem."""
+
+    def test_list_routes_keep_response_schema(self):
+        """Testa que as rotas rápidas mantêm o schema do response_model."""
+        from fastapi import FastAPI
+        from src.controller.account import router
+
+        app = FastAPI()
+        app.include_router(router)
+        paths = app.openapi()["paths"]
+        accounts = paths["/accounts/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        transactions = paths["/accounts/{id}/transactions"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+        assert accounts["items"] == {"$ref": "#/components/schemas/AccountOut"}
+        assert transactions["items"] == {"$ref": "#/components/schemas/TransactionOut"}
@@ -11,6 +11,9 @@ from src.security import (
     JWTBearer,
     get_current_user,
     login_required,
+    admin_required,
+    token_cache,
+    TokenCache,
     SECRET,
     ALGORITHM,
 )
@@ -136,6 +139,23 @@ class TestJWTBearer:
         assert result is not None
         assert result.access_token.sub == user_id
 
+    @pytest.mark.asyncio
+    async def test_jwt_bearer_revoked_token(self):
+        """Testa JWTBearer com token revogado."""
+        from src.service.revocation import revocation_store
+
+        token = sign_jwt(123)["access_token"]
+        request = MagicMock()
+        request.headers = {"Authorization": f"Bearer {token}"}
+        payload = await decode_jwt(token)
+        await revocation_store.revoke(payload.access_token.jti, payload.access_token.exp)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await JWTBearer()(request)
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Token has been revoked."
+
     @pytest.mark.asyncio
     async def test_jwt_bearer_invalid_scheme(self):
         """Testa JWTBearer com esquema inválido."""
@@ -225,3 +245,88 @@ class TestLoginRequired:
         assert "Access denied" in exc_info.value.detail
 
 
+class TestAdminRequired:
+    """Testes para admin_required."""
+
+    def test_admin_required_with_admin(self):
+        """Testa admin_required com usuário listado em ADMIN_USER_IDS."""
+        with patch("src.security.settings") as mock_settings:
+            mock_settings.admin_user_ids = [1]
+            assert admin_required({"user_id": 1}) == {"user_id": 1}
+
+    def test_admin_required_with_regular_user(self):
+        """Testa admin_required com usuário comum."""
+        with patch("src.security.settings") as mock_settings:
+            mock_settings.admin_user_ids = [1]
+            with pytest.raises(HTTPException) as exc_info:
+                admin_required({"user_id": 2})
+
+        assert exc_info.value.status_code == 403
+
+
+
+
+class TestTokenCache:
+    """Testes para o cache de tokens verificados."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Limpa o cache global entre os testes."""
+        token_cache.clear()
+        yield
+        token_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_decode_jwt_uses_cache(self):
+        """Testa que a segunda decodificação não verifica o token novamente."""
+        token = sign_jwt(123)["access_token"]
+
+        first = await decode_jwt(token)
+        with patch("src.security.jwt.decode") as mock_decode:
+            second = await decode_jwt(token)
+
+        mock_decode.assert_not_called()
+        assert second is first
+        assert token_cache.hits == 1
+        assert token_cache.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_is_not_cached(self):
+        """Testa que tokens inválidos não entram no cache."""
+        await decode_jwt("invalid.token.here")
+
+        assert len(token_cache) == 0
+
+    def test_entry_expires_with_token(self):
+        """Testa que a entrada expira junto com o token."""
+        from src.security import AccessToken, JWTToken
+        now = time.time()
+        payload = JWTToken(access_token=AccessToken(
+            iss="desafio-bank.com.br", sub=1, aud="desafio-bank",
+            exp=now + 10, iat=now, nbf=now, jti="test",
+        ))
+        cache = TokenCache(maxsize=10, ttl=300)
+        cache.set("token", payload)
+
+        assert cache.get("token") is payload
+        with patch("src.security.time.time", return_value=now + 11):
+            assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Testa a remoção do item menos usado quando o cache enche."""
+        from src.security import AccessToken, JWTToken
+        now = time.time()
+        payload = JWTToken(access_token=AccessToken(
+            iss="desafio-bank.com.br", sub=1, aud="desafio-bank",
+            exp=now + 1800, iat=now, nbf=now, jti="test",
+        ))
+        cache = TokenCache(maxsize=2, ttl=300)
+        cache.set("a", payload)
+        cache.set("b", payload)
+        cache.get("a")
+        cache.set("c", payload)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is payload
+        assert cache.get("c") is payload
@@ -1,7 +1,11 @@
 """Testes unitários para AccountService."""
+import json
 import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from sqlalchemy.dialects import postgresql
+
 from src.exceptions import AccountNotFoundError
 from src.service.account import AccountService
 from src.schemas.account import AccountIn
@@ -42,6 +46,54 @@ class TestAccountService:
         assert result == []
         mock_database.fetch_all.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_read_all_with_cursor(self, account_service, mock_database):
+        """Testa a listagem global com cursor em vez de OFFSET."""
+        from src.pagination import encode_id_cursor
+
+        mock_database.fetch_all = AsyncMock(return_value=[])
+
+        await account_service.read_all(limit=5, skip=10, after=encode_id_cursor(42))
+
+        sql = str(mock_database.fetch_all.call_args.args[0].compile(compile_kwargs={"literal_binds": True}))
+        assert "accounts.id > 42" in sql
+        assert "ORDER BY accounts.id" in sql
+        assert "OFFSET" not in sql
+
+    @pytest.mark.asyncio
+    async def test_read_by_user(self, account_service, mock_database):
+        """Testa a listagem das contas de um usuário por keyset em (user_id, id)."""
+        from src.pagination import encode_id_cursor
+
+        mock_database.fetch_all = AsyncMock(return_value=[])
+
+        await account_service.read_by_user(123, limit=20, after=encode_id_cursor(7))
+
+        sql = str(mock_database.fetch_all.call_args.args[0].compile(compile_kwargs={"literal_binds": True}))
+        assert "accounts.user_id = 123" in sql
+        assert "accounts.id > 7" in sql
+        assert "ORDER BY accounts.id" in sql
+        assert "LIMIT 20" in sql
+
+    @pytest.mark.asyncio
+    async def test_read_success(self, account_service, mock_database, sample_account_record):
+        """Testa leitura de uma conta por ID."""
+        mock_database.fetch_one = AsyncMock(return_value=MagicMock(**sample_account_record))
+
+        result = await account_service.read(1)
+
+        assert result.id == 1
+
+    @pytest.mark.asyncio
+    async def test_read_not_found(self, account_service, mock_database):
+        """Testa leitura de conta inexistente."""
+        mock_database.fetch_one = AsyncMock(return_value=None)
+
+        with pytest.raises(AccountNotFoundError) as exc_info:
+            await account_service.read(999)
+
+        assert exc_info.value.account_id == 999
+
     @pytest.mark.asyncio
     async def test_create_account_success(
         self, account_service, mock_database, sample_account_in, sample_account_record
@@ -84,3 +136,66 @@ class TestAccountService:
         assert result.user_id == 456
         assert result.balance == 0.01
 
+
+
+class TestAccountServiceBulk:
+    """Testes para a criação de contas em lote."""
+
+    @pytest.fixture
+    def account_service(self):
+        """Cria uma instância do AccountService."""
+        return AccountService()
+
+    @staticmethod
+    def _record(id, user_id):
+        return MagicMock(id=id, user_id=user_id, balance=10.0, created_at=datetime(2024, 1, 1))
+
+    @pytest.mark.asyncio
+    async def test_create_many_with_returning_uses_chunked_inserts(self, account_service, mock_database):
+        """Testa INSERTs multi-linha por bloco, sem leitura de volta."""
+        batch = [AccountIn(user_id=i, balance=10.0) for i in range(5)]
+        chunks = [[self._record(1, 0), self._record(2, 1)], [self._record(3, 2), self._record(4, 3)], [self._record(5, 4)]]
+        mock_database.fetch_all = AsyncMock(side_effect=chunks)
+        mock_database.execute = AsyncMock()
+        mock_database.fetch_one = AsyncMock()
+
+        with patch("src.service.writes.supports_returning", True), \
+                patch("src.service.writes.WRITE_CHUNK_SIZE", 2):
+            result = await account_service.create_many(batch)
+
+        assert [record.id for record in result] == [1, 2, 3, 4, 5]
+        assert mock_database.fetch_all.call_count == 3
+        mock_database.execute.assert_not_called()
+        mock_database.fetch_one.assert_not_called()
+        sql = str(mock_database.fetch_all.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+        assert "RETURNING" in sql
+
+    @pytest.mark.asyncio
+    async def test_create_many_without_returning(self, account_service, mock_database):
+        """Testa o caminho sem RETURNING, mantendo a ordem de entrada."""
+        batch = [AccountIn(user_id=i, balance=10.0) for i in range(3)]
+        mock_database.execute = AsyncMock(side_effect=[7, 8, 9])
+        mock_database.fetch_all = AsyncMock(return_value=[self._record(9, 2), self._record(7, 0), self._record(8, 1)])
+
+        result = await account_service.create_many(batch)
+
+        assert [record.id for record in result] == [7, 8, 9]
+        mock_database.fetch_all.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_import_ndjson_streams_results(self, account_service, mock_database):
+        """Testa a importação NDJSON com linhas quebradas entre blocos e linhas inválidas."""
+        mock_database.execute = AsyncMock(side_effect=[1, 2])
+        mock_database.fetch_all = AsyncMock(return_value=[self._record(1, 10), self._record(2, 11)])
+
+        async def body():
+            yield b'{"user_id": 10, "bal'
+            yield b'ance": 10.0}\n{"user_id": "x"}\n\n'
+            yield b'{"user_id": 11, "balance": 10.0}'
+
+        output = "".join([chunk async for chunk in account_service.import_ndjson(body())])
+        lines = [json.loads(line) for line in output.splitlines()]
+
+        assert lines[0] == {"line": 2, "status": "rejected", "detail": lines[0]["detail"]}
+        assert "user_id" in lines[0]["detail"]
+        assert [line["id"] for line in lines[1:]] == [1, 2]
@@ -0,0 +1,98 @@
+"""Testes unitários para o limite global de concorrência na criação de transações."""
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+from src.exceptions import ServiceOverloadedError
+from src.service.admission import ConcurrencyLimiter
+
+
+class TestConcurrencyLimiter:
+    """Testes para ConcurrencyLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_limit(self):
+        """Testa que limite zero não restringe."""
+        limiter = ConcurrencyLimiter(limit=0, queue_timeout=0)
+
+        async with limiter.slot():
+            async with limiter.slot():
+                pass
+
+        assert limiter.shed == 0
+
+    @pytest.mark.asyncio
+    async def test_sheds_when_full(self):
+        """Testa que, sem vaga e sem espera, a requisição é recusada."""
+        limiter = ConcurrencyLimiter(limit=1, queue_timeout=0)
+
+        async with limiter.slot():
+            assert limiter.in_flight == 1
+            with pytest.raises(ServiceOverloadedError):
+                async with limiter.slot():
+                    pass
+
+        assert limiter.shed == 1
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_sheds_after_queue_timeout(self):
+        """Testa que a espera por uma vaga é limitada."""
+        limiter = ConcurrencyLimiter(limit=1, queue_timeout=0.01)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceOverloadedError):
+            async with limiter.slot():
+                pass
+        release.set()
+        await holder
+
+        assert limiter.shed == 1
+
+    @pytest.mark.asyncio
+    async def test_waiter_gets_released_slot(self):
+        """Testa que quem espera dentro do prazo recebe a vaga liberada."""
+        limiter = ConcurrencyLimiter(limit=1, queue_timeout=1)
+        order = []
+
+        async def run(name, delay):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(delay)
+
+        await asyncio.gather(run("first", 0.01), run("second", 0))
+
+        assert order == ["first", "second"]
+        assert limiter.shed == 0
+        assert limiter.wait_times.count == 2
+
+    @pytest.mark.asyncio
+    async def test_transaction_create_uses_admission(self):
+        """Testa que TransactionService.create passa pelo limite antes de gravar."""
+        from src.service.transaction import TransactionService
+
+        limiter = ConcurrencyLimiter(limit=1, queue_timeout=0)
+        service = TransactionService(admission=limiter)
+
+        async with limiter.slot():
+            with pytest.raises(ServiceOverloadedError):
+                await service.create(MagicMock(account_id=1))
+
+    @pytest.mark.asyncio
+    async def test_transaction_create_batch_uses_admission(self):
+        """Testa que TransactionService.create_batch divide o mesmo limite."""
+        from src.service.transaction import TransactionService
+
+        limiter = ConcurrencyLimiter(limit=1, queue_timeout=0)
+        service = TransactionService(admission=limiter)
+
+        async with limiter.slot():
+            with pytest.raises(ServiceOverloadedError):
+                await service.create_batch(MagicMock(transactions=[MagicMock(account_id=1)]))
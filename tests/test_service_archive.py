@@ -0,0 +1,121 @@
+"""Testes unitários para o arquivamento do extrato em camadas quente/fria."""
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.models.account import accounts
+from src.models.transaction import transactions, transactions_archive
+from src.service.archive import ArchiveService, archive_cutoff, ledger, ledger_rows, ledger_tiers
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def by_account(table):
+    return [table.c.account_id == 1]
+
+
+class TestLedgerTiers:
+    """Testes para a escolha das camadas consultadas."""
+
+    def test_without_lower_bound_reads_both(self):
+        """Testa que consultas sem limite inferior leem as duas camadas."""
+        assert ledger_tiers() == [transactions, transactions_archive]
+
+    def test_recent_reads_hot_only(self):
+        """Testa que consultas recentes leem só a camada quente."""
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        assert ledger_tiers(since) == [transactions]
+
+    def test_naive_timestamp_is_utc(self):
+        """Testa timestamps sem fuso (SQLite) como UTC."""
+        since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=1)
+        assert ledger_tiers(since) == [transactions]
+
+    def test_old_reads_both(self):
+        """Testa que consultas anteriores ao horizonte incluem o arquivo."""
+        since = archive_cutoff() - timedelta(seconds=1)
+        assert ledger_tiers(since) == [transactions, transactions_archive]
+
+
+class TestLedgerQueries:
+    """Testes para as consultas sobre as duas camadas."""
+
+    def test_recent_query_skips_archive(self):
+        """Testa que a consulta recente não menciona o arquivo."""
+        sql = compile_sql(ledger(by_account, since=datetime.now(timezone.utc), limit=10))
+
+        assert "transactions_archive" not in sql
+        assert "ORDER BY transactions.timestamp, transactions.id" in sql
+
+    def test_union_limits_each_tier(self):
+        """Testa que cada camada é limitada antes da união."""
+        sql = compile_sql(ledger(by_account, limit=10))
+
+        assert "UNION ALL" in sql
+        assert sql.count("LIMIT") == 3
+        assert "ORDER BY ledger.timestamp, ledger.id" in sql
+
+    def test_rows_for_aggregates(self):
+        """Testa a união sem ordenação para agregações."""
+        sql = compile_sql(sa.select(sa.func.count()).select_from(ledger_rows(by_account)))
+
+        assert "UNION ALL" in sql
+        assert "ORDER BY" not in sql
+
+    def test_pages_across_tiers(self):
+        """Testa paginação ordenada sobre as duas camadas em um SQLite real."""
+        engine = sa.create_engine("sqlite://")
+        transactions.metadata.create_all(engine, tables=[accounts, transactions, transactions_archive])
+        base = datetime(2024, 1, 1)
+        with engine.begin() as connection:
+            connection.execute(accounts.insert().values(id=1, user_id=1, balance=0))
+            # Arquivamento interrompido: a camada quente ainda tem uma linha antiga
+            connection.execute(transactions_archive.insert(), [
+                {"id": 1, "account_id": 1, "type": "deposit", "amount": 1, "timestamp": base},
+                {"id": 3, "account_id": 1, "type": "deposit", "amount": 3, "timestamp": base + timedelta(days=2)},
+            ])
+            connection.execute(transactions.insert(), [
+                {"id": 2, "account_id": 1, "type": "deposit", "amount": 2, "timestamp": base + timedelta(days=1)},
+                {"id": 4, "account_id": 1, "type": "deposit", "amount": 4, "timestamp": base + timedelta(days=3)},
+            ])
+
+            first = connection.execute(ledger(by_account, limit=3)).fetchall()
+            second = connection.execute(ledger(by_account, limit=4).limit(2).offset(2)).fetchall()
+
+        assert [row.id for row in first] == [1, 2, 3]
+        assert [row.id for row in second] == [3, 4]
+
+
+class TestArchiveService:
+    """Testes para ArchiveService."""
+
+    @pytest.mark.asyncio
+    async def test_archive_moves_in_chunks(self, mock_database):
+        """Testa que cada lote copia para o arquivo e apaga da camada quente."""
+        mock_database.fetch_all = AsyncMock(side_effect=[[MagicMock(id=1), MagicMock(id=2)], [MagicMock(id=3)], []])
+        mock_database.execute = AsyncMock()
+
+        moved = await ArchiveService().archive(chunk_size=2)
+
+        assert moved == 3
+        statements = [compile_sql(call.args[0]) for call in mock_database.execute.call_args_list]
+        assert len(statements) == 4
+        assert statements[0].startswith("INSERT INTO transactions_archive")
+        assert statements[1].startswith("DELETE FROM transactions")
+        select = compile_sql(mock_database.fetch_all.call_args_list[0].args[0])
+        assert "transactions.timestamp <" in select
+        assert "FOR UPDATE SKIP LOCKED" in select
+
+    @pytest.mark.asyncio
+    async def test_archive_nothing_to_move(self, mock_database):
+        """Testa execução sem linhas antigas."""
+        mock_database.fetch_all = AsyncMock(return_value=[])
+        mock_database.execute = AsyncMock()
+
+        assert await ArchiveService().archive() == 0
+        mock_database.execute.assert_not_called()
@@ -0,0 +1,164 @@
+"""Testes unitários para BalanceService."""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.exceptions import AccountNotFoundError
+from src.service.balance import BalanceService, balance_cache, settled_before
+
+
+class TestBalanceService:
+    """Testes para BalanceService."""
+
+    @pytest.fixture
+    def balance_service(self):
+        """Cria uma instância do BalanceService."""
+        balance_cache.clear()
+        yield BalanceService()
+        balance_cache.clear()
+
+    @pytest.fixture
+    def account(self):
+        """Conta com saldo atual de 85.00."""
+        return MagicMock(id=1, user_id=123, balance=Decimal("85.00"), created_at=None)
+
+    @pytest.mark.asyncio
+    async def test_read_current_balance(self, balance_service, mock_database, account):
+        """Testa leitura do saldo atual."""
+        mock_database.fetch_one = AsyncMock(return_value=account)
+
+        assert await balance_service.read(1) == 85.0
+
+    @pytest.mark.asyncio
+    async def test_read_miss_goes_to_primary(self, balance_service, mock_database, account):
+        """Testa que uma falta no cache lê o primário, não uma réplica atrasada."""
+        mock_database.fetch_one = AsyncMock(return_value=account)
+
+        with patch("src.service.balance.replicas") as replicas:
+            assert await balance_service.read(1) == 85.0
+
+        replicas.fetch_one.assert_not_called()
+        mock_database.fetch_one.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_read_does_not_overwrite_write_through(self, balance_service, mock_database, account):
+        """Testa que um saldo gravado durante a leitura não é sobrescrito pelo valor lido."""
+        async def read_then_write(query):
+            # Uma transação confirma e grava o novo saldo enquanto a leitura está em andamento
+            balance_cache.set(1, 95.0)
+            return account
+
+        mock_database.fetch_one = AsyncMock(side_effect=read_then_write)
+
+        assert await balance_service.read(1) == 85.0
+        assert balance_cache.get(1) == 95.0
+
+    @pytest.mark.asyncio
+    async def test_read_does_not_refill_after_invalidation(self, balance_service, mock_database, account):
+        """Testa que uma invalidação durante a leitura impede o preenchimento do cache."""
+        async def read_then_invalidate(query):
+            balance_cache.delete(1)
+            return account
+
+        mock_database.fetch_one = AsyncMock(side_effect=read_then_invalidate)
+
+        await balance_service.read(1)
+
+        assert balance_cache.get(1) is None
+
+    @pytest.mark.asyncio
+    async def test_read_cache_hit_skips_database(self, balance_service, mock_database, account):
+        """Testa que a segunda leitura é servida pelo cache."""
+        mock_database.fetch_one = AsyncMock(return_value=account)
+
+        await balance_service.read(1)
+        assert await balance_service.read(1) == 85.0
+
+        mock_database.fetch_one.assert_called_once()
+        assert balance_cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_read_at_replays_from_earlier_checkpoint(
+        self, balance_service, mock_database, account
+    ):
+        """Testa saldo histórico a partir do checkpoint anterior mais próximo."""
+        checkpoint = MagicMock(balance=Decimal("80.00"), as_of=datetime(2024, 1, 5))
+        mock_database.fetch_one = AsyncMock(side_effect=[account, checkpoint])
+        mock_database.fetch_val = AsyncMock(return_value=Decimal("5.00"))
+
+        result = await balance_service.read_at(1, datetime(2024, 1, 7))
+
+        assert result == 85.0
+        sql = str(mock_database.fetch_val.call_args.args[0])
+        assert "transactions.timestamp >=" in sql
+        assert "transactions.timestamp <=" in sql
+        assert "transactions.id >" not in sql
+
+    @pytest.mark.asyncio
+    async def test_read_at_unwinds_from_later_checkpoint(
+        self, balance_service, mock_database, account
+    ):
+        """Testa saldo anterior ao primeiro checkpoint."""
+        checkpoint = MagicMock(balance=Decimal("85.00"), as_of=datetime(2024, 1, 5))
+        mock_database.fetch_one = AsyncMock(side_effect=[account, None, checkpoint])
+        mock_database.fetch_val = AsyncMock(return_value=Decimal("-25.00"))
+
+        result = await balance_service.read_at(1, datetime(2024, 1, 3))
+
+        assert result == 110.0
+        sql = str(mock_database.fetch_val.call_args.args[0])
+        assert "transactions.timestamp <" in sql
+        assert "transactions.timestamp >" in sql
+
+    @pytest.mark.asyncio
+    async def test_read_at_without_checkpoints(self, balance_service, mock_database, account):
+        """Testa saldo histórico sem checkpoints, a partir do saldo atual."""
+        mock_database.fetch_one = AsyncMock(side_effect=[account, None, None])
+        mock_database.fetch_val = AsyncMock(return_value=Decimal("-15.00"))
+
+        result = await balance_service.read_at(1, datetime(2024, 1, 1))
+
+        assert result == 100.0
+
+    @pytest.mark.asyncio
+    async def test_read_at_account_not_found(self, balance_service, mock_database):
+        """Testa saldo histórico de conta inexistente."""
+        mock_database.fetch_one = AsyncMock(return_value=None)
+
+        with pytest.raises(AccountNotFoundError):
+            await balance_service.read_at(999, datetime(2024, 1, 1))
+
+    @pytest.mark.asyncio
+    async def test_create_checkpoints(self, balance_service, mock_database):
+        """Testa criação de checkpoints cobrindo o intervalo desde a última execução."""
+        mock_database.fetch_val = AsyncMock(side_effect=[datetime(2024, 1, 2), datetime(2024, 1, 1)])
+        mock_database.execute = AsyncMock()
+
+        await balance_service.create_checkpoints()
+
+        mock_database.execute.assert_called_once()
+        sql = str(mock_database.execute.call_args.args[0])
+        assert sql.startswith("INSERT INTO balance_checkpoints (account_id, as_of, balance)")
+        assert "transactions.timestamp >=" in sql
+        assert "transactions.timestamp <" in sql
+        assert "transactions.id >" not in sql
+
+    @pytest.mark.asyncio
+    async def test_create_checkpoints_without_new_bound(self, balance_service, mock_database):
+        """Testa que nada é gravado quando o limite não avançou desde o último checkpoint."""
+        mock_database.fetch_val = AsyncMock(side_effect=[datetime(2024, 1, 1), datetime(2024, 1, 1)])
+        mock_database.execute = AsyncMock()
+
+        await balance_service.create_checkpoints()
+
+        mock_database.execute.assert_not_called()
+
+    def test_settled_before_on_postgres(self):
+        """Testa que no Postgres o limite recua até a transação aberta mais antiga."""
+        from sqlalchemy.dialects import postgresql
+
+        with patch("src.service.balance.dialect", "postgresql"):
+            sql = str(settled_before().compile(dialect=postgresql.dialect()))
+
+        assert "least(now(), min(pg_stat_activity.xact_start))" in sql
@@ -0,0 +1,94 @@
+"""Testes unitários para ExportService."""
+import json
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from src.schemas.transaction import ExportFormat
+from src.service.export import ExportService
+
+
+def _iterate(records):
+    """Simula database.iterate com um gerador assíncrono."""
+    async def _gen(query):
+        for record in records:
+            yield record
+    return _gen
+
+
+class TestExportService:
+    """Testes para ExportService."""
+
+    @pytest.fixture
+    def export_service(self):
+        """Cria uma instância do ExportService."""
+        return ExportService()
+
+    @pytest.fixture
+    def records(self):
+        """Registros de transações para exportação."""
+        return [
+            MagicMock(id=i, account_id=1, type="deposit", amount=Decimal("10.50"), timestamp=datetime(2024, 1, i))
+            for i in range(1, 4)
+        ]
+
+    async def _collect(self, export_service, format, **kwargs):
+        return [chunk async for chunk in export_service.stream(account_id=1, format=format, **kwargs)]
+
+    @pytest.mark.asyncio
+    async def test_stream_ndjson(self, export_service, mock_database, records):
+        """Testa exportação em NDJSON."""
+        mock_database.iterate = _iterate(records)
+
+        chunks = await self._collect(export_service, ExportFormat.NDJSON)
+
+        lines = "".join(chunks).splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[0]) == {
+            "id": 1, "account_id": 1, "type": "deposit", "amount": 10.5, "timestamp": "2024-01-01T00:00:00",
+        }
+
+    @pytest.mark.asyncio
+    async def test_stream_csv(self, export_service, mock_database, records):
+        """Testa exportação em CSV com cabeçalho."""
+        mock_database.iterate = _iterate(records)
+
+        chunks = await self._collect(export_service, ExportFormat.CSV)
+
+        lines = "".join(chunks).splitlines()
+        assert lines[0] == "id,account_id,type,amount,timestamp"
+        assert lines[1] == "1,1,deposit,10.5,2024-01-01T00:00:00"
+        assert len(lines) == 4
+
+    @pytest.mark.asyncio
+    async def test_stream_in_chunks_and_counts_rows(self, export_service, mock_database, records):
+        """Testa envio em blocos e o contador de linhas exportadas."""
+        mock_database.iterate = _iterate(records)
+        before = ExportService.rows_streamed
+
+        with patch("src.service.export.EXPORT_CHUNK_ROWS", 2):
+            chunks = await self._collect(export_service, ExportFormat.NDJSON)
+
+        assert len(chunks) == 2
+        assert ExportService.rows_streamed - before == 3
+
+    @pytest.mark.asyncio
+    async def test_stream_date_range(self, export_service, mock_database):
+        """Testa filtros de data na consulta."""
+        queries = []
+
+        async def _gen(query):
+            queries.append(query)
+            return
+            yield
+
+        mock_database.iterate = _gen
+
+        await self._collect(
+            export_service, ExportFormat.NDJSON, start=datetime(2024, 1, 1), end=datetime(2024, 2, 1)
+        )
+
+        sql = str(queries[0])
+        assert "transactions.timestamp >=" in sql
+        assert "transactions.timestamp <" in sql
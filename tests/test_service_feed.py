@@ -0,0 +1,284 @@
+"""Testes unitários para o feed de transações em tempo real."""
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.pagination import encode_cursor
+from src.service.feed import FEED_BACKFILL_PAGE_SIZE, FeedBroadcast, FeedService, TransactionFeed, transaction_event
+
+
+def ledger_record(id, account_id=1):
+    return MagicMock(id=id, account_id=account_id, type="deposit", amount=10.0, timestamp=datetime(2024, 1, 1) + timedelta(seconds=id))
+
+
+def event_ids(frames):
+    return [json.loads(frame.split("data: ")[1])["id"] for frame in frames if frame.startswith("id: ")]
+
+
+class FakeBroadcast(FeedBroadcast):
+    """Broadcast em memória que devolve os eventos ao próprio feed."""
+
+    def __init__(self):
+        self.deliver = None
+        self.published = []
+
+    async def publish(self, event):
+        self.published.append(event)
+        if self.deliver is not None:
+            self.deliver(event)
+
+    async def listen(self, deliver):
+        self.deliver = deliver
+
+
+class TestFeedBroadcast:
+    """Testes para a interface de broadcast."""
+
+    def test_broadcast_without_listen_is_rejected(self):
+        """Testa que um broadcast incompleto falha ao ser instanciado."""
+        class PublishOnly(FeedBroadcast):
+            async def publish(self, event):
+                pass
+
+        with pytest.raises(TypeError):
+            PublishOnly()
+
+
+class TestTransactionFeed:
+    """Testes para a distribuição de eventos entre assinantes."""
+
+    def test_transaction_event(self):
+        """Testa o evento gerado a partir de uma transação."""
+        record = ledger_record(3)
+
+        event = transaction_event(record)
+
+        assert event["cursor"] == encode_cursor(record.timestamp, 3)
+        assert event["transaction"] == {
+            "id": 3, "account_id": 1, "type": "deposit", "amount": 10.0, "timestamp": "2024-01-01T00:00:03",
+        }
+
+    @pytest.mark.asyncio
+    async def test_publish_delivers_to_account_subscribers(self):
+        """Testa que o evento chega só aos assinantes da conta."""
+        feed = TransactionFeed(buffer_size=10)
+        first, second, other = feed.subscribe(1), feed.subscribe(1), feed.subscribe(2)
+
+        await feed.publish([ledger_record(1)])
+
+        assert first.queue.qsize() == 1
+        assert second.queue.qsize() == 1
+        assert other.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_publish_without_subscribers(self):
+        """Testa que contas sem assinantes não geram eventos."""
+        feed = TransactionFeed(buffer_size=10)
+
+        with patch("src.service.feed.transaction_event") as mock_event:
+            await feed.publish([ledger_record(1)])
+
+        mock_event.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_overflow_closes_subscription(self):
+        """Testa que um assinante lento é desconectado sem bloquear o publicador."""
+        feed = TransactionFeed(buffer_size=2)
+        slow = feed.subscribe(1)
+
+        await feed.publish([ledger_record(1), ledger_record(2), ledger_record(3)])
+
+        assert slow.closed is True
+        assert slow.queue.qsize() == 2
+        assert feed.subscriber_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_publish_through_broadcast(self):
+        """Testa que, com broadcast, os eventos voltam aos assinantes por ``listen``."""
+        broadcast = FakeBroadcast()
+        feed = TransactionFeed(buffer_size=10, broadcast=broadcast)
+        await broadcast.listen(feed.deliver)
+        subscription = feed.subscribe(1)
+
+        await feed.publish([ledger_record(1), ledger_record(2, account_id=2)])
+
+        assert len(broadcast.published) == 2
+        assert subscription.queue.get_nowait()["transaction"]["id"] == 1
+        assert subscription.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_broadcast_failure_is_swallowed(self):
+        """Testa que uma falha no broadcast não propaga para a escrita já confirmada."""
+        broadcast = MagicMock()
+        broadcast.publish = AsyncMock(side_effect=RuntimeError("down"))
+        feed = TransactionFeed(buffer_size=10, broadcast=broadcast)
+
+        await feed.publish([ledger_record(1)])
+
+        broadcast.publish.assert_awaited_once()
+
+    def test_unsubscribe(self):
+        """Testa que o cancelamento remove o assinante."""
+        feed = TransactionFeed(buffer_size=10)
+        subscription = feed.subscribe(1)
+
+        feed.unsubscribe(subscription)
+        feed.unsubscribe(subscription)
+
+        assert feed.subscriber_count() == 0
+
+
+class TestFeedService:
+    """Testes para o fluxo SSE de uma conta."""
+
+    @pytest.mark.asyncio
+    async def test_stream_backfills_since_cursor(self):
+        """Testa o reenvio das transações posteriores ao cursor, página por página."""
+        feed = TransactionFeed(buffer_size=10)
+        first_page = [ledger_record(id) for id in range(1, FEED_BACKFILL_PAGE_SIZE + 1)]
+        read_page = AsyncMock(side_effect=[first_page, [ledger_record(FEED_BACKFILL_PAGE_SIZE + 1)]])
+        service = FeedService(feed, read_page, heartbeat=60)
+
+        stream = service.stream(1, since="cursor")
+        frames = [await stream.__anext__() for _ in range(FEED_BACKFILL_PAGE_SIZE + 1)]
+        await stream.aclose()
+
+        assert event_ids(frames) == list(range(1, FEED_BACKFILL_PAGE_SIZE + 2))
+        assert read_page.await_args_list[0].kwargs == {
+            "account_id": 1, "limit": FEED_BACKFILL_PAGE_SIZE, "after": "cursor",
+        }
+        last = first_page[-1]
+        assert read_page.await_args_list[1].kwargs["after"] == encode_cursor(last.timestamp, last.id)
+        assert feed.subscriber_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_skips_events_already_backfilled(self):
+        """Testa que uma transação vista no backfill e no fluxo ao vivo é enviada uma vez."""
+        feed = TransactionFeed(buffer_size=10)
+
+        async def read_page(**kwargs):
+            # Confirmada entre a assinatura e a leitura: aparece nos dois lados
+            await feed.publish([ledger_record(1)])
+            return [ledger_record(1)]
+
+        service = FeedService(feed, read_page, heartbeat=60)
+        stream = service.stream(1, since="cursor")
+
+        frames = [await stream.__anext__()]
+        await feed.publish([ledger_record(2)])
+        frames.append(await stream.__anext__())
+        await stream.aclose()
+
+        assert event_ids(frames) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_stream_skips_live_events_up_to_last_backfilled(self):
+        """Testa que eventos ao vivo até a última linha do backfill são ignorados, inclusive fora de ordem."""
+        feed = TransactionFeed(buffer_size=10)
+
+        async def read_page(**kwargs):
+            await feed.publish([ledger_record(3), ledger_record(1), ledger_record(2)])
+            return [ledger_record(1), ledger_record(2), ledger_record(3)]
+
+        service = FeedService(feed, read_page, heartbeat=60)
+        stream = service.stream(1, since="cursor")
+
+        frames = [await stream.__anext__() for _ in range(3)]
+        await feed.publish([ledger_record(4)])
+        frames.append(await stream.__anext__())
+        await stream.aclose()
+
+        assert event_ids(frames) == [1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_stream_compares_naive_and_aware_timestamps(self):
+        """Testa a comparação entre timestamps sem fuso (SQLite) e com fuso."""
+        feed = TransactionFeed(buffer_size=10)
+        aware = MagicMock(id=1, account_id=1, type="deposit", amount=10.0, timestamp=datetime(2024, 1, 1, 0, 0, 1, tzinfo=timezone.utc))
+        service = FeedService(feed, AsyncMock(return_value=[ledger_record(1)]), heartbeat=60)
+        stream = service.stream(1, since="cursor")
+
+        frames = [await stream.__anext__()]
+        await feed.publish([aware, ledger_record(2)])
+        frames.append(await stream.__anext__())
+        await stream.aclose()
+
+        assert event_ids(frames) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_stream_without_since_skips_backfill(self):
+        """Testa que sem cursor só o fluxo ao vivo é enviado."""
+        feed = TransactionFeed(buffer_size=10)
+        read_page = AsyncMock()
+        service = FeedService(feed, read_page, heartbeat=60)
+        stream = service.stream(1)
+
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        await feed.publish([ledger_record(5)])
+        frame = await pending
+        await stream.aclose()
+
+        read_page.assert_not_called()
+        assert frame.startswith(f"id: {encode_cursor(datetime(2024, 1, 1, 0, 0, 5), 5)}\nevent: transaction\n")
+        assert frame.endswith("\n\n")
+
+    @pytest.mark.asyncio
+    async def test_stream_keepalive(self):
+        """Testa o comentário de keepalive em fluxos ociosos."""
+        service = FeedService(TransactionFeed(buffer_size=10), AsyncMock(), heartbeat=0.01)
+        stream = service.stream(1)
+
+        frame = await stream.__anext__()
+        await stream.aclose()
+
+        assert frame == ": keepalive\n\n"
+
+    @pytest.mark.asyncio
+    async def test_stream_ends_after_overflow(self):
+        """Testa que o fluxo entrega o que já estava no buffer e termina após o estouro."""
+        feed = TransactionFeed(buffer_size=2)
+        service = FeedService(feed, AsyncMock(), heartbeat=60)
+        stream = service.stream(1)
+
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        await feed.publish([ledger_record(1), ledger_record(2), ledger_record(3)])
+        frames = [await pending]
+        frames += [frame async for frame in stream]
+
+        assert event_ids(frames) == [1, 2]
+        assert feed.subscriber_count() == 0
+
+
+class TestStreamController:
+    """Testes para o endpoint SSE."""
+
+    @pytest.mark.asyncio
+    async def test_stream_account_transactions(self):
+        """Testa o endpoint com o cabeçalho Last-Event-ID tendo precedência sobre ``since``."""
+        from src.controller.account import stream_account_transactions
+
+        cursor = encode_cursor(datetime(2024, 1, 1), 1)
+        with patch("src.controller.account.account_service") as mock_account_service, \
+                patch("src.controller.account.feed_service") as mock_feed_service:
+            mock_account_service.read = AsyncMock()
+            response = await stream_account_transactions(id=1, since="ignored", last_event_id=cursor)
+
+        mock_account_service.read.assert_awaited_once_with(1)
+        mock_feed_service.stream.assert_called_once_with(1, since=cursor)
+        assert response.media_type == "text/event-stream"
+        assert response.headers["cache-control"] == "no-cache"
+
+    @pytest.mark.asyncio
+    async def test_stream_rejects_invalid_cursor(self):
+        """Testa que um cursor inválido é rejeitado antes de abrir o fluxo."""
+        from src.controller.account import stream_account_transactions
+        from src.exceptions import InvalidCursorError
+
+        with patch("src.controller.account.account_service") as mock_account_service:
+            mock_account_service.read = AsyncMock()
+            with pytest.raises(InvalidCursorError):
+                await stream_account_transactions(id=1, since="not-a-cursor", last_event_id=None)
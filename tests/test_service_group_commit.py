@@ -0,0 +1,120 @@
+"""Testes unitários para GroupCommitter."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.exceptions import InsufficientBalanceError
+from src.service.balance import balance_cache
+from src.service.group_commit import GroupCommitter
+from src.service.transaction import TransactionService
+
+
+@pytest.fixture
+def db_transaction(mock_database):
+    """Substitui database.transaction por um context manager assíncrono."""
+    transaction = MagicMock()
+    with patch.object(mock_database, "transaction", MagicMock(return_value=transaction)) as mock:
+        yield mock
+
+
+class TestGroupCommitter:
+    """Testes para GroupCommitter."""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_within_window(self, db_transaction):
+        """Testa que chamadas na mesma janela compartilham um commit."""
+        committer = GroupCommitter(window=0.01, max_batch=100)
+
+        async def apply(n):
+            return n * 2
+
+        results = await asyncio.gather(*(committer.submit(lambda n=n: apply(n)) for n in range(5)))
+
+        assert results == [0, 2, 4, 6, 8]
+        assert db_transaction.call_count == 1
+        assert committer.batch_sizes.count == 1
+        assert committer.batch_sizes.sum == 5
+        assert committer.wait_times.count == 5
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_is_full(self, db_transaction):
+        """Testa o envio imediato ao atingir o tamanho máximo do lote."""
+        committer = GroupCommitter(window=60, max_batch=2)
+
+        async def apply():
+            return "ok"
+
+        results = await asyncio.wait_for(
+            asyncio.gather(committer.submit(apply), committer.submit(apply)), timeout=1
+        )
+
+        assert results == ["ok", "ok"]
+
+    @pytest.mark.asyncio
+    async def test_item_error_only_fails_its_caller(self, db_transaction):
+        """Testa que o erro de um item não afeta os demais."""
+        committer = GroupCommitter(window=0.01, max_batch=100)
+
+        async def ok():
+            return "ok"
+
+        async def fail():
+            raise InsufficientBalanceError(account_id=1, balance=0)
+
+        results = await asyncio.gather(
+            committer.submit(ok), committer.submit(fail), committer.submit(ok),
+            return_exceptions=True,
+        )
+
+        assert results[0] == "ok"
+        assert isinstance(results[1], InsufficientBalanceError)
+        assert results[2] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_commit_failure_fails_every_caller(self, db_transaction):
+        """Testa que uma falha no commit é propagada a todos os itens."""
+        db_transaction.return_value.__aexit__ = AsyncMock(side_effect=RuntimeError("commit failed"))
+        committer = GroupCommitter(window=0.01, max_batch=100)
+
+        async def ok():
+            return "ok"
+
+        results = await asyncio.gather(
+            committer.submit(ok), committer.submit(ok), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_drain_flushes_pending(self, db_transaction):
+        """Testa que drain envia os itens pendentes."""
+        committer = GroupCommitter(window=60, max_batch=100)
+
+        async def ok():
+            return "ok"
+
+        pending = asyncio.create_task(committer.submit(ok))
+        await asyncio.sleep(0)
+        await committer.drain()
+
+        assert await pending == "ok"
+
+
+class TestTransactionServiceGroupCommit:
+    """Testes para TransactionService com group commit."""
+
+    @pytest.mark.asyncio
+    async def test_create_is_submitted_to_group(
+        self, sample_transaction_in_deposit
+    ):
+        """Testa que create delega ao GroupCommitter."""
+        record = MagicMock(id=1, account_id=1)
+        committer = MagicMock()
+        committer.submit = AsyncMock(return_value=(record, 1100.0))
+        service = TransactionService(group_committer=committer)
+
+        result = await service.create(sample_transaction_in_deposit)
+
+        assert result is record
+        committer.submit.assert_called_once()
+        assert balance_cache.get(1) == 1100.0
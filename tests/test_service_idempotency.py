@@ -0,0 +1,145 @@
+"""Testes unitários para IdempotencyStore."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.exceptions import IdempotencyKeyReusedError, InsufficientBalanceError
+from src.service.idempotency import IdempotencyStore, fingerprint
+
+
+@pytest.fixture
+def db_transaction(mock_database):
+    """Substitui database.transaction por um context manager assíncrono."""
+    with patch.object(mock_database, "transaction", MagicMock(return_value=MagicMock())) as mock:
+        yield mock
+
+
+class TestIdempotencyStore:
+    """Testes para IdempotencyStore."""
+
+    @pytest.mark.asyncio
+    async def test_replays_stored_response(self):
+        """Testa que uma nova tentativa recebe a resposta original sem reexecutar."""
+        store = IdempotencyStore(maxsize=10, ttl=60)
+        execute = AsyncMock(return_value={"id": 1})
+
+        first = await store.run((1, "key"), fingerprint("body"), execute)
+        second = await store.run((1, "key"), fingerprint("body"), execute)
+
+        assert first == ({"id": 1}, False)
+        assert second == ({"id": 1}, True)
+        execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_per_user(self):
+        """Testa que a mesma chave de usuários diferentes não colide."""
+        store = IdempotencyStore(maxsize=10, ttl=60)
+        execute = AsyncMock(side_effect=[{"id": 1}, {"id": 2}])
+
+        await store.run((1, "key"), fingerprint("body"), execute)
+        response, replayed = await store.run((2, "key"), fingerprint("body"), execute)
+
+        assert response == {"id": 2}
+        assert replayed is False
+
+    @pytest.mark.asyncio
+    async def test_different_body_is_rejected(self):
+        """Testa que reutilizar a chave com outro corpo gera erro."""
+        store = IdempotencyStore(maxsize=10, ttl=60)
+        await store.run((1, "key"), fingerprint("body"), AsyncMock(return_value={"id": 1}))
+
+        with pytest.raises(IdempotencyKeyReusedError):
+            await store.run((1, "key"), fingerprint("other"), AsyncMock())
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_wait_for_in_flight(self):
+        """Testa que duplicatas concorrentes aguardam a execução em andamento."""
+        store = IdempotencyStore(maxsize=10, ttl=60)
+        release = asyncio.Event()
+        calls = 0
+
+        async def execute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"id": 1}
+
+        tasks = [asyncio.create_task(store.run((1, "key"), fingerprint("body"), execute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 1
+        assert sorted(replayed for _, replayed in results) == [False, True, True]
+        assert all(response == {"id": 1} for response, _ in results)
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_and_not_stored(self):
+        """Testa que um erro chega às duplicatas e não é armazenado."""
+        store = IdempotencyStore(maxsize=10, ttl=60)
+        release = asyncio.Event()
+
+        async def fail():
+            await release.wait()
+            raise InsufficientBalanceError(account_id=1, balance=0.0)
+
+        tasks = [asyncio.create_task(store.run((1, "key"), fingerprint("body"), fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, InsufficientBalanceError) for result in results)
+        assert len(store) == 0
+        response, replayed = await store.run((1, "key"), fingerprint("body"), AsyncMock(return_value={"id": 1}))
+        assert (response, replayed) == ({"id": 1}, False)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_original_lets_waiter_execute(self):
+        """Testa que, se a requisição original é cancelada, a duplicata executa."""
+        store = IdempotencyStore(maxsize=10, ttl=60)
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        original = asyncio.create_task(store.run((1, "key"), fingerprint("body"), hang))
+        await started.wait()
+        duplicate = asyncio.create_task(store.run((1, "key"), fingerprint("body"), AsyncMock(return_value={"id": 1})))
+        await asyncio.sleep(0)
+        original.cancel()
+
+        assert await duplicate == ({"id": 1}, False)
+
+    @pytest.mark.asyncio
+    async def test_persisted_response_is_replayed(self, mock_database):
+        """Testa que uma resposta persistida é reaproveitada após perder o cache."""
+        store = IdempotencyStore(maxsize=10, ttl=60, persist=True)
+        row = MagicMock(
+            fingerprint=fingerprint("body"),
+            response={"id": 7},
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=1),
+        )
+        mock_database.fetch_one = AsyncMock(return_value=row)
+        execute = AsyncMock()
+
+        response, replayed = await store.run((1, "key"), fingerprint("body"), execute)
+
+        assert (response, replayed) == ({"id": 7}, True)
+        execute.assert_not_awaited()
+        assert len(store) == 1
+
+    @pytest.mark.asyncio
+    async def test_response_is_persisted(self, mock_database, db_transaction):
+        """Testa que a resposta é gravada no banco quando a persistência está ativa."""
+        store = IdempotencyStore(maxsize=10, ttl=60, persist=True)
+        mock_database.fetch_one = AsyncMock(return_value=None)
+        mock_database.execute = AsyncMock()
+
+        await store.run((1, "key"), fingerprint("body"), AsyncMock(return_value={"id": 1}))
+
+        db_transaction.assert_called_once()
+        assert mock_database.execute.await_count == 2
+        insert = mock_database.execute.await_args_list[1].args[0]
+        assert insert.compile().params["response"] == {"id": 1}
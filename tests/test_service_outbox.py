@@ -0,0 +1,243 @@
+"""Testes unitários para o outbox transacional e seu despachante."""
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from src.models.transaction import transactions
+from src.schemas.transaction import TransactionIn
+from src.service.outbox import (
+    FileSink,
+    OutboxDispatcher,
+    OutboxService,
+    OutboxSink,
+    QueueSink,
+    TRANSACTION_CREATED,
+    WebhookSink,
+    event_payload,
+)
+from src.service.transaction import TransactionService
+from src.views.transaction import transaction_dict
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def ledger_record(id=1):
+    return MagicMock(id=id, account_id=1, type="deposit", amount=Decimal("10.00"), timestamp=datetime(2024, 1, 1))
+
+
+def outbox_row(id, attempts=0, created_at=None):
+    return MagicMock(
+        id=id,
+        topic=TRANSACTION_CREATED,
+        payload={"id": id},
+        attempts=attempts,
+        created_at=created_at or datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+
+@pytest.fixture
+def sink():
+    """Sink falso que registra as entregas."""
+    sink = MagicMock()
+    sink.deliver = AsyncMock()
+    return sink
+
+
+@pytest.fixture
+def dispatcher(sink):
+    """Cria um OutboxDispatcher com o sink falso."""
+    return OutboxDispatcher(sink, batch_size=2, poll_interval=0.01, lease=60, retry_base=1, retry_max=10)
+
+
+class TestOutboxService:
+    """Testes para a escrita de eventos no outbox."""
+
+    def test_transaction_payload(self):
+        """Testa o payload do evento de transação."""
+        assert transaction_dict(ledger_record()) == {
+            "id": 1, "account_id": 1, "type": "deposit", "amount": 10.0, "timestamp": "2024-01-01T00:00:00",
+        }
+
+    @pytest.mark.asyncio
+    async def test_publish_inserts_events(self, mock_database):
+        """Testa a inserção multi-linha dos eventos."""
+        mock_database.execute = AsyncMock()
+
+        await OutboxService().publish([ledger_record(1), ledger_record(2)])
+
+        mock_database.execute.assert_called_once()
+        command = mock_database.execute.call_args.args[0]
+        assert compile_sql(command).startswith("INSERT INTO outbox_events")
+        assert len(command._multi_values[0]) == 2
+
+    def test_publish_from_ledger_rows(self):
+        """Testa o INSERT ... SELECT para a CTE do Postgres."""
+        sql = compile_sql(OutboxService().publish_from(transactions))
+
+        assert sql.startswith("INSERT INTO outbox_events (topic, payload")
+        assert "FROM transactions" in sql
+        assert "json_build_object" in sql
+
+    def test_publish_from_payload_matches_transaction_dict(self):
+        """Testa que o payload montado em SQL tem o mesmo formato do publicado em Python."""
+        payload = event_payload(transactions)
+        keys = [clause.value for clause in list(payload.clauses)[::2]]
+        sql = str(payload.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+        assert keys == list(transaction_dict(ledger_record()))
+        assert "lower(CAST(transactions.type AS TEXT))" in sql
+        assert "CAST(transactions.amount AS DOUBLE PRECISION)" in sql
+        assert "to_char(timezone(" in sql
+        assert "+00:00" in sql
+
+
+class TestTransactionServiceOutbox:
+    """Testes para a publicação de eventos na criação de transações."""
+
+    @pytest.mark.asyncio
+    async def test_create_publishes_in_same_transaction(self, mock_database, sample_transaction_record):
+        """Testa que o evento é gravado junto com a transação."""
+        service = TransactionService(outbox=OutboxService())
+        account = MagicMock(id=1, balance=Decimal("100.00"))
+        mock_database.fetch_one = AsyncMock(side_effect=[
+            MagicMock(id=1), account, MagicMock(**sample_transaction_record),
+        ])
+        mock_database.execute = AsyncMock(return_value=1)
+
+        await service.create(TransactionIn(account_id=1, type="deposit", amount=100.0))
+
+        statements = [compile_sql(call.args[0]) for call in mock_database.execute.call_args_list]
+        assert statements[-1].startswith("INSERT INTO outbox_events")
+
+    @pytest.mark.asyncio
+    async def test_single_statement_includes_event(self, mock_database, sample_transaction_record):
+        """Testa que a CTE do Postgres também grava o evento."""
+        with patch("src.service.transaction.supports_writable_cte", True):
+            service = TransactionService(outbox=OutboxService())
+            mock_database.fetch_one = AsyncMock(return_value=MagicMock(**sample_transaction_record))
+            mock_database.execute = AsyncMock()
+
+            await service.create(TransactionIn(account_id=1, type="deposit", amount=100.0))
+
+        sql = compile_sql(mock_database.fetch_one.call_args.args[0])
+        assert "published_event AS" in sql
+        assert "INSERT INTO outbox_events" in sql
+        mock_database.execute.assert_not_called()
+
+    def test_disabled_by_default(self):
+        """Testa que sem sink configurado nenhum evento é gravado."""
+        assert TransactionService().outbox is None
+
+
+class TestOutboxDispatcher:
+    """Testes para o despachante do outbox."""
+
+    @pytest.mark.asyncio
+    async def test_delivers_and_deletes(self, dispatcher, sink, mock_database):
+        """Testa entrega do lote e remoção das linhas entregues."""
+        mock_database.fetch_all = AsyncMock(return_value=[outbox_row(1), outbox_row(2)])
+        mock_database.execute = AsyncMock()
+
+        assert await dispatcher.dispatch_once() == 2
+
+        events = sink.deliver.call_args.args[0]
+        assert [event["id"] for event in events] == [1, 2]
+        assert events[0]["topic"] == TRANSACTION_CREATED
+        claim = compile_sql(mock_database.fetch_all.call_args.args[0])
+        assert "FOR UPDATE SKIP LOCKED" in claim
+        lease, delete = (compile_sql(call.args[0]) for call in mock_database.execute.call_args_list)
+        assert lease.startswith("UPDATE outbox_events SET available_at")
+        assert delete.startswith("DELETE FROM outbox_events")
+        assert dispatcher.delivery_lag.count == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_events_with_backoff(self, dispatcher, sink, mock_database):
+        """Testa que uma falha reagenda o lote sem apagá-lo."""
+        sink.deliver = AsyncMock(side_effect=ConnectionError("down"))
+        mock_database.fetch_all = AsyncMock(return_value=[outbox_row(1, attempts=2)])
+        mock_database.execute = AsyncMock()
+
+        before = datetime.now(timezone.utc)
+        assert await dispatcher.dispatch_once() == 0
+
+        statements = [call.args[0] for call in mock_database.execute.call_args_list]
+        assert len(statements) == 2
+        assert not any(compile_sql(statement).startswith("DELETE") for statement in statements)
+        available_at = statements[-1].compile().params["available_at"]
+        assert available_at - before >= timedelta(seconds=4)
+
+    @pytest.mark.asyncio
+    async def test_nothing_due(self, dispatcher, sink, mock_database):
+        """Testa ciclo sem eventos pendentes."""
+        mock_database.fetch_all = AsyncMock(return_value=[])
+        mock_database.execute = AsyncMock()
+
+        assert await dispatcher.dispatch_once() == 0
+        sink.deliver.assert_not_called()
+        mock_database.execute.assert_not_called()
+
+    def test_backoff_is_capped(self, dispatcher):
+        """Testa o backoff exponencial com teto."""
+        assert [dispatcher.backoff(n) for n in (1, 2, 3, 4, 5, 6)] == [1, 2, 4, 8, 10, 10]
+
+    @pytest.mark.asyncio
+    async def test_pending_age(self, dispatcher, mock_database):
+        """Testa a idade do evento pendente mais antigo."""
+        mock_database.fetch_val = AsyncMock(return_value=datetime.now(timezone.utc) - timedelta(seconds=30))
+
+        await dispatcher.measure_pending_age()
+
+        assert 29 < dispatcher.pending_age < 35
+
+
+class TestSinks:
+    """Testes para os destinos de entrega."""
+
+    def test_sink_without_deliver_is_rejected(self):
+        """Testa que um sink incompleto falha ao ser instanciado."""
+        class IncompleteSink(OutboxSink):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteSink()
+
+    @pytest.mark.asyncio
+    async def test_file_sink_appends_ndjson(self, tmp_path):
+        """Testa que o arquivo recebe uma linha por evento."""
+        path = tmp_path / "events.ndjson"
+        sink = FileSink(str(path))
+
+        await sink.deliver([{"id": 1}])
+        await sink.deliver([{"id": 2}, {"id": 3}])
+
+        assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_queue_sink(self):
+        """Testa a entrega para a fila em memória."""
+        sink = QueueSink(maxsize=10)
+
+        await sink.deliver([{"id": 1}, {"id": 2}])
+
+        assert sink.queue.get_nowait() == {"id": 1}
+        assert sink.queue.qsize() == 1
+
+    @pytest.mark.asyncio
+    async def test_webhook_sink_posts_batch(self):
+        """Testa o POST do lote em JSON."""
+        sink = WebhookSink("http://hooks.local/events", timeout=5)
+
+        with patch("urllib.request.urlopen") as urlopen:
+            await sink.deliver([{"id": 1}])
+
+        request = urlopen.call_args.args[0]
+        assert request.full_url == "http://hooks.local/events"
+        assert request.get_method() == "POST"
+        assert json.loads(request.data) == [{"id": 1}]
+        assert urlopen.call_args.kwargs["timeout"] == 5
@@ -0,0 +1,133 @@
+"""Testes unitários para o armazenamento de tokens revogados."""
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import sqlite
+
+from src.service.revocation import SYNC_OVERLAP, RevocationStore
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.fixture
+def store():
+    """RevocationStore em memória."""
+    return RevocationStore(window=60, capacity=1000, error_rate=0.01)
+
+
+@pytest.fixture
+def persisted_store(mock_database):
+    """RevocationStore persistido, com o banco mockado."""
+    mock_database.execute.reset_mock()
+    mock_database.fetch_all = AsyncMock(return_value=[])
+    mock_database.fetch_val = AsyncMock(return_value=None)
+    return RevocationStore(window=60, capacity=1000, error_rate=0.01, persist=True)
+
+
+class TestRevocationStore:
+    """Testes para revogação em memória."""
+
+    @pytest.mark.asyncio
+    async def test_revoke_and_check(self, store):
+        """Testa que o token revogado é reconhecido e os demais não."""
+        expires_at = time.time() + 600
+
+        await store.revoke("revoked", expires_at)
+
+        assert await store.is_revoked("revoked", expires_at) is True
+        assert await store.is_revoked("other", expires_at) is False
+        assert store.checks == 2
+
+    @pytest.mark.asyncio
+    async def test_filter_miss_skips_exact_store(self, store):
+        """Testa que sem acerto no filtro o armazenamento exato não é consultado."""
+        await store.revoke("revoked", time.time() + 600)
+        hits = store.filter_hits
+
+        assert await store.is_revoked("never-revoked", time.time() + 600) is False
+        assert store.filter_hits == hits
+
+    @pytest.mark.asyncio
+    async def test_false_positive_is_counted(self, store):
+        """Testa que um falso positivo do filtro é resolvido pelo armazenamento exato."""
+        with patch.object(store.filter, "might_contain", return_value=True):
+            assert await store.is_revoked("not-revoked", time.time() + 600) is False
+
+        assert store.false_positives == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_token_is_not_stored(self, store):
+        """Testa que um token já expirado não ocupa espaço."""
+        await store.revoke("old", time.time() - 1)
+
+        assert len(store) == 0
+        assert len(store.filter) == 0
+
+    @pytest.mark.asyncio
+    async def test_expire_removes_entries(self, store):
+        """Testa que as entradas somem quando o token expiraria."""
+        now = time.time()
+        await store.revoke("short", now + 10)
+        await store.revoke("long", now + 600)
+
+        store.expire(now + 120)
+
+        assert len(store) == 1
+        assert await store.is_revoked("long", now + 600) is True
+
+
+class TestPersistedRevocationStore:
+    """Testes para revogação persistida na tabela revoked_tokens."""
+
+    @pytest.mark.asyncio
+    async def test_revoke_inserts_row(self, persisted_store, mock_database):
+        """Testa a gravação idempotente da revogação."""
+        await persisted_store.revoke("abc", time.time() + 600)
+
+        sql = compile_sql(mock_database.execute.await_args.args[0])
+        assert "INSERT INTO revoked_tokens" in sql
+        assert "ON CONFLICT (jti) DO NOTHING" in sql
+        assert len(persisted_store) == 0
+
+    @pytest.mark.asyncio
+    async def test_checks_table_only_on_filter_hit(self, persisted_store, mock_database):
+        """Testa que o banco só é consultado quando o filtro acusa uma possível revogação."""
+        expires_at = time.time() + 600
+        await persisted_store.revoke("abc", expires_at)
+        mock_database.fetch_val.return_value = "abc"
+
+        assert await persisted_store.is_revoked("xyz", expires_at) is False
+        mock_database.fetch_val.assert_not_awaited()
+
+        assert await persisted_store.is_revoked("abc", expires_at) is True
+        mock_database.fetch_val.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_sync_loads_other_workers_revocations(self, persisted_store, mock_database):
+        """Testa que a sincronização leva as revogações de outros workers ao filtro."""
+        expires_at = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=10)
+        mock_database.fetch_all.return_value = [MagicMock(jti="remote", expires_at=expires_at)]
+        mock_database.fetch_val.return_value = "remote"
+
+        await persisted_store.sync()
+        first_query = compile_sql(mock_database.fetch_all.await_args.args[0])
+        await persisted_store.sync()
+        second_query = compile_sql(mock_database.fetch_all.await_args.args[0])
+
+        timestamp = expires_at.replace(tzinfo=timezone.utc).timestamp()
+        assert await persisted_store.is_revoked("remote", timestamp) is True
+        assert "revoked_at" not in first_query
+        assert "revoked_tokens.revoked_at >=" in second_query
+        assert SYNC_OVERLAP.total_seconds() > 0
+
+    @pytest.mark.asyncio
+    async def test_purge_expired(self, persisted_store, mock_database):
+        """Testa a remoção das linhas de tokens já expirados."""
+        await persisted_store.purge_expired()
+
+        sql = compile_sql(mock_database.execute.await_args.args[0])
+        assert sql.startswith("DELETE FROM revoked_tokens WHERE revoked_tokens.expires_at <=")
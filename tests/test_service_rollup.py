@@ -0,0 +1,112 @@
+"""Testes unitários para RollupService."""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import sqlite
+
+from src.models.transaction import TransactionType
+from src.schemas.account import SummaryGranularity
+from src.service.rollup import RollupService, period_start
+
+
+def ledger_row(id, type, amount, timestamp, account_id=1):
+    return MagicMock(id=id, account_id=account_id, type=type, amount=Decimal(amount), timestamp=timestamp)
+
+
+class TestPeriodStart:
+    """Testes para o cálculo do início do período."""
+
+    def test_day_and_month(self):
+        """Testa dia e mês de um timestamp sem fuso."""
+        timestamp = datetime(2024, 3, 15, 23, 59)
+        assert period_start(timestamp, SummaryGranularity.DAY) == date(2024, 3, 15)
+        assert period_start(timestamp, SummaryGranularity.MONTH) == date(2024, 3, 1)
+
+    def test_aware_timestamp_uses_utc(self):
+        """Testa que timestamps com fuso são agrupados pelo dia em UTC."""
+        timestamp = datetime(2024, 3, 31, 22, 0, tzinfo=timezone(timedelta(hours=-3)))
+        assert period_start(timestamp, SummaryGranularity.DAY) == date(2024, 4, 1)
+        assert period_start(timestamp, SummaryGranularity.MONTH) == date(2024, 4, 1)
+
+
+class TestRollupService:
+    """Testes para RollupService."""
+
+    @pytest.fixture
+    def rollup_service(self):
+        """Cria uma instância do RollupService."""
+        return RollupService()
+
+    @pytest.mark.asyncio
+    async def test_apply_upserts_day_and_month(self, rollup_service, mock_database):
+        """Testa que cada escrita soma no dia e no mês com um único upsert."""
+        mock_database.execute = AsyncMock()
+        records = [
+            ledger_row(1, TransactionType.DEPOSIT, "100.00", datetime(2024, 1, 1, 10)),
+            ledger_row(2, "deposit", "50.00", datetime(2024, 1, 1, 11)),
+            ledger_row(3, "withdrawal", "30.00", datetime(2024, 1, 2, 9)),
+        ]
+
+        await rollup_service.apply(records)
+
+        mock_database.execute.assert_called_once()
+        command = mock_database.execute.call_args.args[0]
+        sql = str(command.compile(dialect=sqlite.dialect()))
+        assert "ON CONFLICT (account_id, granularity, period_start, type) DO UPDATE" in sql
+        rows = {
+            (row["granularity"], row["period_start"], row["type"]): (row["total"], row["count"])
+            for row in command._multi_values[0]
+        }
+        assert rows == {
+            ("day", date(2024, 1, 1), TransactionType.DEPOSIT): (150.0, 2),
+            ("day", date(2024, 1, 2), TransactionType.WITHDRAWAL): (30.0, 1),
+            ("month", date(2024, 1, 1), TransactionType.DEPOSIT): (150.0, 2),
+            ("month", date(2024, 1, 1), TransactionType.WITHDRAWAL): (30.0, 1),
+        }
+
+    @pytest.mark.asyncio
+    async def test_read_summary_pivots_types(self, rollup_service, mock_database):
+        """Testa que depósitos e saques do mesmo período viram uma linha."""
+        mock_database.fetch_all = AsyncMock(return_value=[
+            MagicMock(period_start=date(2024, 1, 1), type=TransactionType.DEPOSIT, total=Decimal("150.00"), count=2),
+            MagicMock(period_start=date(2024, 1, 1), type=TransactionType.WITHDRAWAL, total=Decimal("30.00"), count=1),
+            MagicMock(period_start=date(2024, 2, 1), type=TransactionType.WITHDRAWAL, total=Decimal("5.00"), count=1),
+        ])
+
+        result = await rollup_service.read_summary(1, SummaryGranularity.MONTH)
+
+        assert result == [
+            {"period_start": date(2024, 1, 1), "deposits": 150.0, "withdrawals": 30.0,
+             "deposit_count": 2, "withdrawal_count": 1},
+            {"period_start": date(2024, 2, 1), "deposits": 0.0, "withdrawals": 5.0,
+             "deposit_count": 0, "withdrawal_count": 1},
+        ]
+        sql = str(mock_database.fetch_all.call_args.args[0].compile())
+        assert "account_rollups.granularity" in sql
+
+    @pytest.mark.asyncio
+    async def test_backfill_rebuilds_in_chunks(self, rollup_service, mock_database):
+        """Testa que o backfill reconstrói os rollups por lotes de contas."""
+        ledger = {
+            1: [ledger_row(1, "deposit", "10.00", datetime(2024, 1, 1), account_id=1)],
+            2: [ledger_row(2, "deposit", "20.00", datetime(2024, 1, 1), account_id=2),
+                ledger_row(3, "withdrawal", "5.00", datetime(2024, 2, 1), account_id=2)],
+        }
+        mock_database.fetch_all = AsyncMock(side_effect=[[MagicMock(id=1)], [MagicMock(id=2)], []])
+        chunks = iter([1, 2])
+
+        def iterate(query):
+            async def rows():
+                for row in ledger[next(chunks)]:
+                    yield row
+            return rows()
+
+        mock_database.execute = AsyncMock()
+        with patch.object(mock_database, "iterate", iterate, create=True):
+            totals = await rollup_service.backfill(chunk_size=1)
+
+        assert totals == {"accounts": 2, "transactions": 3, "rollups": 6}
+        # delete + insert por lote
+        assert mock_database.execute.call_count == 4
@@ -0,0 +1,108 @@
+"""Testes unitários para AccountSequencer."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.service.sequencer import AccountSequencer
+from src.service.transaction import TransactionService
+
+
+class TestAccountSequencer:
+    """Testes para AccountSequencer."""
+
+    @pytest.mark.asyncio
+    async def test_same_account_runs_in_order(self):
+        """Testa que escritas na mesma conta são executadas em ordem."""
+        sequencer = AccountSequencer()
+        events = []
+
+        async def write(n):
+            async with sequencer.acquire(1):
+                events.append(("start", n))
+                await asyncio.sleep(0)
+                events.append(("end", n))
+
+        await asyncio.gather(*(write(n) for n in range(3)))
+
+        assert events == [
+            ("start", 0), ("end", 0), ("start", 1), ("end", 1), ("start", 2), ("end", 2),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_different_accounts_run_in_parallel(self):
+        """Testa que contas diferentes não bloqueiam umas às outras."""
+        sequencer = AccountSequencer()
+        release = asyncio.Event()
+
+        async def hold():
+            async with sequencer.acquire(1):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        async with sequencer.acquire(2):
+            assert sequencer.queue_depths() == {1: 1, 2: 1}
+
+        release.set()
+        await holder
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_and_idle_eviction(self):
+        """Testa a profundidade da fila e a remoção de chaves ociosas."""
+        sequencer = AccountSequencer()
+        release = asyncio.Event()
+
+        async def write():
+            async with sequencer.acquire(7):
+                await release.wait()
+
+        tasks = [asyncio.create_task(write()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        assert sequencer.queue_depths(min_depth=2) == {7: 3}
+        assert sequencer.peak_depth == 3
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert len(sequencer) == 0
+        assert sequencer.queue_depths() == {}
+
+    @pytest.mark.asyncio
+    async def test_acquire_many_releases_on_error(self):
+        """Testa que os locks são liberados quando a escrita falha."""
+        sequencer = AccountSequencer()
+
+        with pytest.raises(RuntimeError):
+            async with sequencer.acquire_many([3, 1, 3]):
+                assert sequencer.queue_depths() == {1: 1, 3: 1}
+                raise RuntimeError()
+
+        assert len(sequencer) == 0
+
+
+class TestTransactionServiceSequencer:
+    """Testes para TransactionService com serialização por conta."""
+
+    @pytest.mark.asyncio
+    async def test_create_runs_inside_account_lock(
+        self, mock_database, sample_transaction_in_deposit, sample_transaction_record
+    ):
+        """Testa que create é executado com o lock da conta."""
+        sequencer = AccountSequencer()
+        service = TransactionService(sequencer=sequencer)
+        depths = []
+
+        async def fetch_one(query):
+            depths.append(sequencer.queue_depths())
+            return MagicMock(**sample_transaction_record, balance=0)
+
+        mock_database.fetch_one = AsyncMock(side_effect=fetch_one)
+        mock_database.execute = AsyncMock(return_value=1)
+
+        result = await service.create(sample_transaction_in_deposit)
+
+        assert result.id == 1
+        assert depths[0] == {1: 1}
+        assert len(sequencer) == 0
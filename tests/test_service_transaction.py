@@ -1,11 +1,15 @@
 """Testes unitários para TransactionService."""
 import pytest
+from datetime import datetime
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.exceptions import AccountNotFoundError, InsufficientBalanceError
+from sqlalchemy.dialects import postgresql
+
+from src.exceptions import AccountNotFoundError, InsufficientBalanceError, InvalidCursorError
+from src.service.balance import balance_cache
 from src.service.transaction import TransactionService
-from src.schemas.transaction import TransactionIn
+from src.schemas.transaction import TransactionBatchIn, TransactionIn
 from src.models.transaction import TransactionType
 
 
@@ -51,16 +55,17 @@ class TestTransactionService:
             "account_id": 1,
             "type": "deposit",
             "amount": Decimal("100.00"),
-            "timestamp": None,
+            "timestamp": datetime(2024, 1, 1, 12, 0, 0),
         }
         mock_transaction = MagicMock(**transaction_record)
-        mock_database.fetch_one.side_effect = [mock_account, mock_transaction]
+        # linha travada, saldo lido após o UPDATE e a transação inserida
+        mock_database.fetch_one.side_effect = [mock_account, mock_account, mock_transaction]
 
         result = await transaction_service.create(sample_transaction_in_deposit)
 
         assert result.id == 1
         assert result.type == "deposit"
-        assert mock_database.execute.call_count == 2  # insert transaction + update account
+        assert mock_database.execute.call_count == 3  # update account + insert transaction + rollups
 
     @pytest.mark.asyncio
     async def test_create_withdrawal_success(
@@ -82,16 +87,17 @@ class TestTransactionService:
             "account_id": 1,
             "type": "withdrawal",
             "amount": Decimal("50.00"),
-            "timestamp": None,
+            "timestamp": datetime(2024, 1, 1, 12, 0, 0),
         }
         mock_transaction = MagicMock(**transaction_record)
-        mock_database.fetch_one.side_effect = [mock_account, mock_transaction]
+        # linha travada, saldo lido após o UPDATE e a transação inserida
+        mock_database.fetch_one.side_effect = [mock_account, mock_account, mock_transaction]
 
         result = await transaction_service.create(sample_transaction_in_withdrawal)
 
         assert result.id == 1
         assert result.type == "withdrawal"
-        assert mock_database.execute.call_count == 2
+        assert mock_database.execute.call_count == 3
 
     @pytest.mark.asyncio
     async def test_create_withdrawal_insufficient_balance(
@@ -111,7 +117,8 @@ class TestTransactionService:
             "created_at": None,
         }
         mock_account = MagicMock(**account_record)
-        mock_database.fetch_one = AsyncMock(return_value=mock_account)
+        # o UPDATE condicional não encontra linha; a conta é lida para o erro
+        mock_database.fetch_one = AsyncMock(side_effect=[None, mock_account])
 
         with pytest.raises(InsufficientBalanceError) as exc_info:
             await transaction_service.create(transaction_in)
@@ -159,15 +166,58 @@ class TestTransactionService:
             "account_id": 1,
             "type": "withdrawal",
             "amount": Decimal("1000.00"),
-            "timestamp": None,
+            "timestamp": datetime(2024, 1, 1, 12, 0, 0),
         }
         mock_transaction = MagicMock(**transaction_record)
-        mock_database.fetch_one.side_effect = [mock_account, mock_transaction]
+        # linha travada, saldo lido após o UPDATE e a transação inserida
+        mock_database.fetch_one.side_effect = [mock_account, mock_account, mock_transaction]
 
         result = await transaction_service.create(transaction_in)
 
         assert result.id == 1
-        assert mock_database.execute.call_count == 2
+        assert mock_database.execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_read_all_with_cursor(self, transaction_service, mock_database):
+        """Testa paginação por cursor (keyset) sem OFFSET."""
+        from src.pagination import encode_cursor
+        mock_database.fetch_all = AsyncMock(return_value=[])
+
+        await transaction_service.read_all(
+            account_id=1, limit=10, after=encode_cursor(datetime(2024, 1, 1), 5)
+        )
+
+        sql = str(mock_database.fetch_all.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "(transactions.timestamp, transactions.id) >" in sql
+        assert "ORDER BY transactions.timestamp, transactions.id" in sql
+        assert "OFFSET" not in sql
+
+    @pytest.mark.asyncio
+    async def test_read_all_recent_start_skips_archive(self, transaction_service, mock_database):
+        """Testa que um início recente limita a primeira página ao ledger quente."""
+        mock_database.fetch_all = AsyncMock(return_value=[])
+
+        await transaction_service.read_all(account_id=1, limit=10, start=datetime.now())
+
+        sql = str(mock_database.fetch_all.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "transactions.timestamp >=" in sql
+        assert "transactions_archive" not in sql
+
+    @pytest.mark.asyncio
+    async def test_read_all_old_start_reads_archive(self, transaction_service, mock_database):
+        """Testa que um início anterior ao horizonte ainda consulta o arquivo."""
+        mock_database.fetch_all = AsyncMock(return_value=[])
+
+        await transaction_service.read_all(account_id=1, limit=10, start=datetime(2020, 1, 1))
+
+        sql = str(mock_database.fetch_all.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "transactions_archive.timestamp >=" in sql
+
+    @pytest.mark.asyncio
+    async def test_read_all_invalid_cursor(self, transaction_service, mock_database):
+        """Testa cursor inválido."""
+        with pytest.raises(InvalidCursorError):
+            await transaction_service.read_all(account_id=1, limit=10, after="not-a-cursor")
 
     @pytest.mark.asyncio
     async def test_read_all_empty_result(
@@ -182,3 +232,253 @@ class TestTransactionService:
         mock_database.fetch_all.assert_called_once()
 
 
+
+class TestTransactionServiceReturning:
+    """Testes para o caminho de escrita atômica (CTE com UPDATE ... RETURNING)."""
+
+    @pytest.fixture
+    def transaction_service(self):
+        """Cria um TransactionService com suporte a CTEs de escrita."""
+        with patch("src.service.transaction.supports_writable_cte", True):
+            yield TransactionService()
+
+    @pytest.mark.asyncio
+    async def test_create_deposit_single_statement(
+        self, transaction_service, mock_database, sample_transaction_in_deposit,
+        sample_transaction_record
+    ):
+        """Testa depósito com uma única ida ao banco."""
+        mock_database.fetch_one = AsyncMock(return_value=MagicMock(**sample_transaction_record))
+        mock_database.execute = AsyncMock()
+
+        result = await transaction_service.create(sample_transaction_in_deposit)
+
+        assert result.id == 1
+        mock_database.fetch_one.assert_called_once()
+        mock_database.execute.assert_not_called()
+
+        sql = str(mock_database.fetch_one.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("WITH updated_account AS")
+        assert "RETURNING" in sql
+        assert "INSERT INTO account_rollups" in sql
+        assert "ON CONFLICT (account_id, granularity, period_start, type) DO UPDATE" in sql
+
+    @pytest.mark.asyncio
+    async def test_create_withdrawal_guarded_by_balance(
+        self, transaction_service, mock_database, sample_transaction_in_withdrawal,
+        sample_transaction_record
+    ):
+        """Testa que o saque só debita quando o saldo cobre o valor."""
+        mock_database.fetch_one = AsyncMock(return_value=MagicMock(**sample_transaction_record))
+
+        await transaction_service.create(sample_transaction_in_withdrawal)
+
+        sql = str(mock_database.fetch_one.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "accounts.balance >=" in sql
+
+    @pytest.mark.asyncio
+    async def test_create_withdrawal_insufficient_balance(
+        self, transaction_service, mock_database, sample_transaction_in_withdrawal
+    ):
+        """Testa saldo insuficiente quando o UPDATE condicional não afeta linhas."""
+        mock_account = MagicMock(id=1, user_id=123, balance=Decimal("10.00"), created_at=None)
+        mock_database.fetch_one = AsyncMock(side_effect=[None, mock_account])
+
+        with pytest.raises(InsufficientBalanceError) as exc_info:
+            await transaction_service.create(sample_transaction_in_withdrawal)
+
+        assert exc_info.value.account_id == 1
+        assert exc_info.value.balance == 10.0
+
+    @pytest.mark.asyncio
+    async def test_create_account_not_found(
+        self, transaction_service, mock_database, sample_transaction_in_deposit
+    ):
+        """Testa conta inexistente no caminho atômico."""
+        mock_database.fetch_one = AsyncMock(side_effect=[None, None])
+
+        with pytest.raises(AccountNotFoundError) as exc_info:
+            await transaction_service.create(sample_transaction_in_deposit)
+
+        assert exc_info.value.account_id == 1
+
+
+class TestTransactionServiceRowReturning:
+    """Testes para o caminho com RETURNING por linha (sem CTEs de escrita)."""
+
+    @pytest.fixture
+    def transaction_service(self):
+        """Cria um TransactionService com RETURNING, mas sem CTEs de escrita."""
+        with patch("src.service.writes.supports_returning", True):
+            yield TransactionService()
+
+    @pytest.mark.asyncio
+    async def test_create_one_statement_per_row(
+        self, transaction_service, mock_database, sample_transaction_in_withdrawal,
+        sample_transaction_record
+    ):
+        """Testa saque com uma instrução por linha escrita."""
+        balance_cache.clear()
+        mock_account = MagicMock(id=1, balance=Decimal("950.00"))
+        mock_database.fetch_one = AsyncMock(side_effect=[mock_account, MagicMock(**sample_transaction_record)])
+        mock_database.execute = AsyncMock()
+
+        result = await transaction_service.create(sample_transaction_in_withdrawal)
+
+        assert result.id == 1
+        assert mock_database.fetch_one.call_count == 2
+        mock_database.execute.assert_called_once()  # upsert dos rollups
+        update, insert = (call.args[0] for call in mock_database.fetch_one.call_args_list)
+        update_sql = str(update.compile(dialect=postgresql.dialect()))
+        assert "accounts.balance >=" in update_sql
+        assert "RETURNING accounts.id, accounts.balance" in update_sql
+        assert "RETURNING" in str(insert.compile(dialect=postgresql.dialect()))
+        assert balance_cache.get(1) == 950.0
+        balance_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_create_withdrawal_insufficient_balance(
+        self, transaction_service, mock_database, sample_transaction_in_withdrawal
+    ):
+        """Testa que nada é inserido quando o UPDATE condicional não afeta linhas."""
+        mock_account = MagicMock(id=1, user_id=123, balance=Decimal("10.00"), created_at=None)
+        mock_database.fetch_one = AsyncMock(side_effect=[None, mock_account])
+        mock_database.execute = AsyncMock()
+
+        with pytest.raises(InsufficientBalanceError):
+            await transaction_service.create(sample_transaction_in_withdrawal)
+
+        assert mock_database.fetch_one.call_count == 2
+        mock_database.execute.assert_not_called()
+
+
+class TestTransactionServiceBatch:
+    """Testes para TransactionService.create_batch."""
+
+    @pytest.fixture
+    def transaction_service(self):
+        """Cria uma instância do TransactionService."""
+        return TransactionService()
+
+    @staticmethod
+    def _batch(mode: str) -> TransactionBatchIn:
+        return TransactionBatchIn(
+            mode=mode,
+            transactions=[
+                {"account_id": 1, "type": "deposit", "amount": 100.0},
+                {"account_id": 1, "type": "withdrawal", "amount": 5000.0},
+                {"account_id": 2, "type": "deposit", "amount": 10.0},
+                {"account_id": 1, "type": "withdrawal", "amount": 1100.0},
+            ],
+        )
+
+    @pytest.mark.asyncio
+    async def test_create_batch_best_effort(
+        self, transaction_service, mock_database, sample_transaction_record
+    ):
+        """Testa lote best-effort aplicando apenas os itens válidos."""
+        mock_account = MagicMock(id=1, user_id=123, balance=Decimal("1000.00"), created_at=None)
+        created = [MagicMock(**{**sample_transaction_record, "id": i}) for i in (10, 11)]
+        mock_database.fetch_all = AsyncMock(side_effect=[[mock_account], created])
+        mock_database.execute = AsyncMock(side_effect=[10, 11, None, None])
+
+        result = await transaction_service.create_batch(self._batch("best_effort"))
+
+        assert result["committed"] is True
+        statuses = [item["status"] for item in result["results"]]
+        assert statuses == ["created", "rejected", "rejected", "created"]
+        assert "Insufficient balance for account 1" in result["results"][1]["detail"]
+        assert "Account with ID 2 not found" in result["results"][2]["detail"]
+        assert result["results"][3]["transaction"].id == 11
+        # 2 inserts + 1 update de saldo para a conta + 1 upsert dos rollups
+        assert mock_database.execute.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_create_batch_atomic_rejects_everything(
+        self, transaction_service, mock_database
+    ):
+        """Testa lote atômico sem escrita quando algum item falha."""
+        mock_account = MagicMock(id=1, user_id=123, balance=Decimal("1000.00"), created_at=None)
+        mock_database.fetch_all = AsyncMock(return_value=[mock_account])
+        mock_database.execute = AsyncMock()
+
+        result = await transaction_service.create_batch(self._batch("atomic"))
+
+        assert result["committed"] is False
+        statuses = [item["status"] for item in result["results"]]
+        assert statuses == ["skipped", "rejected", "rejected", "skipped"]
+        mock_database.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_batch_bulk_insert_with_returning(
+        self, transaction_service, mock_database, sample_transaction_record
+    ):
+        """Testa inserção em lote com um único INSERT multi-linha."""
+        batch = TransactionBatchIn(transactions=[
+            {"account_id": 1, "type": "deposit", "amount": 100.0},
+            {"account_id": 1, "type": "deposit", "amount": 50.0},
+        ])
+        mock_account = MagicMock(id=1, user_id=123, balance=Decimal("0.00"), created_at=None)
+        created = [MagicMock(**{**sample_transaction_record, "id": i}) for i in (1, 2)]
+        mock_database.fetch_all = AsyncMock(side_effect=[[mock_account], created])
+        mock_database.execute = AsyncMock()
+
+        with patch("src.service.writes.supports_returning", True):
+            result = await transaction_service.create_batch(batch)
+
+        assert [item["transaction"].id for item in result["results"]] == [1, 2]
+        assert mock_database.fetch_all.call_count == 2
+        # update de saldo + upsert dos rollups
+        assert mock_database.execute.call_count == 2
+
+
+class TestTransactionServiceBalanceCache:
+    """Testes para a atualização write-through do cache de saldo."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Limpa o cache de saldos entre os testes."""
+        balance_cache.clear()
+        yield
+        balance_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_create_with_returning_updates_cache(
+        self, mock_database, sample_transaction_in_deposit, sample_transaction_record
+    ):
+        """Testa que o saldo retornado pela escrita vai para o cache."""
+        record = MagicMock(**sample_transaction_record, balance=Decimal("1100.00"))
+        mock_database.fetch_one = AsyncMock(return_value=record)
+
+        with patch("src.service.transaction.supports_writable_cte", True):
+            await TransactionService().create(sample_transaction_in_deposit)
+
+        assert balance_cache.get(1) == 1100.0
+
+    @pytest.mark.asyncio
+    async def test_create_fallback_updates_cache(
+        self, mock_database, sample_transaction_in_deposit, sample_transaction_record
+    ):
+        """Testa que o caminho sem RETURNING também grava o saldo lido após o UPDATE."""
+        balance_cache.set(1, 1000.0)
+        mock_database.fetch_one = AsyncMock(side_effect=[
+            MagicMock(id=1),
+            MagicMock(id=1, balance=Decimal("1100.00")),
+            MagicMock(**sample_transaction_record),
+        ])
+        mock_database.execute = AsyncMock(return_value=1)
+
+        await TransactionService().create(sample_transaction_in_deposit)
+
+        assert balance_cache.get(1) == 1100.0
+
+    @pytest.mark.asyncio
+    async def test_failed_create_keeps_cache(self, mock_database, sample_transaction_in_withdrawal):
+        """Testa que uma escrita rejeitada não altera o cache."""
+        balance_cache.set(1, 10.0)
+        mock_database.fetch_one = AsyncMock(side_effect=[None, MagicMock(id=1, balance=Decimal("10.00"))])
+
+        with pytest.raises(InsufficientBalanceError):
+            await TransactionService().create(sample_transaction_in_withdrawal)
+
+        assert balance_cache.get(1) == 10.0
@@ -0,0 +1,107 @@
+"""Testes unitários para os helpers de escrita com RETURNING."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from src.models.account import accounts
+from src.service.writes import chunked, insert_row, insert_rows, update_row
+
+
+@pytest.fixture
+def returning():
+    """Ativa o suporte a RETURNING."""
+    with patch("src.service.writes.supports_returning", True):
+        yield
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestInsertRow:
+    """Testes para insert_row."""
+
+    @pytest.mark.asyncio
+    async def test_single_statement_with_returning(self, returning, mock_database):
+        """Testa INSERT ... RETURNING sem leitura de volta."""
+        mock_database.fetch_one = AsyncMock(return_value=MagicMock(id=1))
+        mock_database.execute = AsyncMock()
+
+        result = await insert_row(accounts, user_id=1, balance=10.0)
+
+        assert result.id == 1
+        mock_database.execute.assert_not_called()
+        assert "RETURNING accounts.id" in compile_sql(mock_database.fetch_one.call_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_fallback_reads_back(self, mock_database):
+        """Testa INSERT seguido de SELECT quando não há RETURNING."""
+        mock_database.execute = AsyncMock(return_value=5)
+        mock_database.fetch_one = AsyncMock(return_value=MagicMock(id=5))
+
+        result = await insert_row(accounts, user_id=1, balance=10.0)
+
+        assert result.id == 5
+        mock_database.execute.assert_called_once()
+        assert "WHERE accounts.id =" in compile_sql(mock_database.fetch_one.call_args.args[0])
+
+
+class TestChunked:
+    """Testes para chunked."""
+
+    def test_splits_in_write_chunks(self):
+        """Testa a divisão das linhas em blocos de WRITE_CHUNK_SIZE."""
+        with patch("src.service.writes.WRITE_CHUNK_SIZE", 2):
+            assert list(chunked([1, 2, 3, 4, 5])) == [[1, 2], [3, 4], [5]]
+        assert list(chunked([])) == []
+
+
+class TestInsertRows:
+    """Testes para insert_rows."""
+
+    @pytest.mark.asyncio
+    async def test_returning_rows_in_input_order(self, returning, mock_database):
+        """Testa que as linhas retornadas voltam na ordem de inserção."""
+        mock_database.fetch_all = AsyncMock(return_value=[MagicMock(id=3), MagicMock(id=1), MagicMock(id=2)])
+
+        result = await insert_rows(accounts, [{"user_id": i, "balance": 1.0} for i in range(3)])
+
+        assert [record.id for record in result] == [1, 2, 3]
+        mock_database.fetch_all.assert_called_once()
+
+
+class TestUpdateRow:
+    """Testes para update_row."""
+
+    @pytest.mark.asyncio
+    async def test_returning_selected_columns(self, returning, mock_database):
+        """Testa UPDATE ... RETURNING com as colunas pedidas."""
+        mock_database.fetch_one = AsyncMock(return_value=None)
+        command = accounts.update().where(accounts.c.id == 1).values(balance=accounts.c.balance + 1)
+
+        assert await update_row(command, accounts.c.balance) is None
+        assert compile_sql(mock_database.fetch_one.call_args.args[0]).endswith("RETURNING accounts.balance")
+
+    @pytest.mark.asyncio
+    async def test_fallback_locks_updates_and_reads_back(self, mock_database):
+        """Testa o caminho sem RETURNING: trava a linha, atualiza e relê."""
+        mock_database.fetch_one = AsyncMock(side_effect=[MagicMock(id=1), MagicMock(id=1, balance=11.0)])
+        mock_database.execute = AsyncMock()
+        command = accounts.update().where(accounts.c.id == 1).values(balance=accounts.c.balance + 1)
+
+        result = await update_row(command, accounts.c.id, accounts.c.balance)
+
+        assert result.balance == 11.0
+        assert "FOR UPDATE" in compile_sql(mock_database.fetch_one.call_args_list[0].args[0])
+        mock_database.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fallback_no_match(self, mock_database):
+        """Testa que nada é atualizado quando o WHERE não encontra linha."""
+        mock_database.fetch_one = AsyncMock(return_value=None)
+        mock_database.execute = AsyncMock()
+        command = accounts.update().where(accounts.c.id == 1).values(balance=0)
+
+        assert await update_row(command) is None
+        mock_database.execute.assert_not_called()
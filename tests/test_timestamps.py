@@ -0,0 +1,18 @@
+"""Testes unitários para os utilitários de timestamps."""
+from datetime import datetime, timedelta, timezone
+
+from src.timestamps import as_utc
+
+
+class TestAsUtc:
+    """Testes para as_utc."""
+
+    def test_naive_is_read_as_utc(self):
+        """Testa que valores sem fuso são tratados como UTC."""
+        assert as_utc(datetime(2024, 1, 1)) == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def test_aware_is_kept(self):
+        """Testa que valores com fuso não são alterados."""
+        timestamp = datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=-3)))
+
+        assert as_utc(timestamp) is timestamp